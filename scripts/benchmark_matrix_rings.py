@@ -0,0 +1,76 @@
+"""Time the matrix tools over the inferred ring against the old symbolic ring.
+
+Run inside a Sage environment, e.g. in the dev container:
+
+    docker exec sage-mcp bash -lc 'cd /workspace && sage -python scripts/benchmark_matrix_rings.py'
+
+Each case calls ``matrix_operation`` on a random integer matrix twice: once
+with the ring inferred (ZZ for integer entries) and once with ``ring="SR"``,
+which is what every call did before inference existed. The SR column is capped
+by ``--timeout``; a dash means it did not finish inside it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sagemath_mcp import runtime, server
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.session import SageSessionManager
+
+
+class _Context:
+    session_id = "benchmark"
+
+    async def info(self, message: str) -> None:
+        pass
+
+    async def report_progress(self, *args) -> None:
+        pass
+
+
+async def _time(coro) -> float | None:
+    start = time.perf_counter()
+    try:
+        await coro
+    except Exception:
+        return None
+    return time.perf_counter() - start
+
+
+def _cell(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds:.3f}"
+
+
+async def main(sizes: list[int], eval_timeout: float) -> int:
+    runtime.SESSION_MANAGER = SageSessionManager(SageSettings(eval_timeout=eval_timeout))
+    ctx = _Context()
+    rng = random.Random(0)
+    print(f"{'size':>6} {'operation':>12} {'inferred (s)':>14} {'SR (s)':>10}")
+    try:
+        for n in sizes:
+            rows = [[rng.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+            for operation in ("determinant", "rank", "inverse"):
+                inferred = await _time(server.matrix_operation(rows, operation, ctx=ctx))
+                symbolic = await _time(
+                    server.matrix_operation(rows, operation, ring="SR", ctx=ctx)
+                )
+                print(f"{n:>6} {operation:>12} {_cell(inferred):>14} {_cell(symbolic):>10}")
+    finally:
+        await runtime.SESSION_MANAGER.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.sizes, args.timeout)))
@@ -0,0 +1,139 @@
+"""Render process: turns sampled plot data into PNG images.
+
+The plotting tools used to render through matplotlib inside the caller's own
+Sage worker, holding that session for the whole render and loading matplotlib
+into every math worker. Now the worker only samples -- points for a 2D plot, a
+mesh for a surface -- and hands the numbers to one of these processes, kept
+warm by :class:`sagemath_mcp.render.RenderPool`.
+
+A render process never runs caller code. It receives plain JSON numbers the
+server produced itself, so it needs no sandbox, and it keeps no state between
+requests.
+
+Protocol: one JSON object per line on stdin, one response per line on stdout.
+
+    {"id": ..., "type": "render", "spec": {...}}  ->  {"id": ..., "ok": true, "image_base64": ...}
+    {"id": ..., "type": "shutdown"}               ->  {"id": ..., "ok": true}
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import io
+import json
+import math
+import sys
+
+
+def _figure():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # A bare Figure with its own canvas, not pyplot: no global figure registry
+    # to leak between requests, and no GUI backend to select.
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _values(data: list) -> list[float]:
+    # JSON has no NaN; the worker sends a gap as null.
+    return [math.nan if value is None else float(value) for value in data]
+
+
+def _render_lines(figure, spec: dict) -> None:
+    axes = figure.add_subplot(111)
+    # One colour per expression; an expression with a pole comes in several
+    # segments, which share it.
+    for index, segments in enumerate(spec["series"]):
+        for xs, ys in segments:
+            axes.plot(_values(xs), _values(ys), color=f"C{index}")
+    axes.set_xlabel(spec.get("xlabel", ""))
+    axes.spines[["top", "right"]].set_visible(False)
+
+
+def _render_surface(figure, spec: dict) -> None:
+    import numpy
+
+    n = int(spec["n"])
+    X, Y = numpy.meshgrid(numpy.linspace(*spec["x"], n), numpy.linspace(*spec["y"], n))
+    Z = numpy.array([_values(row) for row in spec["z"]], dtype=float)
+    axes = figure.add_subplot(111, projection="3d")
+    axes.plot_surface(X, Y, Z, rcount=n, ccount=n, cmap="viridis")
+    axes.set_xlabel(spec.get("xlabel", ""))
+    axes.set_ylabel(spec.get("ylabel", ""))
+
+
+_RENDERERS = {"lines": _render_lines, "surface": _render_surface}
+
+
+def _render(spec: dict) -> str:
+    """The spec drawn as base64: a PNG, or with ``format: "svg"`` a gzipped SVG.
+
+    ``width`` and ``height`` are in pixels at ``dpi``; without them the figure
+    keeps matplotlib's 640x480 at 100 dpi.
+    """
+    kind = spec.get("kind")
+    if kind not in _RENDERERS:
+        raise ValueError(f"Unknown plot kind {kind!r}")
+    image_format = spec.get("format", "png")
+    if image_format not in {"png", "svg"}:
+        raise ValueError(f"Unknown image format {image_format!r}")
+    figure = _figure()
+    dpi = float(spec.get("dpi", 100))
+    if "width" in spec and "height" in spec:
+        figure.set_size_inches(spec["width"] / dpi, spec["height"] / dpi)
+    _RENDERERS[kind](figure, spec)
+    buffer = io.BytesIO()
+    if image_format == "svg":
+        import matplotlib
+
+        # No timestamp in the file and none in the gzip header, and element ids
+        # salted with a constant rather than matplotlib's random uuid: the same
+        # plot compresses to the same bytes -- and so the same ETag.
+        with matplotlib.rc_context({"svg.hashsalt": "sagemath-mcp"}):
+            figure.savefig(buffer, format="svg", dpi=dpi, metadata={"Date": None})
+        data = gzip.compress(buffer.getvalue(), mtime=0)
+    else:
+        figure.savefig(buffer, format="png", dpi=dpi)
+        data = buffer.getvalue()
+    return base64.b64encode(data).decode("ascii")
+
+
+def _warm_up() -> None:
+    """Pay matplotlib's import and font-cache cost before the first request."""
+    try:
+        _render({"kind": "lines", "series": [[[[0.0, 1.0], [0.0, 1.0]]]]})
+        _render({"kind": "surface", "x": [0.0, 1.0], "y": [0.0, 1.0], "n": 2,
+                 "z": [[0.0, 1.0], [1.0, 0.0]]})
+    except Exception:  # pragma: no cover - reported per request instead
+        pass
+
+
+def _main() -> int:
+    _warm_up()
+    for raw in sys.stdin:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            message = json.loads(raw)
+        except json.JSONDecodeError:
+            print(json.dumps({"ok": False, "error": "Invalid JSON payload"}), flush=True)
+            continue
+        msg_id = message.get("id")
+        if message.get("type") == "shutdown":
+            print(json.dumps({"ok": True, "id": msg_id}), flush=True)
+            return 0
+        try:
+            response = {"ok": True, "image_base64": _render(message["spec"])}
+        except Exception as exc:
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        response["id"] = msg_id
+        print(json.dumps(response), flush=True)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
+    sys.exit(_main())
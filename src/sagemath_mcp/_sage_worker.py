@@ -8,6 +8,7 @@ import importlib
 import io
 import json
 import os
+import socket
 import sys
 import time
 import traceback
@@ -30,6 +31,11 @@ from sagemath_mcp.security import (
 )
 from sagemath_mcp.symbols import PREDEFINED_SYMBOLS
 
+try:
+    import resource
+except ImportError:  # pragma: no cover - not POSIX
+    resource = None  # type: ignore[assignment]
+
 PURE_PYTHON = os.getenv("SAGEMATH_MCP_PURE_PYTHON") == "1"
 STARTUP_CODE = os.getenv("SAGEMATH_MCP_STARTUP", "from sage.all import *")
 
@@ -163,6 +169,22 @@ def _declare_symbols(namespace: dict[str, Any], names: frozenset[str]) -> None:
                 namespace[name] = var(name)
 
 
+def _forget_assumptions() -> None:
+    """Drop every assumption, which a new namespace alone does not.
+
+    ``assume()`` -- and ``var(..., domain=...)`` -- record facts in Maxima's
+    global context, not in the namespace, so they outlived a reset and changed
+    the next integral, limit or simplification made in the process.
+    """
+    if PURE_PYTHON:
+        return
+    try:
+        from sage.symbolic.assumptions import forget
+    except ImportError:
+        return
+    forget()
+
+
 def _build_namespace() -> dict[str, Any]:
     # NOTE: Each worker keeps its own global namespace. We allow a single
     # preload statement so sessions can bootstrap Sage or the lightweight math
@@ -866,15 +888,62 @@ def _withheld_names(ns: dict[str, Any]) -> frozenset[str]:
     )
 
 
+# The phases a request's time is split into, in the order they run.
+_PHASES = ("preparse", "validate", "compile", "execute", "format", "latex")
+# ru_maxrss is in KiB on Linux and in bytes on macOS.
+_MAXRSS_PER_KIB = 1024 if sys.platform == "darwin" else 1
+
+
+class _PhaseClock:
+    """Splits one request's time into the phases it went through."""
+
+    def __init__(self) -> None:
+        self.phases = dict.fromkeys(_PHASES, 0.0)
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """Charge the time since the previous mark to *phase*."""
+        now = time.perf_counter()
+        self.phases[phase] += (now - self._last) * 1000.0
+        self._last = now
+
+
+def _rusage() -> tuple[float, float, int] | None:
+    """(user seconds, system seconds, peak RSS in KiB) of this process so far."""
+    if resource is None:  # pragma: no cover - not POSIX
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime, usage.ru_stime, usage.ru_maxrss // _MAXRSS_PER_KIB
+
+
+def _usage(clock: _PhaseClock, before: tuple[float, float, int] | None) -> dict[str, Any]:
+    """What one request cost the worker, for the response."""
+    after = _rusage()
+    usage: dict[str, Any] = {
+        "phases_ms": {phase: round(ms, 3) for phase, ms in clock.phases.items()},
+        "cpu_user_ms": None,
+        "cpu_system_ms": None,
+        "peak_rss_delta_kb": None,
+    }
+    if before is not None and after is not None:
+        usage["cpu_user_ms"] = round((after[0] - before[0]) * 1000.0, 3)
+        usage["cpu_system_ms"] = round((after[1] - before[1]) * 1000.0, 3)
+        # The peak only ever rises, so this is how far the call pushed it.
+        usage["peak_rss_delta_kb"] = after[2] - before[2]
+    return usage
+
+
 def _split_code(
     code: str, trusted: bool = False,
     session_names: frozenset[str] | set[str] = frozenset(),
     withheld: frozenset[str] = frozenset(),
+    clock: _PhaseClock | None = None,
 ) -> SimpleNamespace:
     """Return the executable and tail expression chunks for *code*.
 
     *trusted* selects the policy for code this server generated itself, which
-    needs sage_eval. Caller-supplied code never sets it.
+    needs sage_eval. Caller-supplied code never sets it. *clock*, if given, is
+    charged for preparsing and for parsing and validating.
     """
 
     if not trusted:
@@ -882,6 +951,8 @@ def _split_code(
         # they can measure.
         check_source_length(code)
         code = _preparse(code)
+    if clock is not None:
+        clock.mark("preparse")
     # Validate what will actually run: the preparsed source, not what was typed.
     # Before parsing, not after: the parser gives up on a long enough snippet
     # and reports a RecursionError, which tells the caller nothing they can act
@@ -946,6 +1017,8 @@ def _split_code(
     # session rather than a sequence of snippets.
     injects = injects_session_names(module)
     ast.fix_missing_locations(module)
+    if clock is not None:
+        clock.mark("validate")
     # `bound_here` rides along so _execute can hand it to the reseal.
     if module.body and isinstance(module.body[-1], ast.Expr):
         prefix = ast.Module(
@@ -1025,11 +1098,13 @@ def _execute(
     else:
         stdout_buffer = None
     start = time.perf_counter()
+    clock = _PhaseClock()
+    rusage_before = _rusage()
 
     try:
         compiled = _split_code(
             code, trusted=trusted, session_names=_CALLER_BOUND_NAMES,
-            withheld=_WITHHELD_NAMES,
+            withheld=_WITHHELD_NAMES, clock=clock,
         )
     except Exception as exc:
         return {
@@ -1049,15 +1124,21 @@ def _execute(
     # caller already assigned is not overwritten.
     _declare_symbols(namespace, getattr(compiled, "auto_symbols", frozenset()))
     try:
+        prefix_code = compile(compiled.prefix, "<sagecell>", "exec")
+        tail_code = None
+        if compiled.is_expr and compiled.tail is not None:
+            tail_code = compile(compiled.tail, "<sagecell>", "eval")
+        clock.mark("compile")
         with contextlib.redirect_stdout(stdout_buffer or io.StringIO()):
-            exec(compile(compiled.prefix, "<sagecell>", "exec"), namespace)
+            exec(prefix_code, namespace)
             if isinstance(stdout_buffer, _StreamingStdout):
                 stdout_buffer.flush()   # emit a trailing line with no newline
             result_obj = None
             result_type = "statement"
-            if compiled.is_expr and compiled.tail is not None:
-                result_obj = eval(compile(compiled.tail, "<sagecell>", "eval"), namespace)
+            if tail_code is not None:
+                result_obj = eval(tail_code, namespace)
                 result_type = "expression"
+        clock.mark("execute")
         if compiled.injects and not trusted:
             # Only for a snippet that *asked* for an injection, and only for
             # names that were not there before it ran. A namespace diff is not
@@ -1079,7 +1160,9 @@ def _execute(
             namespace["_"] = result_obj
             _CALLER_BOUND_NAMES.add("_")
         result_repr = None if result_obj is None else _format_result(result_obj)
+        clock.mark("format")
         latex_repr = _latex(result_obj) if result_obj is not None and want_latex else None
+        clock.mark("latex")
         elapsed_ms = (time.perf_counter() - start) * 1000.0
         return {
             "ok": True,
@@ -1088,6 +1171,7 @@ def _execute(
             "latex": latex_repr,
             "stdout": stdout_value,
             "elapsed_ms": elapsed_ms,
+            "usage": _usage(clock, rusage_before),
         }
     except KeyboardInterrupt:
         # SIGINT from the parent means "abandon this computation", not "die".
@@ -1134,6 +1218,59 @@ def _execute(
                 (frozenset(namespace) - before_trusted) | compiled.bound_here,
             )
 
+def _fork(path: str) -> dict[str, Any] | None:
+    """Copy this worker, namespace and all, into a new worker serving the socket *path*.
+
+    Returns the response for the server in this process, and None in the copy,
+    which carries on with the main loop talking to *path* instead of the pipes.
+
+    A double fork: the copy is our grandchild, so this worker never has to reap
+    it, and nothing here waits on anything but the short-lived middle process.
+    The pages are shared copy-on-write until either side writes to them, which
+    is what makes a fork cheap next to replaying the journal.
+    """
+    if not hasattr(os, "fork"):
+        return {"ok": False, "error": {"type": "OSError", "message": "os.fork is unavailable"}}
+    sys.stdout.flush()
+    read_end, write_end = os.pipe()
+    try:
+        middle = os.fork()
+    except OSError as exc:
+        os.close(read_end)
+        os.close(write_end)
+        return {"ok": False, "error": {"type": "OSError", "message": str(exc)}}
+    if middle:
+        os.close(write_end)
+        with os.fdopen(read_end, "rb") as pipe:
+            reported = pipe.read()
+        os.waitpid(middle, 0)
+        if not reported:
+            return {"ok": False, "error": {"type": "OSError", "message": "fork failed"}}
+        return {"ok": True, "pid": int(reported)}
+    # The middle process: fork once more, report the copy's pid, and leave.
+    os.close(read_end)
+    try:
+        copy = os.fork()
+    except OSError:
+        os._exit(1)
+    if copy:
+        os.write(write_end, str(copy).encode("ascii"))
+        os._exit(0)
+    os.close(write_end)
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(path)
+        os.dup2(connection.fileno(), 0)
+        os.dup2(connection.fileno(), 1)
+        connection.close()
+    except OSError:
+        os._exit(1)
+    # Fresh file objects: whatever the old ones buffered belonged to the pipes.
+    sys.stdin = os.fdopen(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = os.fdopen(1, "w", encoding="utf-8", closefd=False)
+    return None
+
+
 def _main() -> int:
     namespace = _build_namespace()
     while True:
@@ -1179,8 +1316,22 @@ def _main() -> int:
             response["id"] = msg_id
             print(json.dumps(response), flush=True)
         elif msg_type == "reset":
+            try:
+                _forget_assumptions()
+            except Exception as exc:
+                # Not reset, and it must not pass for reset: the caller stops
+                # the worker instead.
+                error = {"type": type(exc).__name__, "message": str(exc)}
+                print(json.dumps({"ok": False, "id": msg_id, "error": error}), flush=True)
+                continue
             namespace = _build_namespace()
             print(json.dumps({"ok": True, "id": msg_id}), flush=True)
+        elif msg_type == "fork":
+            response = _fork(str(message.get("socket", "")))
+            if response is None:
+                continue  # the copy: the server hears from it on the socket
+            response["id"] = msg_id
+            print(json.dumps(response), flush=True)
         elif msg_type == "shutdown":
             print(json.dumps({"ok": True, "id": msg_id}), flush=True)
             return 0
@@ -15,9 +15,12 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import logging
+import time
 from collections.abc import AsyncIterator
 
 from fastmcp import FastMCP
+from fastmcp.exceptions import NotFoundError
+from fastmcp.server.middleware import Middleware
 from fastmcp.server.middleware.caching import (
     CallToolSettings,
     GetPromptSettings,
@@ -27,7 +30,8 @@ from fastmcp.server.middleware.caching import (
 from fastmcp.server.middleware.logging import LoggingMiddleware
 from fastmcp.server.middleware.timing import TimingMiddleware
 
-from . import __version__, runtime
+from . import __version__, monitoring, runtime
+from .session import WAIT_REPORTER
 
 LOGGER = logging.getLogger(__name__)
 
@@ -63,34 +67,113 @@ Guidance for best results:
 """.strip()
 
 _CULL_TASK: asyncio.Task[None] | None = None
+_LAG_TASK: asyncio.Task[None] | None = None
+# How often the event loop's responsiveness is sampled, in seconds.
+_LAG_INTERVAL = 0.5
 
 
 async def _cull_loop(interval: float = 60.0) -> None:
-    """Periodically cull idle Sage sessions according to the manager policy."""
+    """Periodically cull idle Sage sessions and expired artifacts."""
     try:
         while True:
             await asyncio.sleep(interval)
             await runtime.SESSION_MANAGER.cull_idle()
+            runtime.ARTIFACTS.cull()
     except asyncio.CancelledError:  # pragma: no cover - background task shutdown
         LOGGER.debug("Session culler cancelled")
 
 
+async def _lag_loop() -> None:
+    """Sample event-loop lag: how much later than asked a sleeping task wakes.
+
+    A loop kept busy by synchronous work -- a large JSON encode, a blocking
+    call that slipped in -- delays every client at once, and shows up here
+    before it shows up anywhere else.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            asked = loop.time()
+            await asyncio.sleep(_LAG_INTERVAL)
+            monitoring.record_loop_lag(loop.time() - asked - _LAG_INTERVAL)
+    except asyncio.CancelledError:  # pragma: no cover - background task shutdown
+        LOGGER.debug("Event-loop lag sampler cancelled")
+
+
+class _ToolLatencyMiddleware(Middleware):
+    """Time every tool call into a per-tool, per-outcome latency histogram."""
+
+    async def on_call_tool(self, context, call_next):
+        began = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(context)
+            outcome = "ok"
+            return result
+        except NotFoundError:
+            # No such tool. Recording it would let any caller mint histograms
+            # under names of their choosing.
+            outcome = ""
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            if outcome:
+                elapsed_ms = (time.perf_counter() - began) * 1000
+                monitoring.record_tool_call(context.message.name, outcome, elapsed_ms)
+
+
+class _QueuePositionMiddleware(Middleware):
+    """Tell a client where its tool call stands while it waits for a busy workspace.
+
+    Installed as a context variable for the duration of the call, so whichever
+    worker the tool ends up queueing on reports through it.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        ctx = context.fastmcp_context
+        if ctx is None:
+            return await call_next(context)
+
+        async def report(position: int, wait_seconds: float) -> None:
+            await ctx.report_progress(
+                0.0,
+                None,
+                f"Queued: position {position} on this workspace, about {wait_seconds:.0f}s",
+            )
+
+        token = WAIT_REPORTER.set(report)
+        try:
+            return await call_next(context)
+        finally:
+            WAIT_REPORTER.reset(token)
+
+
 @contextlib.asynccontextmanager
 async def _lifespan(app: FastMCP) -> AsyncIterator[None]:
     """Manage background tasks and shutdown for the MCP server."""
     del app  # unused but kept for signature compatibility
-    global _CULL_TASK
+    global _CULL_TASK, _LAG_TASK
     LOGGER.info("Starting SageMath MCP server (version %s)", __version__)
     _CULL_TASK = asyncio.create_task(_cull_loop())
+    _LAG_TASK = asyncio.create_task(_lag_loop())
+    await runtime.RENDER_POOL.start()
+    await runtime.PORTFOLIO.start()
     try:
         yield
     finally:
-        if _CULL_TASK:
-            _CULL_TASK.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await _CULL_TASK
-        _CULL_TASK = None
+        for task in (_CULL_TASK, _LAG_TASK):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        _CULL_TASK = _LAG_TASK = None
+        await runtime.JOBS.shutdown()
         await runtime.SESSION_MANAGER.shutdown()
+        await runtime.RENDER_POOL.shutdown()
+        await runtime.PORTFOLIO.shutdown()
+        await runtime.WORKER_POOL.shutdown()
 
 
 mcp = FastMCP(
@@ -100,6 +183,8 @@ mcp = FastMCP(
     lifespan=_lifespan,
 )
 mcp.add_middleware(TimingMiddleware())
+mcp.add_middleware(_ToolLatencyMiddleware())
+mcp.add_middleware(_QueuePositionMiddleware())
 mcp.add_middleware(
     LoggingMiddleware(include_payloads=False, include_payload_length=True)
 )
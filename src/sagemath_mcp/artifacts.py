@@ -0,0 +1,124 @@
+"""Short-lived storage for large tool outputs, handed out by URI.
+
+A plot returned inline is a base64 string a third larger than the PNG, carried
+through the MCP response and then through the model's context. Stored here, the
+tool returns a short URI instead and the client fetches the bytes only if it
+wants them -- as the MCP resource ``resource://sagemath/artifacts/{id}``, or
+over HTTP at ``/artifacts/{id}`` with an ETag.
+
+Artifacts belong to the client that made them. The MCP resource only serves
+them to that client. The HTTP route cannot tell clients apart, so there the
+artifact id itself is the credential: 128 random bits, never listed anywhere.
+Everything expires after a TTL, and the store is bounded in bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+ARTIFACT_URI_PREFIX = "resource://sagemath/artifacts/"
+ARTIFACT_ROUTE_PREFIX = "/artifacts/"
+
+
+@dataclass(slots=True, frozen=True)
+class Artifact:
+    artifact_id: str
+    owner: str
+    media_type: str
+    data: bytes
+    etag: str
+    expires_at: float
+    # "gzip" for bytes stored compressed, as a compressed SVG is.
+    encoding: str = ""
+
+    @property
+    def uri(self) -> str:
+        return ARTIFACT_URI_PREFIX + self.artifact_id
+
+    @property
+    def url(self) -> str:
+        return ARTIFACT_ROUTE_PREFIX + self.artifact_id
+
+    def describe(self) -> dict:
+        """What a tool returns in place of the bytes."""
+        described = {
+            "artifact": self.uri,
+            "url": self.url,
+            "media_type": self.media_type,
+            "bytes": len(self.data),
+            "expires_at": self.expires_at,
+        }
+        if self.encoding:
+            described["encoding"] = self.encoding
+        return described
+
+
+class ArtifactStore:
+    """Artifacts by id, oldest evicted first once the byte budget is spent."""
+
+    def __init__(self, ttl: float = 900.0, max_bytes: int = 256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._artifacts: OrderedDict[str, Artifact] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, owner: str, data: bytes, media_type: str, encoding: str = "") -> Artifact:
+        artifact = Artifact(
+            artifact_id=secrets.token_hex(16),
+            owner=owner,
+            media_type=media_type,
+            data=data,
+            etag=hashlib.sha256(data).hexdigest()[:32],
+            expires_at=time.time() + self.ttl,
+            encoding=encoding,
+        )
+        with self._lock:
+            self._artifacts[artifact.artifact_id] = artifact
+            self._bytes += len(data)
+            self._expire(time.time())
+            while self._bytes > self.max_bytes and len(self._artifacts) > 1:
+                self._drop(next(iter(self._artifacts)))
+        return artifact
+
+    def get(self, artifact_id: str, owner: str | None = None) -> Artifact | None:
+        """The live artifact *artifact_id*; with *owner*, only if it is theirs."""
+        with self._lock:
+            artifact = self._artifacts.get(artifact_id)
+            if artifact is None:
+                return None
+            if artifact.expires_at <= time.time():
+                self._drop(artifact_id)
+                return None
+        if owner is not None and artifact.owner != owner:
+            return None
+        return artifact
+
+    def cull(self) -> int:
+        """Drop every expired artifact; returns how many went."""
+        with self._lock:
+            return self._expire(time.time())
+
+    def _expire(self, now: float) -> int:
+        # Insertion order is expiry order: every artifact gets the same TTL.
+        expired = 0
+        while self._artifacts:
+            oldest = next(iter(self._artifacts.values()))
+            if oldest.expires_at > now:
+                break
+            self._drop(oldest.artifact_id)
+            expired += 1
+        return expired
+
+    def _drop(self, artifact_id: str) -> None:
+        artifact = self._artifacts.pop(artifact_id)
+        self._bytes -= len(artifact.data)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._artifacts)
@@ -15,18 +15,24 @@ through ``_encode_literal``, ``_validated_expression`` or
 from __future__ import annotations
 
 import ast
+import contextlib
 import functools
 import io
+import itertools
 import json
 import re
+import secrets
 import textwrap
 import tokenize
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from dataclasses import replace
+from fractions import Fraction
 
 from fastmcp.exceptions import ToolError
 
+from . import runtime
 from .allowlist import ALLOWED_CALLER_NAMES
+from .portfolio import ALGORITHMS, PortfolioError, is_answer
 from .security import (
     _GREEK_NAMES,
     _SYMBOL_SHAPE,
@@ -452,6 +458,12 @@ def _reject_if_inexact(value: int, name: str) -> int:
     return value
 
 
+# A rational entry written as a string, "3/4" or "-7/2". Nothing else with a
+# slash is accepted: the entry becomes a QQ((p, q)) literal in generated code, so
+# the shape has to be exactly two integers.
+_RATIONAL_ENTRY_RE = re.compile(r"^\s*([+-]?\d+)\s*/\s*(\d+)\s*$")
+
+
 def _exact_matrix_entries(rows, name: str):
     """Return *rows* with integer entries kept exact.
 
@@ -459,6 +471,8 @@ def _exact_matrix_entries(rows, name: str):
     Sage ever saw it: matrix(SR, [[9007199254740993]]) became
     matrix(SR, [[9007199254740992.0]]) and the determinant was quietly wrong.
     Integers and decimal strings now stay integers; genuine floats stay floats.
+    A "p/q" string becomes a `Fraction`, which is what lets a matrix be inferred
+    to live over QQ rather than falling back to the symbolic ring.
     """
     converted = []
     for row in rows:
@@ -470,12 +484,189 @@ def _exact_matrix_entries(rows, name: str):
                 raise ToolError(f"'{name}' entries must be numbers, got a boolean")
             if isinstance(entry, float):
                 out.append(entry)          # a float was asked for; keep it
+            elif isinstance(entry, str) and (ratio := _RATIONAL_ENTRY_RE.match(entry)):
+                numerator, denominator = int(ratio.group(1)), int(ratio.group(2))
+                if denominator == 0:
+                    raise ToolError(f"'{name}' has a zero denominator: {entry!r}")
+                value = Fraction(numerator, denominator)
+                out.append(value.numerator if value.denominator == 1 else value)
             else:
                 out.append(_exact_int(entry, name))
         converted.append(out)
     return converted
 
 
+# The base rings a caller may name for the matrix tools. Inference only ever
+# picks ZZ, QQ or SR -- the wire carries integers, "p/q" strings and floats, and
+# nothing that needs QQbar -- so the others are reached by asking for them.
+_MATRIX_RINGS = ("ZZ", "QQ", "QQbar", "RDF", "CDF", "SR")
+
+
+def _matrix_ring(rows, ring: str | None = None, numeric: bool = False) -> str:
+    """The ring a matrix is built over: the caller's choice, or the narrowest exact one.
+
+    Every matrix used to be built over SR, so the determinant of an integer
+    matrix went through the symbolic ring -- orders of magnitude slower than
+    FLINT over ZZ/QQ, and unusable past roughly 30x30. The answer does not
+    change: an integer matrix over ZZ has the same determinant, inverse and rank
+    it had over SR, only sooner.
+
+    A float keeps the matrix on SR, as before. Moving it to RDF would change
+    the answers (eigenvalues in particular), so floating point is something a
+    caller opts into with ``numeric`` or an explicit ``ring``.
+    """
+    if ring is not None:
+        ring = ring.strip()
+        if ring not in _MATRIX_RINGS:
+            raise ToolError(
+                f"Unknown ring '{ring}'. Must be one of: {', '.join(_MATRIX_RINGS)}"
+            )
+        if numeric and ring not in {"RDF", "CDF"}:
+            raise ToolError(f"numeric=True computes over RDF; it cannot be combined with {ring}")
+        return ring
+    if numeric:
+        return "RDF"
+    entries = [entry for row in rows for entry in row]
+    if any(isinstance(entry, float) for entry in entries):
+        return "SR"
+    if any(isinstance(entry, Fraction) for entry in entries):
+        return "QQ"
+    return "ZZ"
+
+
+def _entry_literal(value) -> str:
+    """One checked matrix entry as generated code; see `_matrix_literal`."""
+    if isinstance(value, Fraction):
+        return f"QQ(({value.numerator}, {value.denominator}))"
+    return repr(value)
+
+
+def _matrix_literal(rows) -> str:
+    """Render checked matrix rows as a Python literal for generated code.
+
+    Integers and floats print as themselves. A rational cannot: generated code
+    is not preparsed, so `1/3` would be the float 0.333..., and it is written as
+    the exact `QQ((1, 3))` instead.
+    """
+    return "[" + ", ".join(
+        "[" + ", ".join(_entry_literal(value) for value in row) + "]" for row in rows
+    ) + "]"
+
+
+def _index(value, name: str, bound: int) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ToolError(f"'{name}' indices must be integers, got {value!r}")
+    if not 0 <= value < bound:
+        raise ToolError(f"'{name}' index {value} is out of range for size {bound}")
+    return value
+
+
+def _sparse_matrix_entries(
+    shape, entries=None, indptr=None, indices=None, data=None, name: str = "matrix"
+) -> tuple[int, int, list[tuple[int, int, object]], str]:
+    """Check a sparse matrix given in coordinate or CSR form.
+
+    Returns ``(rows, columns, triples, layout)``: the triples are
+    ``(row, column, value)`` sorted by position with explicit zeros dropped, the
+    values passed through `_exact_matrix_entries`, and *layout* is "coo" or
+    "csr" -- whichever the caller used, so results can be handed back the same
+    way. Nothing here is proportional to rows*columns; a 10^5 x 10^5 Laplacian
+    with a few hundred thousand non-zeros costs what its non-zeros cost.
+
+    A repeated position is refused rather than summed. scipy sums duplicates
+    and Sage's dict constructor keeps the last one, so either reading would be
+    a silent guess about what the caller meant.
+    """
+    if (
+        not isinstance(shape, (list, tuple))
+        or len(shape) != 2
+        or any(isinstance(n, bool) or not isinstance(n, int) or n < 1 for n in shape)
+    ):
+        raise ToolError(f"'{name}' shape must be two positive integers [rows, columns]")
+    nrows, ncols = shape
+    csr = (indptr, indices, data)
+    if entries is not None and any(part is not None for part in csr):
+        raise ToolError(
+            "Pass either 'entries' (coordinate form) or indptr/indices/data (CSR), not both"
+        )
+    if entries is not None:
+        layout = "coo"
+        positions = []
+        values = []
+        for triple in entries:
+            if not isinstance(triple, (list, tuple)) or len(triple) != 3:
+                raise ToolError(f"'{name}' entries must be [row, column, value] triples")
+            positions.append(
+                (_index(triple[0], name, nrows), _index(triple[1], name, ncols))
+            )
+            values.append(triple[2])
+    elif all(part is not None for part in csr):
+        layout = "csr"
+        if len(indptr) != nrows + 1:
+            raise ToolError(
+                f"'indptr' must have rows + 1 = {nrows + 1} entries, got {len(indptr)}"
+            )
+        if len(indices) != len(data):
+            raise ToolError("'indices' and 'data' must have the same length")
+        if indptr[0] != 0 or indptr[-1] != len(data) or any(
+            b < a for a, b in itertools.pairwise(indptr)
+        ):
+            raise ToolError(
+                "'indptr' must start at 0, never decrease, and end at len(data)"
+            )
+        positions = [
+            (row, _index(indices[k], name, ncols))
+            for row in range(nrows)
+            for k in range(indptr[row], indptr[row + 1])
+        ]
+        values = list(data)
+    else:
+        raise ToolError(
+            f"'{name}' needs its non-zeros: 'entries' as [row, column, value] "
+            "triples, or all of indptr, indices and data"
+        )
+    values = _exact_matrix_entries([values], name)[0] if values else []
+    seen = set()
+    triples = []
+    for position, value in zip(positions, values, strict=True):
+        if position in seen:
+            raise ToolError(f"'{name}' lists position {list(position)} more than once")
+        seen.add(position)
+        if value != 0:
+            triples.append((*position, value))
+    triples.sort(key=lambda triple: triple[:2])
+    return nrows, ncols, triples, layout
+
+
+def _sparse_literal(triples) -> str:
+    """Render checked triples as the ``{(i, j): value}`` dict Sage's matrix() takes."""
+    return "{" + ", ".join(
+        f"({row}, {column}): {_entry_literal(value)}" for row, column, value in triples
+    ) + "}"
+
+
+def _sparse_result(shape, triples, layout: str) -> dict:
+    """Hand a sparse matrix back in the layout the caller sent.
+
+    *triples* are ``[row, column, value]`` lists as the worker returns them,
+    already sorted by position, which is the order CSR needs.
+    """
+    nrows = shape[0]
+    if layout == "coo":
+        return {"shape": list(shape), "entries": [list(triple) for triple in triples]}
+    indptr = [0] * (nrows + 1)
+    for row, _, _ in triples:
+        indptr[row + 1] += 1
+    for row in range(nrows):
+        indptr[row + 1] += indptr[row]
+    return {
+        "shape": list(shape),
+        "indptr": indptr,
+        "indices": [column for _, column, _ in triples],
+        "data": [value for _, _, value in triples],
+    }
+
+
 def _check_matrix(rows: list[list[float]], name: str) -> None:
     """Reject shapes Sage would only complain about obscurely, or not at all.
 
@@ -622,6 +813,147 @@ async def _evaluate_structured(
     return _exactify_large_ints(parsed)
 
 
+def _requested_operations(operation: str | list[str], allowed: Iterable[str]) -> list[str]:
+    """The operations a caller asked for, as a checked, de-duplicated list.
+
+    The *_operation tools take one name or a list of them. Every name is
+    checked before anything runs, so a typo in the fourth entry refuses the
+    call rather than arriving as a per-operation error after the first three
+    have been computed.
+    """
+    names = [operation] if isinstance(operation, str) else list(operation)
+    names = list(dict.fromkeys(name.strip() for name in names))
+    if not names:
+        raise ToolError("'operation' must name at least one operation")
+    allowed = list(allowed)
+    for name in names:
+        if name not in allowed:
+            raise ToolError(
+                f"Unknown operation '{name}'. Must be one of: {', '.join(sorted(allowed))}"
+            )
+    return names
+
+
+def _batched_operations(op_code: dict[str, str], operations: list[str]) -> str:
+    """Generated code running several operations against one constructed object.
+
+    The object (`_G`, `_E`, `M`, ...) is built once by code placed before this,
+    and each operation is wrapped in a function of its own: one that raises
+    records its error and the rest still run. The snippet's value is a dict of
+    results, errors and wall-clock milliseconds per operation.
+
+    An operation's code may span several lines -- is_convex defines helpers --
+    as long as the last line is the expression whose value is the answer.
+    """
+    lines = ["_batch_results = {}", "_batch_errors = {}", "_batch_timings = {}"]
+    for index, name in enumerate(operations):
+        *statements, value = op_code[name].strip().split("\n")
+        lines.append(f"def _batch_op_{index}():")
+        lines.extend(f"    {statement}" for statement in statements)
+        lines.append(f"    return {value}")
+        lines.extend([
+            "_batch_start = walltime()",
+            "try:",
+            f"    _batch_results[{_encode_literal(name)}] = _batch_op_{index}()",
+            "except Exception as _batch_exc:",
+            f"    _batch_errors[{_encode_literal(name)}] = str(_batch_exc) or repr(_batch_exc)",
+            f"_batch_timings[{_encode_literal(name)}] = round(1000 * walltime(_batch_start), 3)",
+        ])
+    lines.append(
+        "{'results': _batch_results, 'errors': _batch_errors, 'timings_ms': _batch_timings}"
+    )
+    return "\n".join(lines) + "\n"
+
+
+async def _run_operations(
+    session, setup: str, op_code: dict[str, str], operations: list[str], single: bool
+) -> dict:
+    """Evaluate one operation, or a batch of them, after *setup* builds the object.
+
+    *single* is whether the caller passed a bare string: that keeps the
+    long-standing ``{"operation", "result"}`` response, where a list gets
+    ``{"operations", "results", "errors", "timings_ms"}``.
+    """
+    if single:
+        result = await _evaluate_structured(session, setup + op_code[operations[0]] + "\n")
+        return {"operation": operations[0], "result": result}
+    batch = await _evaluate_structured(session, setup + _batched_operations(op_code, operations))
+    return {"operations": operations, **batch}
+
+
+# An object handle: what kind of object, then 48 random bits. The hyphen keeps a
+# handle from ever parsing as a Sage name, so a tool can tell one apart from the
+# description it stands in for.
+_HANDLE_RE = re.compile(r"^(?P<kind>graph|group|curve|code|ideal)-[0-9a-f]{12}$")
+
+# The dict in the worker namespace holding every kept object. Off the allowlist,
+# so caller code cannot name it; the binding line is what session.py watches for.
+_HANDLES = "_object_handles"
+
+
+def _object_handle(value, kind: str) -> str | None:
+    """*value* as a handle for a *kind* object, or None if it is not a handle."""
+    if not isinstance(value, str) or not (found := _HANDLE_RE.match(value.strip())):
+        return None
+    if found.group("kind") != kind:
+        raise ToolError(
+            f"'{value.strip()}' is a {found.group('kind')} handle; this tool takes a {kind}"
+        )
+    return value.strip()
+
+
+def _new_handle(kind: str) -> str:
+    # Handles only ever come from here or through _HANDLE_RE, so the helpers
+    # below quote them with json.dumps rather than screening them as input.
+    return f"{kind}-{secrets.token_hex(6)}"
+
+
+def _handle_store(handle: str, names: Iterable[str]) -> str:
+    """Generated code keeping the objects bound to *names* under *handle*.
+
+    The objects are kept, not their descriptions, so whatever Sage caches on
+    them -- a Groebner basis, an automorphism group, Mordell-Weil generators --
+    is still there for the next call.
+    """
+    kept = ", ".join(f"'{name}': {name}" for name in names)
+    return (
+        f"try:\n    {_HANDLES}\nexcept NameError:\n    {_HANDLES} = {{}}\n"
+        f"{_HANDLES}[{json.dumps(handle)}] = {{{kept}}}\n"
+    )
+
+
+def _handle_load(handle: str, names: Iterable[str]) -> str:
+    """Generated code rebinding *names* from the objects kept under *handle*."""
+    missing = (
+        f"no object {handle} in this session: handles do not survive a reset, "
+        "a restart or stop_sage_session"
+    )
+    lines = [
+        f"try:\n    {_HANDLES}\nexcept NameError:\n    {_HANDLES} = {{}}",
+        f"if {json.dumps(handle)} not in {_HANDLES}:",
+        f"    raise LookupError({json.dumps(missing)})",
+    ]
+    lines.extend(f"{name} = {_HANDLES}[{json.dumps(handle)}]['{name}']" for name in names)
+    return "\n".join(lines) + "\n"
+
+
+def _kept_object(
+    handle: str | None, keep: bool, kind: str, construct: str, names: list[str]
+) -> tuple[str, str | None]:
+    """Code binding *names*, and the handle the objects are kept under, if any.
+
+    With a handle the objects come out of the session and *construct* is not
+    used; otherwise *construct* builds them, and ``keep`` also stores them
+    under a fresh handle.
+    """
+    if handle is not None:
+        return _handle_load(handle, names), handle
+    if not keep:
+        return construct, None
+    handle = _new_handle(kind)
+    return construct + _handle_store(handle, names), handle
+
+
 # A plain Python identifier. Variable names are interpolated into generated code
 # inside single quotes, so anything else can close the literal and append code.
 _PLAIN_IDENTIFIER_RE = re.compile(r"^[A-Za-z_]\w*$")
@@ -743,3 +1075,86 @@ def _sage_prelude(extra_locals: Iterable[str] | None = None) -> str:
         _locals = _SymbolLocals({{name: var(name) for name in [{locals_list}]}})
         """
     )
+
+
+# Binary array output, for the tools that return many floats: the values come
+# back from the worker as one base64 line, which has to fit the 8 MiB stream
+# limit with room to spare. 5 MiB of raw values is ~650k doubles, or ~1.3M
+# float32. Name -> (little-endian NumPy type code, bytes per value).
+_ARRAY_MAX_BYTES = 5 * 1024 * 1024
+_ARRAY_DTYPES = {"float64": ("<f8", 8), "float32": ("<f4", 4)}
+
+
+def _array_type(dtype: str, count: int, advice: str) -> str:
+    """The NumPy type code for *count* values of *dtype*, within the size cap."""
+    if dtype not in _ARRAY_DTYPES:
+        raise ToolError(f"Unknown dtype '{dtype}'. Must be one of: float64, float32")
+    type_code, item_size = _ARRAY_DTYPES[dtype]
+    if count * item_size > _ARRAY_MAX_BYTES:
+        raise ToolError(
+            f"{count} {dtype} values are {count * item_size} bytes, over the "
+            f"{_ARRAY_MAX_BYTES}-byte limit; {advice}"
+        )
+    return type_code
+
+
+async def _solve(
+    scope: str,
+    session_name: str,
+    operation: str,
+    algorithm: str,
+    problem: str,
+    build: Callable[[str | None], str],
+) -> tuple[object, dict]:
+    """Run one symbolic operation under the caller's choice of algorithm.
+
+    *build* returns the snippet for an algorithm name, or for None, Sage's
+    default. 'default' and a named algorithm run in the caller's workspace;
+    'portfolio' and 'auto' run in the portfolio's workers. Returns the result
+    and what the response should add about how it was found.
+    """
+    algorithm = algorithm.strip()
+    names = ALGORITHMS[operation]
+    if algorithm not in ("default", "portfolio", "auto", *names):
+        raise ToolError(
+            f"Unknown algorithm '{algorithm}' for {operation}. Must be one of: "
+            f"default, portfolio, auto, {', '.join(names)}"
+        )
+    if algorithm == "default" or algorithm in names:
+        session = await runtime.resolve_session(scope, session_name)
+        result = await _evaluate_structured(
+            session, build(None if algorithm == "default" else algorithm)
+        )
+        return result, ({} if algorithm == "default" else {"algorithm": algorithm})
+    portfolio = runtime.PORTFOLIO
+    racers = portfolio.available(operation)
+    if not racers:
+        raise ToolError(
+            f"No portfolio algorithms are configured for {operation}; "
+            "see SAGEMATH_MCP_PORTFOLIO_ALGORITHMS"
+        )
+
+    async def run(worker, name: str) -> object:
+        return await _evaluate_structured(worker, build(name))
+
+    routed = None
+    favourite = portfolio.winner(problem) if algorithm == "auto" else None
+    if favourite in racers:
+        # A race of one, so the favourite runs in its own worker; if it fails
+        # or hands the problem back, the others race as usual.
+        with contextlib.suppress(PortfolioError):
+            routed = await portfolio.race(operation, problem, [favourite], run)
+        if routed is not None and is_answer(operation, routed.result):
+            return routed.result, {"algorithm": favourite, "routed": True}
+        racers = [name for name in racers if name != favourite]
+    race = None
+    try:
+        if racers:
+            race = await portfolio.race(operation, problem, racers, run)
+    except PortfolioError as exc:
+        if routed is None:
+            raise ToolError(str(exc)) from exc
+    race = race or routed
+    if race is None:
+        raise ToolError(f"Every algorithm failed for {operation}")
+    return race.result, {"algorithm": race.algorithm, "raced": race.raced}
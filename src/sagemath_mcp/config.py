@@ -46,6 +46,26 @@ class SageSettings:
     force_python_worker: bool = False
     persist_sessions: bool = False
     persist_dir: str = ""
+    render_workers: int = 2
+    plot_cache_entries: int = 256
+    plot_cache_dir: str = ""
+    artifact_ttl: float = 900.0
+    artifact_max_bytes: int = 256 * 1024 * 1024
+    plot_max_bytes: int = 8 * 1024 * 1024
+    portfolio_algorithms: str = "maxima,sympy,giac,fricas"
+    portfolio_prewarm: bool = False
+    # Half the cores by default: the workspaces and the render pool need the rest.
+    parallel_workers: int = max(1, (os.cpu_count() or 2) // 2)
+    job_workers: int = 2
+    job_timeout: float = 3600.0
+    job_queue_limit: int = 32
+    job_results: int = 256
+    job_ttl: float = 86_400.0
+    # Recycle a workspace's worker after this many evaluations, this many
+    # seconds, or this much resident-memory growth in MiB; 0 turns each off.
+    recycle_max_evaluations: int = 0
+    recycle_max_age: float = 0.0
+    recycle_max_rss_growth_mb: float = 0.0
 
     @classmethod
     def from_env(cls) -> SageSettings:
@@ -70,6 +90,47 @@ class SageSettings:
             persist_dir=os.getenv(
                 "SAGEMATH_MCP_PERSIST_DIR", defaults["persist_dir"]
             ),
+            render_workers=_int_from_env(
+                "SAGEMATH_MCP_RENDER_WORKERS", defaults["render_workers"]
+            ),
+            plot_cache_entries=_int_from_env(
+                "SAGEMATH_MCP_PLOT_CACHE_ENTRIES", defaults["plot_cache_entries"]
+            ),
+            plot_cache_dir=os.getenv(
+                "SAGEMATH_MCP_PLOT_CACHE_DIR", defaults["plot_cache_dir"]
+            ),
+            artifact_ttl=_float_from_env("SAGEMATH_MCP_ARTIFACT_TTL", defaults["artifact_ttl"]),
+            artifact_max_bytes=_int_from_env(
+                "SAGEMATH_MCP_ARTIFACT_MAX_BYTES", defaults["artifact_max_bytes"]
+            ),
+            plot_max_bytes=_int_from_env(
+                "SAGEMATH_MCP_PLOT_MAX_BYTES", defaults["plot_max_bytes"]
+            ),
+            portfolio_algorithms=os.getenv(
+                "SAGEMATH_MCP_PORTFOLIO_ALGORITHMS", defaults["portfolio_algorithms"]
+            ),
+            portfolio_prewarm=_bool_from_env(
+                "SAGEMATH_MCP_PORTFOLIO_PREWARM", defaults["portfolio_prewarm"]
+            ),
+            parallel_workers=_int_from_env(
+                "SAGEMATH_MCP_PARALLEL_WORKERS", defaults["parallel_workers"]
+            ),
+            job_workers=_int_from_env("SAGEMATH_MCP_JOB_WORKERS", defaults["job_workers"]),
+            job_timeout=_float_from_env("SAGEMATH_MCP_JOB_TIMEOUT", defaults["job_timeout"]),
+            job_queue_limit=_int_from_env(
+                "SAGEMATH_MCP_JOB_QUEUE_LIMIT", defaults["job_queue_limit"]
+            ),
+            job_results=_int_from_env("SAGEMATH_MCP_JOB_RESULTS", defaults["job_results"]),
+            job_ttl=_float_from_env("SAGEMATH_MCP_JOB_TTL", defaults["job_ttl"]),
+            recycle_max_evaluations=_int_from_env(
+                "SAGEMATH_MCP_RECYCLE_MAX_EVALUATIONS", defaults["recycle_max_evaluations"]
+            ),
+            recycle_max_age=_float_from_env(
+                "SAGEMATH_MCP_RECYCLE_MAX_AGE", defaults["recycle_max_age"]
+            ),
+            recycle_max_rss_growth_mb=_float_from_env(
+                "SAGEMATH_MCP_RECYCLE_MAX_RSS_GROWTH_MB", defaults["recycle_max_rss_growth_mb"]
+            ),
         )
 
 
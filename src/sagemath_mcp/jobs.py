@@ -0,0 +1,249 @@
+"""Background jobs: Sage code that outlives the tool call that submitted it.
+
+A tool call holds its MCP request open until the worker answers, so it is bound
+by ``eval_timeout`` and dies with the connection. A job is handed to a worker
+of its own -- a fresh one, or a fork of a workspace as it stood at submission --
+and the submitting call returns at once with a job id. The job then runs under
+its own, much longer, budget, and its outcome waits here to be polled.
+
+The job id is the credential, as an artifact id is on the HTTP route: 128
+random bits, never listed. That is what lets a client that reconnected, and so
+has a new MCP session id, still fetch the result.
+
+At most ``job_workers`` jobs run at once; the rest wait in order, up to
+``job_queue_limit``. Finished jobs are kept for ``job_ttl`` seconds and at most
+``job_results`` of them, the oldest dropped first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import secrets
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from . import monitoring
+from .config import DEFAULT_SETTINGS, SageSettings
+from .session import SageEvaluationError, SageProcessError, SageSession
+
+LOGGER = logging.getLogger(__name__)
+
+FINISHED = frozenset({"succeeded", "failed", "cancelled"})
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job is submitted while the queue is at its limit."""
+
+
+@dataclass(slots=True)
+class Job:
+    job_id: str
+    owner: str
+    code: str
+    timeout: float
+    want_latex: bool
+    capture_stdout: bool
+    # The workspace the worker was forked from; None for a fresh worker.
+    source: str | None
+    submitted_at: float
+    status: str = "queued"
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict | None = None
+    error: str | None = None
+    worker: SageSession | None = field(default=None, repr=False)
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def runtime_ms(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return ((self.finished_at or time.time()) - self.started_at) * 1000
+
+    def describe(self) -> dict:
+        """What the job tools return: the state, and the outcome once there is one."""
+        described = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "source": self.source,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "runtime_ms": round(self.runtime_ms, 1),
+        }
+        if self.result is not None:
+            described["result"] = self.result
+        if self.error is not None:
+            described["error"] = self.error
+        return described
+
+
+class JobManager:
+    """Queued and running jobs, and the outcomes of finished ones."""
+
+    def __init__(self, settings: SageSettings | None = None):
+        self.settings = settings or DEFAULT_SETTINGS
+        self.capacity = max(1, self.settings.job_workers)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: deque[Job] = deque()
+        self._running: dict[str, Job] = {}
+
+    def full(self) -> bool:
+        return len(self._queue) >= self.settings.job_queue_limit
+
+    def submit(
+        self,
+        owner: str,
+        code: str,
+        *,
+        timeout: float,
+        want_latex: bool = False,
+        capture_stdout: bool = True,
+        worker: SageSession | None = None,
+        source: str | None = None,
+    ) -> Job:
+        """Queue *code*; *worker* is the fork to run it in, or None for a fresh worker.
+
+        Raises JobQueueFull when the queue is at its limit; the caller still
+        owns *worker* then.
+        """
+        self._expire()
+        if self.full():
+            raise JobQueueFull(
+                f"The job queue is full ({self.settings.job_queue_limit} waiting)"
+            )
+        job = Job(
+            job_id=secrets.token_hex(16),
+            owner=owner,
+            code=code,
+            timeout=timeout,
+            want_latex=want_latex,
+            capture_stdout=capture_stdout,
+            source=source,
+            submitted_at=time.time(),
+            worker=worker,
+        )
+        self._jobs[job.job_id] = job
+        self._queue.append(job)
+        monitoring.record_job_submitted()
+        self._dispatch()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Stop a job, queued or running. A finished job is returned as it is."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if job.status == "queued":
+            self._queue.remove(job)
+            await self._release(job)
+            self._finish(job, "cancelled", error="Cancelled before it started")
+            return job
+        assert job.task is not None
+        job.task.cancel()
+        await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    def _dispatch(self) -> None:
+        while self._queue and len(self._running) < self.capacity:
+            job = self._queue.popleft()
+            job.status = "running"
+            job.started_at = time.time()
+            self._running[job.job_id] = job
+            job.task = asyncio.create_task(self._run(job))
+        monitoring.record_job_queue(len(self._queue), len(self._running))
+
+    async def _run(self, job: Job) -> None:
+        if job.worker is None:
+            job.worker = SageSession(f"job-{job.job_id}", self.settings, keep_journal=False)
+        try:
+            outcome = await job.worker.evaluate(
+                job.code,
+                want_latex=job.want_latex,
+                capture_stdout=job.capture_stdout,
+                timeout_seconds=job.timeout,
+            )
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled", error="Cancelled while running")
+            raise
+        except SageEvaluationError as exc:
+            self._finish(job, "failed", error=exc.args[0])
+        except (TimeoutError, SageProcessError) as exc:
+            self._finish(job, "failed", error=str(exc) or type(exc).__name__)
+        except Exception as exc:
+            # A worker that cannot spawn, say. Left unfinished, the job would
+            # read "running" forever and never expire.
+            LOGGER.warning("Background job failed unexpectedly", exc_info=True)
+            self._finish(job, "failed", error=f"{type(exc).__name__}: {exc}")
+        else:
+            self._finish(
+                job,
+                "succeeded",
+                result={
+                    "result_type": outcome.result_type,
+                    "result": outcome.result,
+                    "latex": outcome.latex,
+                    "stdout": self._clip(outcome.stdout),
+                    "elapsed_ms": outcome.elapsed_ms,
+                },
+            )
+        finally:
+            # The slot is free as soon as the outcome is known; shutting the
+            # worker down is no reason to keep the next job waiting.
+            self._running.pop(job.job_id, None)
+            self._dispatch()
+            await self._release(job)
+
+    def _clip(self, stdout: str) -> str:
+        # Kept for hours, so held to the same limit a tool call's stdout is.
+        limit = self.settings.max_stdout_chars
+        if len(stdout) <= limit:
+            return stdout
+        return stdout[:limit] + "\n… [output truncated]"
+
+    def _finish(
+        self, job: Job, status: str, *, result: dict | None = None, error: str | None = None
+    ) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        job.result = result
+        job.error = error
+        monitoring.record_job_finished(
+            status, job.runtime_ms if job.started_at is not None else None
+        )
+        self._expire()
+
+    async def _release(self, job: Job) -> None:
+        worker, job.worker = job.worker, None
+        if worker is not None:
+            with contextlib.suppress(Exception):
+                await worker.shutdown()
+
+    def _expire(self) -> None:
+        """Drop finished jobs past their TTL, then the oldest beyond the result bound."""
+        cutoff = time.time() - self.settings.job_ttl
+        finished = [job for job in self._jobs.values() if job.status in FINISHED]
+        for job in finished:
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job.job_id]
+        finished = [job for job in finished if job.job_id in self._jobs]
+        for job in finished[: max(0, len(finished) - self.settings.job_results)]:
+            del self._jobs[job.job_id]
+
+    async def shutdown(self) -> None:
+        queued, self._queue = list(self._queue), deque()
+        for job in queued:
+            await self._release(job)
+            self._finish(job, "cancelled", error="Server shut down")
+        tasks = [job.task for job in self._running.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        monitoring.record_job_queue(0, 0)
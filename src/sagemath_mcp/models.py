@@ -26,6 +26,33 @@ class EvaluateRequest(BaseModel):
     )
 
 
+class CallUsage(BaseModel):
+    """Where one evaluation's time and resources went."""
+
+    phases_ms: dict[str, float] = Field(
+        default_factory=dict,
+        description=(
+            "Milliseconds in the worker by phase: preparse, validate, compile, execute, "
+            "format, latex."
+        ),
+    )
+    cpu_user_ms: float | None = Field(
+        default=None, description="Worker CPU time in user mode, in milliseconds."
+    )
+    cpu_system_ms: float | None = Field(
+        default=None, description="Worker CPU time in the kernel, in milliseconds."
+    )
+    peak_rss_delta_kb: int | None = Field(
+        default=None, description="How far the call raised the worker's peak resident memory, KiB."
+    )
+    queue_wait_ms: float = Field(
+        default=0.0, description="Time spent waiting for the workspace's earlier requests."
+    )
+    transport_ms: float = Field(
+        default=0.0, description="Round trip to the worker, less the worker's own time."
+    )
+
+
 class EvaluateResult(BaseModel):
     result_type: Literal["expression", "statement"]
     result: str | None = Field(
@@ -43,12 +70,23 @@ class EvaluateResult(BaseModel):
     elapsed_ms: float = Field(
         ..., description="Wall-clock execution time in milliseconds."
     )
+    usage: CallUsage | None = Field(
+        default=None,
+        description="CPU, memory and per-phase timing, when include_usage was requested.",
+    )
 
 
 class ResetResponse(BaseModel):
     message: str = Field(default="Session cleared")
 
 
+class ForkResponse(ResetResponse):
+    method: Literal["fork", "replay"] = Field(
+        description="'fork' for a copy-on-write fork, 'replay' when the journal was replayed"
+    )
+    elapsed_ms: float
+
+
 class SessionSnapshot(BaseModel):
     """Diagnostic snapshot stored inside the state resource."""
 
@@ -57,6 +95,18 @@ class SessionSnapshot(BaseModel):
     started_at: float
     last_used_at: float
     idle_seconds: float
+    queued: int = Field(default=0, description="Requests running or waiting on the worker.")
+
+
+class LatencySummary(BaseModel):
+    """One tool's latencies for one outcome, read off fixed log-scale buckets."""
+
+    count: int = 0
+    p50_ms: float = 0.0
+    p90_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    total_ms: float = 0.0
 
 
 class MonitoringSnapshot(BaseModel):
@@ -76,6 +126,31 @@ class MonitoringSnapshot(BaseModel):
     avg_elapsed_ms: float
     max_elapsed_ms: float
     last_run_at: float | None = None
+    plot_cache_hits: int = 0
+    plot_cache_misses: int = 0
+    plot_cache_hit_ratio: float = 0.0
+    portfolio_wins: dict[str, dict[str, int]] = {}
+    jobs_queued: int = 0
+    jobs_running: int = 0
+    jobs_submitted: int = 0
+    jobs_finished: dict[str, int] = {}
+    job_avg_runtime_ms: float = 0.0
+    job_max_runtime_ms: float = 0.0
+    startup_waits: int = 0
+    startup_avg_wait_ms: float = 0.0
+    startup_max_wait_ms: float = 0.0
+    workers_recycled: dict[str, int] = {}
+    recycle_failures: int = 0
+    recycle_avg_restore_ms: float = 0.0
+    recycle_max_restore_ms: float = 0.0
+    accounted_evaluations: int = 0
+    avg_phase_ms: dict[str, float] = {}
+    avg_cpu_user_ms: float = 0.0
+    avg_cpu_system_ms: float = 0.0
+    max_peak_rss_delta_kb: int = 0
+    worker_events: dict[str, int] = {}
+    # tool -> outcome ("ok", "error", "cancelled") -> latency summary.
+    tool_latency: dict[str, dict[str, LatencySummary]] = {}
 
 
 class DocumentationLink(BaseModel):
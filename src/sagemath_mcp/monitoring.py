@@ -2,9 +2,83 @@
 
 from __future__ import annotations
 
+import bisect
+import math
 import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
+
+# Upper bounds of the latency buckets, in ms: 0.5 ms doubling up to about 70
+# minutes, with one more bucket for anything longer. Fixed rather than fitted
+# to the data, so two histograms -- two tools, two moments, two replicas --
+# always line up bucket for bucket.
+LATENCY_BUCKETS_MS: tuple[float, ...] = tuple(0.5 * 2**power for power in range(24))
+
+# What a worker can go through, counted by record_worker_event.
+WORKER_EVENTS = ("starts", "restarts", "timeouts", "interrupts", "journal_replays")
+
+
+class LatencyHistogram:
+    """Latencies counted in LATENCY_BUCKETS_MS, recorded without taking a lock.
+
+    This sits on every tool call, so recording is a bisect and three updates
+    to a list only the recording thread writes: each thread has its own shard,
+    and a reader merges them. Quantiles are read off the buckets, so they are
+    accurate to within one bucket -- a factor of two -- and capped at the exact
+    maximum.
+    """
+
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        # thread id -> per-bucket counts, then the sum and the max.
+        self._shards: dict[int, list[float]] = {}
+
+    def record(self, elapsed_ms: float) -> None:
+        thread = threading.get_ident()
+        shard = self._shards.get(thread)
+        if shard is None:
+            # setdefault is atomic, so two first records cannot both win.
+            shard = self._shards.setdefault(thread, [0] * (len(LATENCY_BUCKETS_MS) + 3))
+        shard[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        shard[-2] += elapsed_ms
+        if elapsed_ms > shard[-1]:
+            shard[-1] = elapsed_ms
+
+    def merged(self) -> tuple[list[int], float, float]:
+        """Per-bucket counts (the last one unbounded), the sum and the max, over every shard."""
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        total = peak = 0.0
+        for shard in list(self._shards.values()):
+            for index in range(len(counts)):
+                counts[index] += int(shard[index])
+            total += shard[-2]
+            peak = max(peak, shard[-1])
+        return counts, total, peak
+
+    def summary(self) -> dict:
+        counts, total, peak = self.merged()
+        count = sum(counts)
+
+        def quantile(q: float) -> float:
+            if not count:
+                return 0.0
+            rank, seen = math.ceil(q * count), 0
+            for index, bucket in enumerate(counts[:-1]):
+                seen += bucket
+                if seen >= rank:
+                    return min(LATENCY_BUCKETS_MS[index], peak)
+            return peak
+
+        return {
+            "count": count,
+            "p50_ms": quantile(0.5),
+            "p90_ms": quantile(0.9),
+            "p99_ms": quantile(0.99),
+            "max_ms": peak,
+            "total_ms": total,
+        }
 
 
 @dataclass(slots=True)
@@ -19,10 +93,44 @@ class EvaluationMetrics:
     last_error: str | None = None
     last_security_violation: str | None = None
     last_error_details: str | None = None
+    plot_cache_hits: int = 0
+    plot_cache_misses: int = 0
+    # operation -> algorithm -> races won. By operation only: a problem class
+    # names functions from a caller's expression.
+    portfolio_wins: dict[str, dict[str, int]] = field(default_factory=dict)
+    jobs_queued: int = 0
+    jobs_running: int = 0
+    jobs_submitted: int = 0
+    # status -> jobs that ended in it: succeeded, failed or cancelled.
+    jobs_finished: dict[str, int] = field(default_factory=dict)
+    # Jobs that reached a worker; one cancelled in the queue has no runtime.
+    jobs_run: int = 0
+    job_total_runtime_ms: float = 0.0
+    job_max_runtime_ms: float = 0.0
+    # Calls that waited for their workspace's worker to start and restore.
+    startup_waits: int = 0
+    startup_total_wait_ms: float = 0.0
+    startup_max_wait_ms: float = 0.0
+    # reason -> workers recycled for it: evaluations, age or memory.
+    workers_recycled: dict[str, int] = field(default_factory=dict)
+    recycle_failures: int = 0
+    recycle_total_restore_ms: float = 0.0
+    recycle_max_restore_ms: float = 0.0
+    # Per-call accounting, summed over every worker evaluation that reported it.
+    accounted_evaluations: int = 0
+    # phase -> total ms: the worker's phases plus queue_wait and transport.
+    phase_total_ms: dict[str, float] = field(default_factory=dict)
+    cpu_user_total_ms: float = 0.0
+    cpu_system_total_ms: float = 0.0
+    max_peak_rss_delta_kb: int = 0
+    worker_events: dict[str, int] = field(default_factory=lambda: dict.fromkeys(WORKER_EVENTS, 0))
 
     def snapshot(self) -> dict:
         # NOTE: Average latency is computed lazily so it never divides by zero.
         avg_elapsed = self.total_elapsed_ms / self.successes if self.successes else 0.0
+        lookups = self.plot_cache_hits + self.plot_cache_misses
+        recycled = sum(self.workers_recycled.values())
+        accounted = self.accounted_evaluations
         return {
             "attempts": self.attempts,
             "successes": self.successes,
@@ -34,6 +142,38 @@ class EvaluationMetrics:
             "last_error": self.last_error,
             "last_security_violation": self.last_security_violation,
             "last_error_details": self.last_error_details,
+            "plot_cache_hits": self.plot_cache_hits,
+            "plot_cache_misses": self.plot_cache_misses,
+            "plot_cache_hit_ratio": self.plot_cache_hits / lookups if lookups else 0.0,
+            "portfolio_wins": {op: dict(wins) for op, wins in self.portfolio_wins.items()},
+            "jobs_queued": self.jobs_queued,
+            "jobs_running": self.jobs_running,
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_finished": dict(self.jobs_finished),
+            "job_avg_runtime_ms": (
+                self.job_total_runtime_ms / self.jobs_run if self.jobs_run else 0.0
+            ),
+            "job_max_runtime_ms": self.job_max_runtime_ms,
+            "startup_waits": self.startup_waits,
+            "startup_avg_wait_ms": (
+                self.startup_total_wait_ms / self.startup_waits if self.startup_waits else 0.0
+            ),
+            "startup_max_wait_ms": self.startup_max_wait_ms,
+            "workers_recycled": dict(self.workers_recycled),
+            "recycle_failures": self.recycle_failures,
+            "recycle_avg_restore_ms": (
+                self.recycle_total_restore_ms / recycled if recycled else 0.0
+            ),
+            "recycle_max_restore_ms": self.recycle_max_restore_ms,
+            "accounted_evaluations": accounted,
+            "avg_phase_ms": {
+                phase: total / accounted for phase, total in self.phase_total_ms.items()
+            },
+            "avg_cpu_user_ms": self.cpu_user_total_ms / accounted if accounted else 0.0,
+            "avg_cpu_system_ms": self.cpu_system_total_ms / accounted if accounted else 0.0,
+            "max_peak_rss_delta_kb": self.max_peak_rss_delta_kb,
+            "worker_events": dict(self.worker_events),
+            "tool_latency": tool_latency(),
         }
 
     def reset(self) -> None:
@@ -47,10 +187,39 @@ class EvaluationMetrics:
         self.last_error = None
         self.last_security_violation = None
         self.last_error_details = None
+        self.plot_cache_hits = 0
+        self.plot_cache_misses = 0
+        self.portfolio_wins = {}
+        self.jobs_queued = 0
+        self.jobs_running = 0
+        self.jobs_submitted = 0
+        self.jobs_finished = {}
+        self.jobs_run = 0
+        self.job_total_runtime_ms = 0.0
+        self.job_max_runtime_ms = 0.0
+        self.startup_waits = 0
+        self.startup_total_wait_ms = 0.0
+        self.startup_max_wait_ms = 0.0
+        self.workers_recycled = {}
+        self.recycle_failures = 0
+        self.recycle_total_restore_ms = 0.0
+        self.recycle_max_restore_ms = 0.0
+        self.accounted_evaluations = 0
+        self.phase_total_ms = {}
+        self.cpu_user_total_ms = 0.0
+        self.cpu_system_total_ms = 0.0
+        self.max_peak_rss_delta_kb = 0
+        self.worker_events = dict.fromkeys(WORKER_EVENTS, 0)
 
 
 _METRICS = EvaluationMetrics()
 _LOCK = threading.Lock()
+# (tool, outcome) -> latencies. Outside _METRICS and its lock on purpose: see
+# LatencyHistogram.
+_TOOL_LATENCY: dict[tuple[str, str], LatencyHistogram] = {}
+# Recent event-loop lag samples in seconds, newest last: about a minute's worth
+# at the sampling interval app.py uses.
+_LOOP_LAG: deque[float] = deque(maxlen=120)
 
 
 def record_success(elapsed_ms: float) -> None:
@@ -77,6 +246,122 @@ def record_failure(message: str, *, is_security: bool = False, details: str | No
         _METRICS.last_error_details = details or message
 
 
+def record_plot_cache(hit: bool) -> None:
+    """Count one lookup of a cacheable plot in the plot cache."""
+    with _LOCK:
+        if hit:
+            _METRICS.plot_cache_hits += 1
+        else:
+            _METRICS.plot_cache_misses += 1
+
+
+def record_portfolio_win(operation: str, algorithm: str) -> None:
+    """Count one race won by *algorithm*."""
+    with _LOCK:
+        wins = _METRICS.portfolio_wins.setdefault(operation, {})
+        wins[algorithm] = wins.get(algorithm, 0) + 1
+
+
+def record_job_submitted() -> None:
+    with _LOCK:
+        _METRICS.jobs_submitted += 1
+
+
+def record_job_finished(status: str, runtime_ms: float | None) -> None:
+    """Count one job that ended as *status*; *runtime_ms* is None if it never started."""
+    with _LOCK:
+        _METRICS.jobs_finished[status] = _METRICS.jobs_finished.get(status, 0) + 1
+        if runtime_ms is None:
+            return
+        _METRICS.jobs_run += 1
+        _METRICS.job_total_runtime_ms += float(runtime_ms)
+        if runtime_ms > _METRICS.job_max_runtime_ms:
+            _METRICS.job_max_runtime_ms = float(runtime_ms)
+
+
+def record_job_queue(queued: int, running: int) -> None:
+    """Set the current queue depth and the number of jobs on a worker."""
+    with _LOCK:
+        _METRICS.jobs_queued = queued
+        _METRICS.jobs_running = running
+
+
+def record_startup_wait(wait_ms: float) -> None:
+    """Count one call that waited *wait_ms* for its workspace's worker to be ready."""
+    with _LOCK:
+        _METRICS.startup_waits += 1
+        _METRICS.startup_total_wait_ms += float(wait_ms)
+        if wait_ms > _METRICS.startup_max_wait_ms:
+            _METRICS.startup_max_wait_ms = float(wait_ms)
+
+
+def record_recycle(reason: str, restore_ms: float | None) -> None:
+    """Count one worker recycled for *reason*; *restore_ms* is None if the recycle failed."""
+    with _LOCK:
+        if restore_ms is None:
+            _METRICS.recycle_failures += 1
+            return
+        _METRICS.workers_recycled[reason] = _METRICS.workers_recycled.get(reason, 0) + 1
+        _METRICS.recycle_total_restore_ms += float(restore_ms)
+        if restore_ms > _METRICS.recycle_max_restore_ms:
+            _METRICS.recycle_max_restore_ms = float(restore_ms)
+
+
+def record_usage(usage: dict) -> None:
+    """Add one evaluation's accounting (see SageSession.evaluate) to the totals."""
+    with _LOCK:
+        _METRICS.accounted_evaluations += 1
+        phases = dict(usage.get("phases_ms") or {})
+        phases["queue_wait"] = usage.get("queue_wait_ms") or 0.0
+        phases["transport"] = usage.get("transport_ms") or 0.0
+        for phase, ms in phases.items():
+            _METRICS.phase_total_ms[phase] = _METRICS.phase_total_ms.get(phase, 0.0) + float(ms)
+        _METRICS.cpu_user_total_ms += float(usage.get("cpu_user_ms") or 0.0)
+        _METRICS.cpu_system_total_ms += float(usage.get("cpu_system_ms") or 0.0)
+        peak = int(usage.get("peak_rss_delta_kb") or 0)
+        if peak > _METRICS.max_peak_rss_delta_kb:
+            _METRICS.max_peak_rss_delta_kb = peak
+
+
+def record_tool_call(tool: str, outcome: str, elapsed_ms: float) -> None:
+    """Add one call of *tool* that ended as *outcome* ("ok", "error", "cancelled")."""
+    key = (tool, outcome)
+    histogram = _TOOL_LATENCY.get(key)
+    if histogram is None:
+        histogram = _TOOL_LATENCY.setdefault(key, LatencyHistogram())
+    histogram.record(float(elapsed_ms))
+
+
+def tool_latency_histograms() -> dict[tuple[str, str], LatencyHistogram]:
+    """The live histograms by (tool, outcome), for exporters that want the buckets."""
+    return dict(_TOOL_LATENCY)
+
+
+def tool_latency() -> dict[str, dict[str, dict]]:
+    """Latency summaries by tool, then outcome."""
+    summaries: dict[str, dict[str, dict]] = {}
+    for (tool, outcome), histogram in sorted(tool_latency_histograms().items()):
+        summaries.setdefault(tool, {})[outcome] = histogram.summary()
+    return summaries
+
+
+def record_loop_lag(seconds: float) -> None:
+    """Add one sample of how late the event loop woke a sleeping task."""
+    _LOOP_LAG.append(max(0.0, float(seconds)))
+
+
+def loop_lag() -> tuple[float, float]:
+    """The latest event-loop lag sample and the largest recent one, in seconds."""
+    samples = list(_LOOP_LAG)
+    return (samples[-1], max(samples)) if samples else (0.0, 0.0)
+
+
+def record_worker_event(event: str) -> None:
+    """Count one of WORKER_EVENTS."""
+    with _LOCK:
+        _METRICS.worker_events[event] = _METRICS.worker_events.get(event, 0) + 1
+
+
 def snapshot() -> dict:
     with _LOCK:
         return _METRICS.snapshot()
@@ -100,11 +385,13 @@ def public_snapshot() -> dict:
     resource, so the redaction travels with the data.
     """
     data = snapshot()
-    for field in _CLIENT_TEXT_FIELDS:
-        data.pop(field, None)
+    for name in _CLIENT_TEXT_FIELDS:
+        data.pop(name, None)
     return data
 
 
 def reset_metrics() -> None:
     with _LOCK:
         _METRICS.reset()
+    _TOOL_LATENCY.clear()
+    _LOOP_LAG.clear()
@@ -0,0 +1,82 @@
+"""A pool of spare Sage workers for fanning one computation out across cores.
+
+A workspace is one worker, so a sweep of a function over hundreds of inputs
+runs on one core however many the machine has. ``parallel_map`` borrows
+workers from here instead, rebuilds the caller's namespace in each by replaying
+the workspace journal, and hands the inputs out one at a time.
+
+The pool's size is the server-wide budget for this kind of work: every
+``parallel_map`` in flight shares it, and a call that finds every worker lent
+out waits for the first one back rather than starting more processes. Workers
+stay warm between calls and are reset when returned: the namespace is rebuilt
+and every ``assume()`` forgotten, so the next caller sees neither the last
+one's variables nor its assumptions. State Sage keeps for itself across the
+process -- its caches, the random generator -- is not cleared; a journal that
+relies on it being fresh should seed or clear it itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+
+from .config import DEFAULT_SETTINGS, SageSettings
+from .session import SageSession
+
+LOGGER = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """At most ``size`` workers, lent out in groups and reset when returned."""
+
+    def __init__(self, settings: SageSettings | None = None):
+        self.settings = settings or DEFAULT_SETTINGS
+        self.size = max(1, self.settings.parallel_workers)
+        self._workers: list[SageSession] = []
+        self._idle: asyncio.Queue[SageSession] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _idle_queue(self) -> asyncio.Queue[SageSession]:
+        # Bound to the loop that made it, as RenderPool's queue is, and for the
+        # same reason: only tests run more than one loop.
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop:
+            self._workers = [
+                SageSession(f"parallel-{index}", self.settings, keep_journal=False)
+                for index in range(self.size)
+            ]
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+            self._loop = loop
+        return self._idle
+
+    async def acquire(self, count: int) -> list[SageSession]:
+        """Up to *count* workers: waits for the first, then takes whatever else is idle."""
+        idle = self._idle_queue()
+        workers = [await idle.get()]
+        while len(workers) < count and not idle.empty():
+            workers.append(idle.get_nowait())
+        return workers
+
+    async def release(self, workers: list[SageSession]) -> None:
+        """Reset each worker and put it back; one that will not reset is stopped."""
+        idle = self._idle_queue()
+        for worker in workers:
+            if worker.is_alive():
+                try:
+                    await worker.reset()
+                except Exception as exc:
+                    # A fresh process on next use is cheaper than a namespace
+                    # that might still hold the last caller's state.
+                    LOGGER.warning("Could not reset %s, stopping it: %s", worker.session_id, exc)
+                    with contextlib.suppress(Exception):
+                        await worker.shutdown()
+            idle.put_nowait(worker)
+
+    async def shutdown(self) -> None:
+        workers, self._workers = self._workers, []
+        self._idle = None
+        self._loop = None
+        await asyncio.gather(*(worker.shutdown() for worker in workers), return_exceptions=True)
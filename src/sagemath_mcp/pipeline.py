@@ -0,0 +1,191 @@
+"""Pipelines: a chain of tool calls, with references between them, in one request.
+
+Define an expression, differentiate it, simplify the derivative, evaluate it at
+a point: four tool calls, and for an agent four round-trips with a model turn
+between each. A pipeline sends them together. Each step names a tool and its
+arguments, and an argument may refer to an earlier step's result as
+``${id}`` -- or to one field of it, ``${id.derivative}``. A string that is
+exactly one reference takes the value as it is; a reference inside a longer
+string is interpolated as text.
+
+Steps run as soon as what they depend on has finished: the steps they refer
+to, the steps they list in ``needs``, and the previous step in the same
+workspace. A worker runs one thing at a time, so steps in one workspace keep
+their order, and steps in different workspaces run side by side. References
+may only point backwards, which is what keeps the graph acyclic.
+
+A step that fails does not stop the rest. The steps that depend on it are
+skipped, and everything else runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+_STEP_ID_RE = re.compile(r"^[A-Za-z_][\w-]{0,63}$")
+_REFERENCE_RE = re.compile(r"\$\{([A-Za-z_][\w-]*)((?:\.[\w-]+)*)\}")
+_STEP_KEYS = {"id", "tool", "args", "needs"}
+
+
+class PipelineError(ValueError):
+    """Raised for a pipeline that cannot run as written."""
+
+
+@dataclass(slots=True)
+class Step:
+    id: str
+    tool: str
+    args: dict
+    # Steps whose results this one needs: a failure there skips this one.
+    needs: list[str] = field(default_factory=list)
+    # Steps that merely have to finish first: `needs`, plus the previous step
+    # in the same workspace.
+    after: list[str] = field(default_factory=list)
+
+
+def _references(value: object) -> set[str]:
+    if isinstance(value, str):
+        return {match.group(1) for match in _REFERENCE_RE.finditer(value)}
+    if isinstance(value, dict):
+        return set().union(*(_references(item) for item in value.values()))
+    if isinstance(value, list):
+        return set().union(*(_references(item) for item in value))
+    return set()
+
+
+def parse_steps(
+    raw: list[dict], workspace_of: Callable[[str, dict], str | None], max_steps: int
+) -> list[Step]:
+    """Check *raw* and work out each step's dependencies.
+
+    *workspace_of(tool, args)* names the workspace a step runs in, or None for
+    a step that uses none. Raises PipelineError for anything malformed.
+    """
+    if not 1 <= len(raw) <= max_steps:
+        raise PipelineError(f"A pipeline has between 1 and {max_steps} steps")
+    steps: list[Step] = []
+    seen: set[str] = set()
+    last_in: dict[str, str] = {}
+    for index, entry in enumerate(raw):
+        if not isinstance(entry, dict):
+            raise PipelineError(f"Step {index} is not an object")
+        unknown = set(entry) - _STEP_KEYS
+        if unknown:
+            raise PipelineError(f"Step {index} has unknown keys: {', '.join(sorted(unknown))}")
+        step_id = entry.get("id", f"step{index}")
+        if not isinstance(step_id, str) or not _STEP_ID_RE.match(step_id):
+            raise PipelineError(f"Step {index} needs an 'id' made of letters, digits, _ and -")
+        if step_id in seen:
+            raise PipelineError(f"Step id '{step_id}' is used twice")
+        tool = entry.get("tool")
+        if not isinstance(tool, str) or not tool:
+            raise PipelineError(f"Step '{step_id}' needs a 'tool'")
+        args = entry.get("args", {})
+        if not isinstance(args, dict):
+            raise PipelineError(f"Step '{step_id}': 'args' must be an object")
+        needs = entry.get("needs", [])
+        if not isinstance(needs, list) or not all(isinstance(name, str) for name in needs):
+            raise PipelineError(f"Step '{step_id}': 'needs' must be a list of step ids")
+        wanted = _references(args) | set(needs)
+        missing = sorted(wanted - seen)
+        if missing:
+            raise PipelineError(
+                f"Step '{step_id}' refers to {', '.join(missing)}, which is not an earlier step"
+            )
+        after = set(wanted)
+        workspace = workspace_of(tool, args)
+        if workspace is not None:
+            if workspace in last_in:
+                after.add(last_in[workspace])
+            last_in[workspace] = step_id
+        steps.append(Step(step_id, tool, args, sorted(wanted), sorted(after)))
+        seen.add(step_id)
+    return steps
+
+
+def _lookup(results: dict[str, object], name: str, path: str) -> object:
+    value = results[name]
+    for part in filter(None, path.split(".")):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            raise PipelineError(f"'${{{name}{path}}}': the result of '{name}' has no '{part}'")
+    return value
+
+
+def resolve(value: object, results: dict[str, object]) -> object:
+    """*value* with every reference replaced by the result it names."""
+    if isinstance(value, dict):
+        return {key: resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, results) for item in value]
+    if not isinstance(value, str):
+        return value
+    whole = _REFERENCE_RE.fullmatch(value)
+    if whole:
+        return _lookup(results, whole.group(1), whole.group(2))
+
+    def text(match: re.Match[str]) -> str:
+        found = _lookup(results, match.group(1), match.group(2))
+        if isinstance(found, (dict, list)):
+            raise PipelineError(
+                f"'{match.group(0)}' is not text; name one field of it, as in "
+                f"'${{{match.group(1)}.field}}'"
+            )
+        return str(found)
+
+    return _REFERENCE_RE.sub(text, value)
+
+
+async def run(
+    steps: list[Step],
+    call: Callable[[Step, dict], Awaitable[object]],
+    on_done: Callable[[dict], Awaitable[None]] | None = None,
+) -> list[dict]:
+    """Run every step once its dependencies are done; one report per step, in step order.
+
+    *call(step, args)* runs one step with its references resolved and returns
+    its result; any exception it raises is that step's error.
+    """
+    started = time.perf_counter()
+    results: dict[str, object] = {}
+    reports: dict[str, dict] = {}
+    tasks: dict[str, asyncio.Task[None]] = {}
+
+    async def run_step(step: Step) -> None:
+        if step.after:
+            await asyncio.wait([tasks[name] for name in step.after])
+        report: dict = {"id": step.id, "tool": step.tool}
+        failed = [name for name in step.needs if name not in results]
+        if failed:
+            report["skipped"] = f"depends on {', '.join(failed)}, which did not succeed"
+        else:
+            began = time.perf_counter()
+            report["started_ms"] = round((began - started) * 1000, 1)
+            try:
+                result = await call(step, resolve(step.args, results))
+            except Exception as exc:
+                report["error"] = str(exc) or type(exc).__name__
+            else:
+                results[step.id] = result
+                report["result"] = result
+            report["elapsed_ms"] = round((time.perf_counter() - began) * 1000, 1)
+        reports[step.id] = report
+        if on_done is not None:
+            await on_done(report)
+
+    for step in steps:
+        tasks[step.id] = asyncio.create_task(run_step(step))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return [reports[step.id] for step in steps]
@@ -0,0 +1,149 @@
+"""A content-addressed cache of rendered plots.
+
+Clients ask for the same plot again and again -- `sin(x)` on [-10, 10] -- and
+each request cost a sampling pass, a render and a fresh ~100 KB payload. A plot
+is cached only when its expression cannot depend on anything a caller has
+bound: every name in it is a plot variable, one of the predefined symbols or a
+name on the SageMath allowlist. For those the picture is a function of the
+arguments alone, so one client's render is safe to hand to another.
+
+Two layers: a bounded in-memory LRU, and optionally a directory of PNG files
+named by their key, which survives a restart and can be shared between
+replicas.
+"""
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import tokenize
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+
+from .allowlist import ALLOWED_CALLER_NAMES
+from .symbols import PREDEFINED_SYMBOLS
+
+LOGGER = logging.getLogger(__name__)
+
+# Part of every key. Bump it when the sampling or the rendering changes what a
+# given request draws, so files left in the disk layer are not served stale.
+_CACHE_VERSION = 1
+
+
+def _canonical(expression: str) -> str | None:
+    """The expression's tokens joined by single spaces, or None if it does not tokenize.
+
+    Tokens rather than a whitespace squeeze: "sin(x)" and "sin( x )" share a key,
+    and two expressions that tokenize differently never do. Tokens rather than
+    an AST round-trip, because the preparser gives "1.000000000000000000000" more
+    precision than "1.0" and an unparse would fold the two together.
+    """
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(expression.strip()).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+    layout = {tokenize.NEWLINE, tokenize.NL, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER}
+    return " ".join(token.string for token in tokens if token.type not in layout)
+
+
+def plot_key(
+    tool: str, expressions: Iterable[str], variables: Iterable[str], **params: object
+) -> str | None:
+    """The cache key for one plot request, or None if the plot must not be cached.
+
+    *params* are the remaining arguments that change the picture -- ranges,
+    resolution, size, format. The plot variables may appear in the expressions;
+    any other name must be a predefined symbol or on the allowlist. A keyword is
+    not on either list, so a lambda or a comprehension, which bind names of
+    their own, is never cached.
+    """
+    variables = list(variables)
+    allowed = ALLOWED_CALLER_NAMES | set(PREDEFINED_SYMBOLS) | set(variables)
+    canonical = []
+    for expression in expressions:
+        text = _canonical(expression)
+        if text is None or any(
+            word not in allowed for word in text.split() if word.isidentifier()
+        ):
+            return None
+        canonical.append(text)
+    payload = json.dumps(
+        [_CACHE_VERSION, tool, canonical, variables, params], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlotCache:
+    """An LRU of base64 images keyed by :func:`plot_key`, with an optional disk layer.
+
+    *suffix* names the file in the disk layer -- ``png``, or ``svgz`` for a
+    compressed SVG. The key already tells the formats apart.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: str = ""):
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _path(self, key: str, suffix: str) -> Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / key[:2] / f"{key}.{suffix}"
+
+    def get(self, key: str, suffix: str = "png") -> str | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        path = self._path(key, suffix)
+        if path is None:
+            return None
+        try:
+            image = base64.b64encode(path.read_bytes()).decode("ascii")
+        except OSError:
+            return None
+        self._remember(key, image)
+        return image
+
+    def put(self, key: str, image: str, suffix: str = "png") -> None:
+        self._remember(key, image)
+        path = self._path(key, suffix)
+        if path is None or path.exists():
+            return
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(base64.b64decode(image))
+            os.replace(tmp, path)
+        except OSError as exc:
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+            LOGGER.warning("Could not write plot cache entry %s: %s", path, exc)
+
+    def _remember(self, key: str, image: str) -> None:
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget the in-memory layer. Files on disk are left alone."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,213 @@
+"""Portfolio solving: one symbolic problem raced across several algorithms.
+
+Sage hands an integral, a limit, a sum or a simplification to Maxima unless
+told otherwise, and Maxima is sometimes far slower than SymPy, Giac or FriCAS
+on the same problem -- or never finishes. A portfolio runs the problem under
+every algorithm at once, each in a warm worker of its own, takes the first
+result that is an answer, and interrupts the rest. While one Maxima call spins
+the other cores are idle anyway, so a race turns a timeout into an answer at
+no cost to anyone else.
+
+Every race that produces an answer is recorded against its problem class --
+the operation, a coarse variant and the functions the expression applies -- so
+``algorithm="auto"`` can go straight to the algorithm that has been winning
+that kind of problem and race only if it does not deliver.
+
+The workers are nobody's session: no caller state, no journal, no handles.
+A problem sent to them must stand on its own. They serve every client, so each
+run has its worker to itself and leaves it reset -- namespace rebuilt and
+assumptions forgotten -- before the next run gets it: an expression that slips
+an ``assume()`` into a race cannot bend another client's answers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import re
+import threading
+from collections import Counter
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+
+from . import monitoring
+from .config import DEFAULT_SETTINGS, SageSettings
+from .session import SageSession
+
+LOGGER = logging.getLogger(__name__)
+
+# The algorithms Sage accepts for each operation, in preference order: when two
+# answers arrive together, or none is an answer, the earlier one is returned.
+ALGORITHMS = {
+    "integrate": ("maxima", "sympy", "giac", "fricas"),
+    "limit": ("maxima", "sympy", "giac", "fricas"),
+    "sum": ("maxima", "sympy", "giac"),
+    "product": ("maxima", "sympy", "giac"),
+    "simplify": ("maxima", "sympy", "giac", "fricas"),
+}
+
+# What each operation looks like when the algorithm gave up and handed the
+# problem back unevaluated. Any simplification is an answer.
+_UNSOLVED = {
+    "integrate": "integrate(",
+    "limit": "limit(",
+    "sum": "sum(",
+    "product": "product(",
+}
+
+_APPLIED_NAME_RE = re.compile(r"([A-Za-z_]\w*)\s*\(")
+
+
+def problem_class(operation: str, expression: str, variant: str = "") -> str:
+    """The class a problem's race is recorded under.
+
+    Coarse on purpose: the functions an integrand applies say more about which
+    backend copes with it than the exact expression does, and a class has to
+    recur to be worth remembering.
+    """
+    heads = sorted(set(_APPLIED_NAME_RE.findall(expression)))
+    return ":".join([operation, variant, "+".join(heads)])
+
+
+def is_answer(operation: str, result: object) -> bool:
+    """False when *result* is the problem handed back unevaluated."""
+    marker = _UNSOLVED.get(operation)
+    return marker is None or marker not in str(result)
+
+
+class PortfolioError(RuntimeError):
+    """Raised when every algorithm in a race failed."""
+
+    def __init__(self, errors: dict[str, str]):
+        super().__init__(
+            "Every algorithm failed: "
+            + "; ".join(f"{name}: {message}" for name, message in errors.items())
+        )
+        self.errors = errors
+
+
+@dataclass(slots=True)
+class RaceResult:
+    algorithm: str
+    result: object
+    raced: list[str]
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+class Portfolio:
+    """One worker per algorithm, and the winners of past races by problem class."""
+
+    def __init__(self, settings: SageSettings | None = None):
+        self.settings = settings or DEFAULT_SETTINGS
+        self.algorithms = tuple(
+            name.strip() for name in self.settings.portfolio_algorithms.split(",") if name.strip()
+        )
+        self._workers: dict[str, SageSession] = {}
+        # One run at a time per worker, the reset included.
+        self._turns: dict[str, asyncio.Lock] = {}
+        self._wins: dict[str, Counter[str]] = {}
+        self._lock = threading.Lock()
+
+    def available(self, operation: str) -> list[str]:
+        """The algorithms a race for *operation* runs: Sage's list, as configured."""
+        return [name for name in ALGORITHMS[operation] if name in self.algorithms]
+
+    def _worker(self, algorithm: str) -> SageSession:
+        worker = self._workers.get(algorithm)
+        if worker is None:
+            worker = SageSession(f"portfolio-{algorithm}", self.settings, keep_journal=False)
+            self._workers[algorithm] = worker
+        return worker
+
+    async def _run(
+        self, algorithm: str, run: Callable[[SageSession, str], Awaitable[object]]
+    ) -> object:
+        """*run* on the algorithm's worker, which is reset afterwards however it ended."""
+        worker = self._worker(algorithm)
+        async with self._turns.setdefault(algorithm, asyncio.Lock()):
+            try:
+                return await run(worker, algorithm)
+            finally:
+                # A worker that never started holds nothing to clear.
+                if worker.is_alive():
+                    try:
+                        await worker.reset()
+                    except Exception as exc:
+                        LOGGER.warning(
+                            "Could not reset %s, stopping it: %s", worker.session_id, exc
+                        )
+                        with contextlib.suppress(Exception):
+                            await worker.shutdown()
+
+    async def start(self) -> None:
+        """Start every worker now when prewarming is on; otherwise each starts on first use."""
+        if not self.settings.portfolio_prewarm:
+            return
+        results = await asyncio.gather(
+            *(self._worker(name).ensure_started() for name in self.algorithms),
+            return_exceptions=True,
+        )
+        for name, result in zip(self.algorithms, results, strict=True):
+            if isinstance(result, Exception):
+                LOGGER.warning("Could not start the %s portfolio worker: %s", name, result)
+
+    def winner(self, problem: str) -> str | None:
+        """The algorithm that has won *problem*'s class most often, if any has."""
+        with self._lock:
+            wins = self._wins.get(problem)
+            return wins.most_common(1)[0][0] if wins else None
+
+    def record(self, problem: str, algorithm: str) -> None:
+        with self._lock:
+            self._wins.setdefault(problem, Counter())[algorithm] += 1
+
+    async def race(
+        self,
+        operation: str,
+        problem: str,
+        algorithms: Sequence[str],
+        run: Callable[[SageSession, str], Awaitable[object]],
+    ) -> RaceResult:
+        """Run *run(worker, algorithm)* for each algorithm at once; the first answer wins.
+
+        The losers are cancelled, which interrupts their workers. With no answer
+        from anyone, the first result in preference order is returned as it
+        stands -- an unevaluated integral is still a result -- and with no
+        result at all, :class:`PortfolioError` carries every error.
+        """
+        algorithms = list(algorithms)
+        tasks = {asyncio.create_task(self._run(name, run)): name for name in algorithms}
+        pending = set(tasks)
+        results: dict[str, object] = {}
+        errors: dict[str, str] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    exc = task.exception()
+                    if exc is not None:
+                        errors[name] = str(exc) or type(exc).__name__
+                    else:
+                        results[name] = task.result()
+                for name in algorithms:
+                    if name in results and is_answer(operation, results[name]):
+                        self.record(problem, name)
+                        monitoring.record_portfolio_win(operation, name)
+                        return RaceResult(name, results[name], algorithms, errors)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        # Completion order is a scheduling accident; report in preference order.
+        errors = {name: errors[name] for name in algorithms if name in errors}
+        for name in algorithms:
+            if name in results:
+                return RaceResult(name, results[name], algorithms, errors)
+        raise PortfolioError(errors)
+
+    async def shutdown(self) -> None:
+        workers, self._workers = list(self._workers.values()), {}
+        await asyncio.gather(*(worker.shutdown() for worker in workers), return_exceptions=True)
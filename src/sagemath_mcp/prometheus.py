@@ -0,0 +1,160 @@
+"""The server's metrics in Prometheus text exposition format, for ``GET /metrics``.
+
+The monitoring resource answers MCP clients; a scraper speaks HTTP and wants
+this format instead. Everything here is read at scrape time from what the
+server already keeps -- the monitoring counters and histograms, and the
+workspaces in the session manager -- so serving it costs nothing between
+scrapes.
+
+Like ``/health`` the route is unauthenticated, so nothing in it may identify a
+client: workspaces are counted rather than listed, and a worker process is
+labelled by its pid, never by the MCP session id that owns it.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+
+from . import monitoring, runtime
+from .monitoring import LATENCY_BUCKETS_MS
+from .session import _rss_bytes
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_PREFIX = "sagemath_mcp_"
+
+
+def _cpu_seconds(pid: int) -> float | None:
+    """User plus system CPU time of process *pid*, or None where /proc cannot tell."""
+    try:
+        with open(f"/proc/{pid}/stat") as handle:
+            # The command name may contain spaces, so count fields after it.
+            fields = handle.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Exposition:
+    """Builds the text, one metric family at a time."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {_PREFIX}{name} {help_text}")
+        self.lines.append(f"# TYPE {_PREFIX}{name} {kind}")
+
+    def sample(self, name: str, value: float, **labels: str) -> None:
+        rendered = ",".join(f'{key}="{_escape(str(item))}"' for key, item in labels.items())
+        label_text = f"{{{rendered}}}" if rendered else ""
+        self.lines.append(f"{_PREFIX}{name}{label_text} {_number(value)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _tool_latency(out: _Exposition) -> None:
+    out.family(
+        "tool_call_duration_seconds", "histogram", "Tool call latency by tool and outcome."
+    )
+    bounds = [_number(bound / 1000) for bound in LATENCY_BUCKETS_MS] + ["+Inf"]
+    for (tool, outcome), histogram in sorted(monitoring.tool_latency_histograms().items()):
+        counts, total_ms, _ = histogram.merged()
+        cumulative = 0
+        for bound, count in zip(bounds, counts, strict=True):
+            cumulative += count
+            out.sample(
+                "tool_call_duration_seconds_bucket", cumulative,
+                tool=tool, outcome=outcome, le=bound,
+            )
+        out.sample("tool_call_duration_seconds_sum", total_ms / 1000, tool=tool, outcome=outcome)
+        out.sample("tool_call_duration_seconds_count", cumulative, tool=tool, outcome=outcome)
+
+
+def _workers(out: _Exposition) -> None:
+    stats = runtime.SESSION_MANAGER.worker_stats()
+    live = [entry for entry in stats if entry["pid"] is not None]
+    out.family(
+        "workspaces", "gauge",
+        "Workspaces by state: busy (a request on the worker), idle, or stopped (no worker).",
+    )
+    out.sample("workspaces", sum(1 for entry in live if entry["queued"]), state="busy")
+    out.sample("workspaces", sum(1 for entry in live if not entry["queued"]), state="idle")
+    out.sample("workspaces", len(stats) - len(live), state="stopped")
+    out.family(
+        "workspace_requests_waiting", "gauge",
+        "Requests queued behind another on the same workspace.",
+    )
+    out.sample("workspace_requests_waiting", sum(max(0, entry["queued"] - 1) for entry in stats))
+    journals = [entry["statements"] for entry in stats]
+    out.family("journal_statements", "gauge", "Statements held in workspace journals, summed.")
+    out.sample("journal_statements", sum(journals))
+    out.family("journal_statements_largest", "gauge", "Statements in the longest journal.")
+    out.sample("journal_statements_largest", max(journals, default=0))
+    out.family("worker_resident_memory_bytes", "gauge", "Resident memory of each workspace worker.")
+    for entry in live:
+        rss = _rss_bytes(entry["pid"])
+        if rss is not None:
+            out.sample("worker_resident_memory_bytes", rss, pid=str(entry["pid"]))
+    out.family("worker_cpu_seconds_total", "counter", "CPU time used by each workspace worker.")
+    for entry in live:
+        cpu = _cpu_seconds(entry["pid"])
+        if cpu is not None:
+            out.sample("worker_cpu_seconds_total", cpu, pid=str(entry["pid"]))
+
+
+def _counters(out: _Exposition, metrics: dict) -> None:
+    out.family("evaluations_total", "counter", "evaluate_sage calls by outcome.")
+    out.sample("evaluations_total", metrics["successes"], outcome="success")
+    out.sample("evaluations_total", metrics["failures"], outcome="failure")
+    out.family(
+        "security_failures_total", "counter", "Evaluations refused by the security policy."
+    )
+    out.sample("security_failures_total", metrics["security_failures"])
+    out.family("worker_events_total", "counter", "Worker lifecycle events.")
+    for event, count in metrics["worker_events"].items():
+        out.sample("worker_events_total", count, event=event)
+    out.family("plot_cache_lookups_total", "counter", "Cacheable plot lookups by result.")
+    out.sample("plot_cache_lookups_total", metrics["plot_cache_hits"], result="hit")
+    out.sample("plot_cache_lookups_total", metrics["plot_cache_misses"], result="miss")
+    out.family("plot_cache_hit_ratio", "gauge", "Share of cacheable plot lookups that hit.")
+    out.sample("plot_cache_hit_ratio", metrics["plot_cache_hit_ratio"])
+    out.family("jobs", "gauge", "Background jobs by state.")
+    out.sample("jobs", metrics["jobs_queued"], state="queued")
+    out.sample("jobs", metrics["jobs_running"], state="running")
+    out.family("jobs_finished_total", "counter", "Finished background jobs by outcome.")
+    for status, count in sorted(metrics["jobs_finished"].items()):
+        out.sample("jobs_finished_total", count, status=status)
+    out.family("workers_recycled_total", "counter", "Workspace workers recycled, by reason.")
+    for reason, count in sorted(metrics["workers_recycled"].items()):
+        out.sample("workers_recycled_total", count, reason=reason)
+
+
+def render() -> str:
+    """Every metric, in the Prometheus text format."""
+    out = _Exposition()
+    _tool_latency(out)
+    _workers(out)
+    _counters(out, monitoring.snapshot())
+    latest, largest = monitoring.loop_lag()
+    out.family("event_loop_lag_seconds", "gauge", "How late the event loop last woke a task.")
+    out.sample("event_loop_lag_seconds", latest)
+    out.family(
+        "event_loop_lag_max_seconds", "gauge", "The largest event-loop lag in the last minute."
+    )
+    out.sample("event_loop_lag_max_seconds", largest)
+    return out.text()
@@ -0,0 +1,179 @@
+"""A pool of warm render processes for the plotting tools.
+
+A plot is made in two stages. The caller's Sage worker samples the expression
+and returns plain numbers; one of these processes turns them into a PNG. The
+session is therefore busy only while sampling, renders for different sessions
+run in parallel, and matplotlib's import time and memory stay out of the math
+workers. See :mod:`sagemath_mcp._render_worker` for the process side.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+
+from .config import DEFAULT_SETTINGS, SageSettings
+from .session import _STREAM_LIMIT, SageProcessError, worker_command, worker_env
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RenderError(RuntimeError):
+    """Raised when a render process fails or returns an error."""
+
+
+class _RenderProcess:
+    """One render process, restarted on demand if it has died."""
+
+    def __init__(self, settings: SageSettings):
+        self.settings = settings
+        self._process: asyncio.subprocess.Process | None = None
+        self._stderr_task: asyncio.Task[None] | None = None
+
+    def is_alive(self) -> bool:
+        return bool(self._process and self._process.returncode is None)
+
+    async def ensure_started(self) -> None:
+        if self.is_alive():
+            return
+        self._process = await asyncio.create_subprocess_exec(
+            *worker_command(self.settings, "sagemath_mcp._render_worker"),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=worker_env(self.settings),
+            # A 256x256 surface is ~1.5 MB of JSON going in; the PNG coming out
+            # is far smaller. The session's limit covers both.
+            limit=_STREAM_LIMIT,
+        )
+        self._stderr_task = asyncio.create_task(self._consume_stderr(self._process))
+        LOGGER.info("Started render process (pid=%s)", self._process.pid)
+
+    @staticmethod
+    async def _consume_stderr(process: asyncio.subprocess.Process) -> None:
+        # Tracebacks from a crashing render process end up here, and nowhere
+        # else; the pipe also has to be drained for the process not to block.
+        assert process.stderr
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                break
+            LOGGER.warning("render[%s] stderr: %s", process.pid, line.decode().rstrip())
+
+    async def render(self, spec: dict) -> str:
+        await self.ensure_started()
+        assert self._process and self._process.stdin and self._process.stdout
+        msg_id = str(uuid.uuid4())
+        payload = {"id": msg_id, "type": "render", "spec": spec}
+        self._process.stdin.write(json.dumps(payload).encode("utf-8") + b"\n")
+        await self._process.stdin.drain()
+        line = await self._process.stdout.readline()
+        response = json.loads(line) if line else {}
+        if response.get("id") != msg_id:
+            # Dead, or out of step with its requests: either way unusable.
+            self.kill()
+            raise RenderError("Render process terminated unexpectedly")
+        if not response.get("ok", False):
+            raise RenderError(f"Rendering failed: {response.get('error', 'unknown error')}")
+        return response["image_base64"]
+
+    def kill(self) -> None:
+        if self.is_alive():
+            with contextlib.suppress(ProcessLookupError, RuntimeError):
+                self._process.kill()
+        self._process = None
+        self._stop_stderr()
+
+    def _stop_stderr(self) -> None:
+        if self._stderr_task:
+            with contextlib.suppress(RuntimeError):  # its loop may already be closed
+                self._stderr_task.cancel()
+            self._stderr_task = None
+
+    async def shutdown(self) -> None:
+        if not self.is_alive():
+            return
+        assert self._process and self._process.stdin
+        with contextlib.suppress(Exception):
+            self._process.stdin.write(
+                json.dumps({"id": str(uuid.uuid4()), "type": "shutdown"}).encode("utf-8")
+                + b"\n"
+            )
+            await self._process.stdin.drain()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=self.settings.shutdown_grace)
+        except TimeoutError:
+            self.kill()
+        self._process = None
+        self._stop_stderr()
+
+
+class RenderPool:
+    """A fixed number of render processes, each serving one render at a time."""
+
+    def __init__(self, settings: SageSettings | None = None):
+        self.settings = settings or DEFAULT_SETTINGS
+        self.size = max(1, self.settings.render_workers)
+        self._processes: list[_RenderProcess] = []
+        self._idle: asyncio.Queue[_RenderProcess] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _idle_queue(self) -> asyncio.Queue[_RenderProcess]:
+        # The queue and the pipes belong to the loop that made them. A process
+        # outlives any one loop only in tests, which run each case on its own;
+        # starting over there is cheaper than a cross-loop bug.
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop:
+            for process in self._processes:
+                process.kill()
+            self._processes = [_RenderProcess(self.settings) for _ in range(self.size)]
+            self._idle = asyncio.Queue()
+            for process in self._processes:
+                self._idle.put_nowait(process)
+            self._loop = loop
+        return self._idle
+
+    async def start(self) -> None:
+        """Start every render process now, so the first plot does not wait for one."""
+        self._idle_queue()
+        results = await asyncio.gather(
+            *(process.ensure_started() for process in self._processes),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER.warning("Could not start a render process: %s", result)
+
+    async def render(self, spec: dict, timeout_seconds: float | None = None) -> str:
+        """Render *spec* on the next free process and return the PNG as base64."""
+        timeout = timeout_seconds or self.settings.eval_timeout
+        idle = self._idle_queue()
+        process = await idle.get()
+        try:
+            return await asyncio.wait_for(process.render(spec), timeout)
+        except TimeoutError as exc:
+            process.kill()
+            raise RenderError(f"Rendering exceeded {timeout} seconds") from exc
+        except (OSError, ValueError, SageProcessError) as exc:
+            # A render that fails leaves the process usable; a broken pipe or a
+            # garbled line does not, and the next request starts a fresh one.
+            process.kill()
+            raise RenderError(f"Render process failed: {exc}") from exc
+        except asyncio.CancelledError:
+            # The caller went away with the response still in the pipe, where
+            # the next render on this process would read it as its own.
+            process.kill()
+            raise
+        finally:
+            idle.put_nowait(process)
+
+    async def shutdown(self) -> None:
+        processes, self._processes = self._processes, []
+        self._idle = None
+        self._loop = None
+        await asyncio.gather(
+            *(process.shutdown() for process in processes), return_exceptions=True
+        )
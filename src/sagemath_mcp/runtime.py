@@ -1,4 +1,4 @@
-"""Process-wide runtime state: the settings and the session manager.
+"""Process-wide runtime state: the settings, the session manager, the pools and the jobs.
 
 This lives apart from ``server`` so tool modules can reach the session manager
 without importing the module that imports them. Everything refers to
@@ -8,11 +8,23 @@ which is what lets a test swap the manager for a pure-Python one.
 
 from __future__ import annotations
 
+from .artifacts import ArtifactStore
 from .config import DEFAULT_SETTINGS, SageSettings
+from .jobs import JobManager
+from .parallel import WorkerPool
+from .plot_cache import PlotCache
+from .portfolio import Portfolio
+from .render import RenderPool
 from .session import SageSessionManager
 
 SETTINGS: SageSettings = DEFAULT_SETTINGS
 SESSION_MANAGER = SageSessionManager(SETTINGS)
+RENDER_POOL = RenderPool(SETTINGS)
+PLOT_CACHE = PlotCache(SETTINGS.plot_cache_entries, SETTINGS.plot_cache_dir)
+ARTIFACTS = ArtifactStore(SETTINGS.artifact_ttl, SETTINGS.artifact_max_bytes)
+PORTFOLIO = Portfolio(SETTINGS)
+WORKER_POOL = WorkerPool(SETTINGS)
+JOBS = JobManager(SETTINGS)
 
 
 def get_session_manager() -> SageSessionManager:
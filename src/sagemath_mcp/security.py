@@ -716,7 +716,8 @@ def trusted_policy(policy: SecurityPolicy | None = None) -> SecurityPolicy:
     return replace(
         base,
         forbidden_call_names=relaxed,
-        # The prelude imports sage.all and the plot templates use base64 and io.
+        # The prelude imports sage.all, the plot templates use base64 and io, and
+        # the matrix templates numpy and parts of scipy.
         # Caller code gets none of this: see allowed_import_modules above.
         allowed_import_modules=_TRUSTED_IMPORTS,
         allowed_import_prefixes=("sage.",),
@@ -731,7 +732,16 @@ def trusted_policy(policy: SecurityPolicy | None = None) -> SecurityPolicy:
 _TRUSTED_CALLS = frozenset({"sage_eval", "preparse", "sage_input"})
 
 # Imports the generated templates need. Caller code imports nothing at all.
-_TRUSTED_IMPORTS = ("math", "cmath", "sage", "sage.all", "statistics", "base64", "io")
+# scipy is listed by submodule, not by prefix: the sparse templates need
+# scipy.sparse and its ARPACK/SuperLU wrappers, linear_solve keeps LAPACK's LU
+# factors from scipy.linalg, find_root's all-roots mode refines brackets with
+# scipy.optimize, solve_ode_numeric integrates with scipy.integrate, and nothing
+# else of it is used.
+_TRUSTED_IMPORTS = (
+    "math", "cmath", "sage", "sage.all", "statistics", "base64", "io", "numpy",
+    "scipy.integrate", "scipy.linalg", "scipy.optimize", "scipy.sparse",
+    "scipy.sparse.linalg",
+)
 
 # Forbidden-parent names that are ALSO real methods on a mathematical object, so
 # they are permitted as the terminal segment of a plain `object.method` chain
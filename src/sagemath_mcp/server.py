@@ -4,15 +4,18 @@ from __future__ import annotations
 
 import argparse
 import logging
+import time
 
 from fastmcp.exceptions import ToolError  # noqa: F401 - re-exported for callers and tests
 
 from . import (
     __version__,
+    prometheus,
     runtime,
     tools,  # noqa: F401 - imported for its registration side effect
 )
 from .app import mcp
+from .artifacts import ARTIFACT_ROUTE_PREFIX
 from .config import DEFAULT_SETTINGS  # noqa: F401 - part of this module's long-standing surface
 from .session import (
     DEFAULT_SESSION_NAME,
@@ -25,10 +28,12 @@ from .session import (
 # tools package is what registers them; these names keep the old spelling working.
 from .tools.algebra import (  # noqa: F401
     boolean_algebra_operation,
+    linear_solve,
     matrix_multiply,
     matrix_operation,
     polynomial_ring_operation,
     solve_equation,
+    sparse_matrix_operation,
 )
 from .tools.calculus import (  # noqa: F401
     differentiate_expression,
@@ -36,17 +41,24 @@ from .tools.calculus import (  # noqa: F401
     limit_expression,
     series_expansion,
     solve_ode,
+    solve_ode_numeric,
     symbolic_sum,
     vector_calculus_operation,
 )
 from .tools.core import (  # noqa: F401
     calculate_expression,
+    cancel_sage_job,
+    evaluate_on_grid,
     evaluate_sage,
     evaluate_sage_streaming,
     expand_expression,
     factor_expression,
     find_root,
+    get_sage_job,
+    parallel_map,
+    run_pipeline,
     simplify_expression,
+    submit_sage_job,
 )
 from .tools.discrete import (  # noqa: F401
     coding_theory_operation,
@@ -63,8 +75,10 @@ from .tools.plotting import (  # noqa: F401
     plot_multi_expression,
 )
 from .tools.session import (  # noqa: F401
+    artifact_resource,
     cancel_sage_session,
     documentation_resource,
+    fork_sage_session,
     interrupt_sage_session,
     list_sage_sessions,
     monitoring_resource,
@@ -107,7 +121,41 @@ async def health_check(request: object) -> object:
 
 
 
+async def metrics_route(request: object) -> object:
+    """Serve the server's metrics in Prometheus text format (see :mod:`sagemath_mcp.prometheus`)."""
+    from starlette.responses import Response
+
+    del request
+    return Response(prometheus.render(), media_type=prometheus.CONTENT_TYPE)
+
+
+async def artifact_route(request: object) -> object:
+    """Serve an artifact's bytes over HTTP, with an ETag for revalidation.
+
+    The id is the credential here (see :mod:`sagemath_mcp.artifacts`). An
+    artifact never changes once stored, so a client holding the ETag gets a 304
+    and the body is sent at most once; the cache lifetime is what remains of
+    the artifact's TTL.
+    """
+    from starlette.responses import Response
+
+    artifact = runtime.ARTIFACTS.get(request.path_params["artifact_id"])
+    if artifact is None:
+        return Response("Not found", status_code=404, media_type="text/plain")
+    etag = f'"{artifact.etag}"'
+    remaining = max(0, int(artifact.expires_at - time.time()))
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={remaining}, immutable"}
+    if artifact.encoding:
+        headers["Content-Encoding"] = artifact.encoding
+    offered = request.headers.get("if-none-match", "")
+    if etag in {tag.strip().removeprefix("W/") for tag in offered.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(artifact.data, media_type=artifact.media_type, headers=headers)
+
+
 _HEALTH_ROUTE_REGISTERED = False
+_METRICS_ROUTE_REGISTERED = False
+_ARTIFACT_ROUTE_REGISTERED = False
 
 
 def _register_health_route() -> None:
@@ -133,6 +181,26 @@ def _register_health_route() -> None:
     LOGGER.debug("Registered /health endpoint")
 
 
+def _register_metrics_route() -> None:
+    """Attach /metrics to the HTTP app, once."""
+    global _METRICS_ROUTE_REGISTERED
+    if _METRICS_ROUTE_REGISTERED:
+        return
+    mcp.custom_route("/metrics", methods=["GET"])(metrics_route)
+    _METRICS_ROUTE_REGISTERED = True
+    LOGGER.debug("Registered /metrics endpoint")
+
+
+def _register_artifact_route() -> None:
+    """Attach /artifacts/{artifact_id} to the HTTP app, once."""
+    global _ARTIFACT_ROUTE_REGISTERED
+    if _ARTIFACT_ROUTE_REGISTERED:
+        return
+    mcp.custom_route(f"{ARTIFACT_ROUTE_PREFIX}{{artifact_id}}", methods=["GET"])(artifact_route)
+    _ARTIFACT_ROUTE_REGISTERED = True
+    LOGGER.debug("Registered %s endpoint", ARTIFACT_ROUTE_PREFIX)
+
+
 def main(argv: list[str] | None = None) -> None:  # pragma: no cover - CLI entrypoint
     parser = argparse.ArgumentParser(description="Run the SageMath MCP server.")
     parser.add_argument(
@@ -163,6 +231,8 @@ def main(argv: list[str] | None = None) -> None:  # pragma: no cover - CLI entry
         if args.path:
             transport_kwargs["path"] = args.path
         _register_health_route()
+        _register_metrics_route()
+        _register_artifact_route()
 
     mcp.run(transport=args.transport, **transport_kwargs)
 
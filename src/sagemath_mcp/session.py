@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import contextlib
+import contextvars
 import hashlib
+import itertools
 import json
 import logging
 import os
@@ -12,12 +15,15 @@ import re
 import shutil
 import signal
 import sys
+import tempfile
 import time
 import uuid
-from collections.abc import Awaitable, Callable
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
 from pathlib import Path
 
+from . import monitoring
 from .config import DEFAULT_SETTINGS, SageSettings
 
 LOGGER = logging.getLogger(__name__)
@@ -53,11 +59,39 @@ _NAME_SEPARATOR = "::"
 # without letting a runaway worker consume unbounded memory.
 _STREAM_LIMIT = 8 * 1024 * 1024
 
+# The line a specialised tool writes to keep a constructed object under a handle
+# (see codegen._handle_store). Read back out of trusted code that ran, so the
+# registry follows the namespace wherever the code goes -- including a journal
+# replay, which rebuilds the object and, through this, its handle.
+_HANDLE_BINDING_RE = re.compile(r'^_object_handles\["([a-z]+-[0-9a-f]{12})"\] = ', re.MULTILINE)
+
+
+# Request priorities on a workspace's queue, most urgent first: a caller
+# waiting on an answer, then a journal being replayed, then background work.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_REPLAY = 1
+PRIORITY_BACKGROUND = 2
+
+# Called as (position, estimated wait in seconds) while a request waits its
+# turn on a busy workspace. Set per tool call by the server, so every tool
+# reports its place in line without threading a callback through each one.
+WAIT_REPORTER: contextvars.ContextVar[Callable[[int, float], Awaitable[None]] | None] = (
+    contextvars.ContextVar("sagemath_mcp_wait_reporter", default=None)
+)
+
 
 class SageProcessError(RuntimeError):
     """Raised when the underlying Sage process terminates unexpectedly."""
 
 
+class WorkspaceBusy(RuntimeError):
+    """Raised for a request that asked not to wait on a busy workspace."""
+
+    def __init__(self, session_id: str, ahead: int):
+        super().__init__(f"Session {session_id} is busy with {ahead} request(s) ahead")
+        self.ahead = ahead
+
+
 class SageEvaluationError(RuntimeError):
     """Raised when Sage returns an execution error."""
 
@@ -75,6 +109,42 @@ class WorkerResult:
     latex: str | None
     stdout: str
     elapsed_ms: float
+    # Where the call's time went: the worker's CPU and phase split, plus the
+    # wait for the worker and the round trip to it. See SageSession.evaluate.
+    usage: dict | None = None
+
+
+def worker_command(settings: SageSettings, module: str) -> list[str]:
+    """The command that runs *module* under Sage's Python, or plain Python."""
+    if settings.force_python_worker:
+        python_exe = sys.executable or shutil.which("python3") or shutil.which("python")
+        if not python_exe:
+            raise SageProcessError("Unable to locate a Python interpreter for the worker.")
+        return [python_exe, "-m", module]
+    if not shutil.which(settings.sage_binary):
+        raise SageProcessError(
+            f"Unable to locate Sage executable '{settings.sage_binary}'. "
+            "Adjust SAGEMATH_MCP_SAGE_BINARY or install SageMath."
+        )
+    return [settings.sage_binary, "-python", "-m", module]
+
+
+def worker_env(settings: SageSettings) -> dict[str, str]:
+    """The environment for a worker process: this package importable, Sage's venv first."""
+    env = os.environ.copy()
+    pythonpath_entries: list[str] = []
+    if (sage_venv := env.get("SAGE_VENV")):
+        py_version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+        site_packages = Path(sage_venv) / "lib" / py_version / "site-packages"
+        pythonpath_entries.append(str(site_packages))
+    pythonpath_entries.append(_PROJECT_ROOT)
+    if (existing_pythonpath := env.get("PYTHONPATH")):
+        pythonpath_entries.append(existing_pythonpath)
+    env["PYTHONPATH"] = os.pathsep.join(pythonpath_entries)
+    env.setdefault("SAGEMATH_MCP_STARTUP", settings.startup_code)
+    if settings.force_python_worker:
+        env.setdefault("SAGEMATH_MCP_PURE_PYTHON", "1")
+    return env
 
 
 def _journal_entry(item) -> tuple[str, bool]:
@@ -89,15 +159,151 @@ def _journal_entry(item) -> tuple[str, bool]:
     return str(item), False
 
 
+def _rss_bytes(pid: int) -> int | None:
+    """Resident memory of process *pid*, or None where /proc cannot tell."""
+    try:
+        with open(f"/proc/{pid}/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RequestQueue:
+    """One request at a time on a worker: by priority, then first come first served.
+
+    Replaces a bare lock, whose waiters were invisible and woke in whatever
+    order. Here a waiter knows its position, and an estimate of the wait from
+    how long recent requests held the worker.
+    """
+
+    _REPORT_INTERVAL = 2.0
+
+    def __init__(self):
+        self._busy = False
+        self._busy_since = 0.0
+        self._waiting: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._recent: deque[float] = deque(maxlen=20)
+
+    @property
+    def depth(self) -> int:
+        """Requests running or waiting."""
+        return len(self._waiting) + self._busy
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the request at *position* (1 = next) should get the worker."""
+        typical = sum(self._recent) / len(self._recent) if self._recent else 0.0
+        remaining = max(0.0, typical - (time.monotonic() - self._busy_since))
+        return remaining + typical * (position - 1)
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self,
+        priority: int = PRIORITY_INTERACTIVE,
+        *,
+        fail_if_busy: bool = False,
+        session_id: str = "",
+    ) -> AsyncIterator[None]:
+        if self.depth:
+            if fail_if_busy:
+                raise WorkspaceBusy(session_id, self.depth)
+            await self._wait(priority)
+        else:
+            self._busy = True
+        self._busy_since = time.monotonic()
+        try:
+            yield
+        finally:
+            self._recent.append(time.monotonic() - self._busy_since)
+            self._hand_on()
+
+    async def _wait(self, priority: int) -> None:
+        granted: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._order), granted)
+        bisect.insort(self._waiting, entry)
+        report = WAIT_REPORTER.get()
+        reported = None
+        try:
+            while not granted.done():
+                position = self._waiting.index(entry) + 1
+                if report is not None and position != reported:
+                    await report(position, self.estimated_wait(position))
+                    reported = position
+                await asyncio.wait([granted], timeout=self._REPORT_INTERVAL)
+        except BaseException:
+            if granted.done():
+                # Handed the worker just as the wait was abandoned: pass it on.
+                self._hand_on()
+            else:
+                self._waiting.remove(entry)
+            raise
+
+    def _hand_on(self) -> None:
+        # The worker passes straight to the next waiter, never through idle, so
+        # a newcomer cannot overtake the queue between two requests.
+        while self._waiting:
+            _, _, granted = self._waiting.pop(0)
+            if not granted.done():
+                granted.set_result(None)
+                return
+        self._busy = False
+
+
+class _ForkedProcess:
+    """A worker forked from another, reached over a Unix socket instead of pipes.
+
+    Stands in for ``asyncio.subprocess.Process`` as far as SageSession uses one.
+    The fork is the other worker's grandchild, not ours, so there is no child
+    to wait for: end of file on the socket is how its exit shows.
+    """
+
+    def __init__(self, pid: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.pid = pid
+        self.stdout = reader
+        self.stdin = writer
+        self.stderr = None
+        self._returncode: int | None = None
+
+    @property
+    def returncode(self) -> int | None:
+        if self._returncode is None and self.stdout.at_eof():
+            self._returncode = 0
+            self._reap()
+        return self._returncode
+
+    def _reap(self) -> None:
+        # Orphans are re-parented to PID 1, and in the container that is this
+        # server. Anywhere else the pid is not ours and there is nothing to do.
+        with contextlib.suppress(ChildProcessError, OSError):
+            os.waitpid(self.pid, os.WNOHANG)
+
+    def send_signal(self, sig: int) -> None:
+        os.kill(self.pid, sig)
+
+    def kill(self) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(self.pid, signal.SIGKILL)
+
+    async def wait(self) -> int:
+        while await self.stdout.read(65536):
+            pass
+        return self.returncode or 0
+
+
 class SageSession:
     """Encapsulates a single long-lived Sage worker."""
 
-    def __init__(self, session_id: str, settings: SageSettings | None = None):
+    def __init__(
+        self, session_id: str, settings: SageSettings | None = None, *, keep_journal: bool = True
+    ):
         self.session_id = session_id
         self.settings = settings or DEFAULT_SETTINGS
+        # False for a worker that is nobody's workspace (see portfolio.py): with
+        # nothing ever replayed into it, a journal would only grow.
+        self.keep_journal = keep_journal
         self._process: asyncio.subprocess.Process | None = None
         self._stderr_task: asyncio.Task[None] | None = None
-        self._lock = asyncio.Lock()
+        self.requests = RequestQueue()
         self.started_at = time.time()
         self.last_used_at = self.started_at
         # (code, trusted) per statement. Trust is not a property of the text:
@@ -108,6 +314,17 @@ class SageSession:
         self._in_flight: str | None = None
         self._dropped_stdout_lines = 0
         self._queued_stdout_chars = 0
+        # Object handles bound in the worker namespace, in creation order. They
+        # live exactly as long as the namespace: a reset or a restarted worker
+        # drops them, an interrupt does not.
+        self.handles: dict[str, float] = {}
+        # For the recycling policy: evaluations this worker has run, and its
+        # resident memory when first measured after it started.
+        self.evaluations = 0
+        self._baseline_rss: int | None = None
+        # Set when a recycle failed: the journal will not replay, so trying
+        # again on every call would only repeat the replay.
+        self.recycle_failed = False
 
     async def ensure_started(self) -> None:
         if self._process and self._process.returncode is None:
@@ -115,32 +332,8 @@ class SageSession:
         await self._launch_worker()
 
     async def _launch_worker(self) -> None:
-        sage_binary = self.settings.sage_binary
-        if self.settings.force_python_worker:
-            python_exe = sys.executable or shutil.which("python3") or shutil.which("python")
-            if not python_exe:
-                raise SageProcessError("Unable to locate a Python interpreter for the worker.")
-            command = [python_exe, "-m", "sagemath_mcp._sage_worker"]
-        else:
-            if not shutil.which(sage_binary):
-                raise SageProcessError(
-                    f"Unable to locate Sage executable '{sage_binary}'. "
-                    "Adjust SAGEMATH_MCP_SAGE_BINARY or install SageMath."
-                )
-            command = [sage_binary, "-python", "-m", "sagemath_mcp._sage_worker"]
-        env = os.environ.copy()
-        pythonpath_entries: list[str] = []
-        if (sage_venv := env.get("SAGE_VENV")):
-            py_version = f"python{sys.version_info.major}.{sys.version_info.minor}"
-            site_packages = Path(sage_venv) / "lib" / py_version / "site-packages"
-            pythonpath_entries.append(str(site_packages))
-        pythonpath_entries.append(_PROJECT_ROOT)
-        if (existing_pythonpath := env.get("PYTHONPATH")):
-            pythonpath_entries.append(existing_pythonpath)
-        env["PYTHONPATH"] = os.pathsep.join(pythonpath_entries)
-        env.setdefault("SAGEMATH_MCP_STARTUP", self.settings.startup_code)
-        if self.settings.force_python_worker:
-            env.setdefault("SAGEMATH_MCP_PURE_PYTHON", "1")
+        command = worker_command(self.settings, "sagemath_mcp._sage_worker")
+        env = worker_env(self.settings)
         LOGGER.debug("Launching Sage worker %s with command %s", self.session_id, command)
         self._process = await asyncio.create_subprocess_exec(
             *command,
@@ -159,7 +352,11 @@ class SageSession:
         self._stderr_task = asyncio.create_task(self._consume_stderr())
         self.started_at = time.time()
         self.last_used_at = self.started_at
+        self.evaluations = 0
+        self._baseline_rss = None
+        self.recycle_failed = False
         LOGGER.info("Started Sage session %s (pid=%s)", self.session_id, self._process.pid)
+        monitoring.record_worker_event("starts")
 
     async def _consume_stderr(self) -> None:
         assert self._process and self._process.stderr
@@ -318,7 +515,19 @@ class SageSession:
         timeout_seconds: float | None = None,
         trusted: bool = False,
         on_stdout: Callable[[str], Awaitable[None]] | None = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        fail_if_busy: bool = False,
     ) -> WorkerResult:
+        """Run *code* once the requests ahead of it on this worker are done.
+
+        The result's ``usage`` adds two figures to what the worker measured:
+        ``queue_wait_ms``, spent waiting for the worker, and ``transport_ms``,
+        the round trip less the worker's own time.
+
+        Raises WorkspaceBusy, without queueing, when *fail_if_busy* is set and
+        the worker is in use.
+        """
+        arrived = time.perf_counter()
         await self.ensure_started()
         assert self._process and self._process.stdin and self._process.stdout
         payload = {
@@ -334,8 +543,11 @@ class SageSession:
         }
         data = json.dumps(payload).encode("utf-8") + b"\n"
         effective_timeout = timeout_seconds or self.settings.eval_timeout
-        async with self._lock:
-            # Created inside the lock: a request cancelled while queued for it
+        async with self.requests.slot(
+            priority, fail_if_busy=fail_if_busy, session_id=self.session_id
+        ):
+            admitted = time.perf_counter()
+            # Created inside the slot: a request cancelled while queued for it
             # never reaches the cleanup below, so a pump started earlier would
             # outlive the request that owned it.
             queue: asyncio.Queue[str | None] | None = None
@@ -351,8 +563,20 @@ class SageSession:
                 await self._stop_stdout_pump(pump)
             if not raw:
                 raise SageProcessError("Sage worker terminated unexpectedly.")
+            answered = time.perf_counter()
         self.last_used_at = time.time()
-        return self._result_from(response, code, trusted)
+        self.evaluations += 1
+        result = self._result_from(response, code, trusted)
+        if isinstance(response.get("usage"), dict):
+            result.usage = {
+                **response["usage"],
+                "queue_wait_ms": round((admitted - arrived) * 1000, 3),
+                "transport_ms": round(
+                    max(0.0, (answered - admitted) * 1000 - result.elapsed_ms), 3
+                ),
+            }
+            monitoring.record_usage(result.usage)
+        return result
 
     async def _exchange(
         self,
@@ -373,6 +597,7 @@ class SageSession:
                 timeout=effective_timeout,
             )
         except TimeoutError as exc:
+            monitoring.record_worker_event("timeouts")
             await self._handle_timeout()
             # Deliberately no drain here. Waiting on the caller's callback held
             # the TimeoutError until the callback was released, so the caller
@@ -407,7 +632,11 @@ class SageSession:
                 stdout=response.get("stdout", ""),
                 traceback=error.get("traceback", ""),
             )
-        self._code_journal.append((code, trusted))
+        if self.keep_journal:
+            self._code_journal.append((code, trusted))
+        if trusted:
+            for handle in _HANDLE_BINDING_RE.findall(code):
+                self.handles.setdefault(handle, time.time())
         return WorkerResult(
             result_type=response["result_type"],
             result=response.get("result"),
@@ -496,10 +725,7 @@ class SageSession:
 
         tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
         try:
-            tmp.write_text(
-                json.dumps([{"code": code, "trusted": trusted}
-                            for code, trusted in self._code_journal])
-            )
+            tmp.write_text(json.dumps(self.journal()))
             os.replace(tmp, path)
         except OSError:
             with contextlib.suppress(OSError):
@@ -518,6 +744,10 @@ class SageSession:
                     legacy.unlink()
         LOGGER.debug("Saved journal for %s (%d entries)", self.session_id, len(self._code_journal))
 
+    def journal(self) -> list[dict]:
+        """The statements that built this namespace, in the shape a journal file holds."""
+        return [{"code": code, "trusted": trusted} for code, trusted in self._code_journal]
+
     @classmethod
     def load_journal(cls, path: Path) -> list[str]:
         """Read a code journal from disk."""
@@ -534,11 +764,13 @@ class SageSession:
 
         Returns the number of entries successfully replayed.
         """
+        monitoring.record_worker_event("journal_replays")
         replayed = 0
         for code, trusted in (_journal_entry(item) for item in journal):
             try:
                 await self.evaluate(
-                    code, want_latex=False, capture_stdout=False, trusted=trusted
+                    code, want_latex=False, capture_stdout=False, trusted=trusted,
+                    priority=PRIORITY_REPLAY,
                 )
                 replayed += 1
             except Exception:
@@ -554,7 +786,7 @@ class SageSession:
         assert self._process and self._process.stdin and self._process.stdout
         payload = {"id": str(uuid.uuid4()), "type": "reset"}
         data = json.dumps(payload).encode("utf-8") + b"\n"
-        async with self._lock:
+        async with self.requests.slot(session_id=self.session_id):
             self._process.stdin.write(data)
             await self._process.stdin.drain()
             # Match the response id, exactly as evaluate() does. Reading the next
@@ -567,12 +799,156 @@ class SageSession:
         if not response.get("ok", False):
             raise SageProcessError("Failed to reset Sage session.")
         self._code_journal.clear()
+        self.handles.clear()
+        self.recycle_failed = False
         self.last_used_at = time.time()
 
+    async def fork(
+        self, session_id: str, *, keep_journal: bool = True, priority: int = PRIORITY_INTERACTIVE
+    ) -> SageSession:
+        """A new session whose worker is an ``os.fork()`` of this one.
+
+        The copy starts with this namespace, shared copy-on-write, so branching
+        costs a fork rather than a replay of the journal. It inherits the
+        journal and the handles too, so it persists, lists and replays like any
+        other workspace; restarted, it becomes an ordinary fresh worker.
+
+        Raises SageProcessError when the worker cannot fork.
+        """
+        await self.ensure_started()
+        assert self._process and self._process.stdin
+        connected: asyncio.Future[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = (
+            asyncio.get_running_loop().create_future()
+        )
+
+        def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            if not connected.done():
+                connected.set_result((reader, writer))
+
+        with tempfile.TemporaryDirectory(prefix="sagemath-mcp-fork-") as directory:
+            path = os.path.join(directory, "fork.sock")
+            server = await asyncio.start_unix_server(on_connect, path=path, limit=_STREAM_LIMIT)
+            try:
+                payload = {"id": str(uuid.uuid4()), "type": "fork", "socket": path}
+                async with self.requests.slot(priority, session_id=self.session_id):
+                    self._process.stdin.write(json.dumps(payload).encode("utf-8") + b"\n")
+                    await self._process.stdin.drain()
+                    raw, response = await asyncio.wait_for(
+                        self._read_matching_response(payload["id"], None),
+                        timeout=self.settings.eval_timeout,
+                    )
+                if not raw or not response.get("ok", False):
+                    error = response.get("error", {}).get("message", "worker terminated")
+                    raise SageProcessError(f"Could not fork session {self.session_id}: {error}")
+                reader, writer = await asyncio.wait_for(
+                    connected, timeout=self.settings.eval_timeout
+                )
+            finally:
+                server.close()
+        child = SageSession(session_id, self.settings, keep_journal=keep_journal)
+        child._process = _ForkedProcess(int(response["pid"]), reader, writer)
+        if keep_journal:
+            child._code_journal = list(self._code_journal)
+        child.handles = dict(self.handles)
+        self.last_used_at = child.started_at
+        LOGGER.info(
+            "Forked Sage session %s into %s (pid=%s)",
+            self.session_id, session_id, response["pid"],
+        )
+        return child
+
+    async def branch(
+        self, session_id: str, *, keep_journal: bool = True, priority: int = PRIORITY_INTERACTIVE
+    ) -> tuple[SageSession, str]:
+        """A copy of this namespace: a :meth:`fork` where it can be had, else a replay.
+
+        Returns the copy and which of the two it was, "fork" or "replay".
+        """
+        try:
+            child = await self.fork(session_id, keep_journal=keep_journal, priority=priority)
+            return child, "fork"
+        except (SageProcessError, OSError, TimeoutError) as exc:
+            LOGGER.warning("Fork of %s failed, replaying instead: %s", self.session_id, exc)
+        child = SageSession(session_id, self.settings, keep_journal=keep_journal)
+        try:
+            await child.ensure_started()
+            await child.restore_from_journal(self.journal())
+        except BaseException:
+            await child.shutdown()
+            raise
+        return child, "replay"
+
+    def recycle_reason(self, now: float | None = None) -> str | None:
+        """Why the worker is due for recycling -- "evaluations", "age" or "memory" -- or None.
+
+        The memory limit is on growth: the first reading after a worker starts
+        is its baseline, so startup imports and a replayed namespace are not
+        counted against it.
+        """
+        settings = self.settings
+        if not self.is_alive() or not self.keep_journal or self.recycle_failed:
+            return None
+        if settings.recycle_max_evaluations and (
+            self.evaluations >= settings.recycle_max_evaluations
+        ):
+            return "evaluations"
+        now = now or time.time()
+        if settings.recycle_max_age and now - self.started_at >= settings.recycle_max_age:
+            return "age"
+        if settings.recycle_max_rss_growth_mb:
+            assert self._process
+            rss = _rss_bytes(self._process.pid)
+            if rss is None:
+                return None
+            if self._baseline_rss is None:
+                self._baseline_rss = rss
+            elif rss - self._baseline_rss >= settings.recycle_max_rss_growth_mb * 1024 * 1024:
+                return "memory"
+        return None
+
+    async def recycle(self) -> None:
+        """Swap in a fresh worker holding the same namespace, rebuilt from the journal.
+
+        The fresh worker replays the journal while this one keeps serving
+        requests, so callers wait only for the swap itself: statements that ran
+        in the meantime are replayed too, under this session's request slot, and
+        the workers change places before anything else can run.
+
+        Raises SageProcessError, and keeps the current worker, when the journal
+        does not replay cleanly.
+        """
+        spare = SageSession(self.session_id, self.settings, keep_journal=False)
+        try:
+            await spare.ensure_started()
+            journal = list(self._code_journal)
+            replayed = await spare.restore_from_journal(self.journal())
+            async with self.requests.slot(PRIORITY_REPLAY, session_id=self.session_id):
+                # A reset during the replay cleared the journal the spare rebuilt.
+                if replayed < len(journal) or self._code_journal[: len(journal)] != journal:
+                    raise SageProcessError(
+                        f"Could not recycle session {self.session_id}: "
+                        "its journal did not replay cleanly"
+                    )
+                for code, trusted in self._code_journal[len(journal):]:
+                    await spare.evaluate(
+                        code, want_latex=False, capture_stdout=False, trusted=trusted,
+                    )
+                    replayed += 1
+                self._process, spare._process = spare._process, self._process
+                self._stderr_task, spare._stderr_task = spare._stderr_task, self._stderr_task
+                self.started_at = spare.started_at
+                self.evaluations = 0
+                self._baseline_rss = None
+        finally:
+            # The spare holds the old worker now, or the fresh one if the swap
+            # never happened; either way it is the one to stop.
+            await spare.shutdown()
+        LOGGER.info("Recycled Sage session %s (%d statements replayed)", self.session_id, replayed)
+
     async def interrupt(self) -> bool:
         """Abort the running computation but keep the namespace.
 
-        Deliberately does not take ``self._lock``: the evaluation being
+        Deliberately does not queue on ``self.requests``: the evaluation being
         interrupted is holding it, so waiting for it would deadlock until the
         computation everyone is trying to stop finishes on its own.
 
@@ -598,6 +974,7 @@ class SageSession:
         except (ProcessLookupError, OSError) as exc:
             LOGGER.warning("Could not interrupt session %s: %s", self.session_id, exc)
             return False
+        monitoring.record_worker_event("interrupts")
         self.last_used_at = time.time()
         return True
 
@@ -632,6 +1009,8 @@ class SageSession:
         return bool(self._process and self._process.returncode is None)
 
     def should_cull(self, now: float | None = None) -> bool:
+        if self.requests.depth:
+            return False
         now = now or time.time()
         return (now - self.last_used_at) > self.settings.idle_ttl
 
@@ -651,7 +1030,11 @@ class SageSession:
         await self._restart_worker()
 
     async def _restart_worker(self) -> None:
+        monitoring.record_worker_event("restarts")
         await self._terminate_worker()
+        # A fresh worker has a fresh namespace; the objects behind the handles
+        # went with the old one.
+        self.handles.clear()
         await self._launch_worker()
 
     async def _terminate_worker(self) -> None:
@@ -676,6 +1059,12 @@ class SageSessionManager:
         self.settings = settings or DEFAULT_SETTINGS
         self._sessions: dict[str, SageSession] = {}
         self._lock = asyncio.Lock()
+        # key -> the launch-and-restore in flight for it. Parallel first calls
+        # all await this one task rather than each starting a worker.
+        self._starting: dict[str, asyncio.Task[None]] = {}
+        # key -> a worker being recycled. Nobody waits on these: the old worker
+        # serves calls until the fresh one is ready.
+        self._recycling: dict[str, asyncio.Task[None]] = {}
 
     @staticmethod
     def key_for(scope: str, name: str = DEFAULT_SESSION_NAME) -> str:
@@ -708,6 +1097,8 @@ class SageSessionManager:
                 "started_at": session.started_at,
                 "last_used_at": session.last_used_at,
                 "statements": len(session._code_journal),
+                "handles": list(session.handles),
+                "queued": session.requests.depth,
             }
             for key, session in sorted(items, key=lambda pair: self.split_key(pair[0])[1])
         ]
@@ -719,32 +1110,116 @@ class SageSessionManager:
             session = self._sessions.pop(key, None)
         if session is None:
             return False
+        await self._stop_recycling([key])
         with contextlib.suppress(Exception):
             session.save_journal()
         await session.shutdown()
         return True
 
     async def get(self, session_id: str) -> SageSession:
+        """The live session for *session_id*, started and restored if it was not.
+
+        Starting a worker and replaying its journal take seconds, and an agent
+        opening a conversation with several tool calls at once used to race
+        through them: each call could see no live worker and launch one, or
+        replay the journal over a namespace another call was already restoring.
+        Now the first caller starts one task and every concurrent caller awaits
+        that same task; the time each spent waiting is recorded as a startup wait.
+        """
         async with self._lock:
             session = self._sessions.get(session_id)
             if session is None:
                 session = SageSession(session_id, self.settings)
                 self._sessions[session_id] = session
-        await session.ensure_started()
-        # Restore persisted journal if available
-        if not session._code_journal:
-            # Falls back to pre-digest filenames so upgrading does not lose state.
-            path = session.existing_journal_path()
-            if path:
-                journal = SageSession.load_journal(path)
-                if journal:
-                    LOGGER.info(
-                        "Restoring %d entries for %s",
-                        len(journal), session_id,
+            starting = self._starting.get(session_id)
+            if starting is None:
+                journal_path = None
+                if not session._code_journal:
+                    # Falls back to pre-digest filenames so upgrading does not lose state.
+                    journal_path = session.existing_journal_path()
+                if not session.is_alive() or journal_path is not None:
+                    starting = asyncio.create_task(self._bring_up(session, journal_path))
+                    self._starting[session_id] = starting
+                    starting.add_done_callback(
+                        lambda task, key=session_id: self._started(key, task)
                     )
-                    await session.restore_from_journal(journal)
+                elif session_id not in self._recycling:
+                    reason = session.recycle_reason()
+                    if reason is not None:
+                        recycling = asyncio.create_task(
+                            self._recycle(session_id, session, reason)
+                        )
+                        self._recycling[session_id] = recycling
+                        recycling.add_done_callback(
+                            lambda task, key=session_id: self._recycled(key, task)
+                        )
+        if starting is not None:
+            began = time.perf_counter()
+            # Shielded: a caller that gives up must not cancel the startup the
+            # others are waiting on.
+            await asyncio.shield(starting)
+            monitoring.record_startup_wait((time.perf_counter() - began) * 1000)
         return session
 
+    async def _bring_up(self, session: SageSession, journal_path: Path | None) -> None:
+        await session.ensure_started()
+        if journal_path is None or session._code_journal:
+            return
+        journal = SageSession.load_journal(journal_path)
+        if journal:
+            LOGGER.info("Restoring %d entries for %s", len(journal), session.session_id)
+            await session.restore_from_journal(journal)
+
+    async def _recycle(self, key: str, session: SageSession, reason: str) -> None:
+        LOGGER.info("Recycling Sage session %s (%s)", key, reason)
+        began = time.perf_counter()
+        try:
+            await session.recycle()
+        except Exception as exc:
+            session.recycle_failed = True
+            LOGGER.warning("Could not recycle Sage session %s, keeping its worker: %s", key, exc)
+            monitoring.record_recycle(reason, None)
+        else:
+            monitoring.record_recycle(reason, (time.perf_counter() - began) * 1000)
+
+    def _recycled(self, key: str, task: asyncio.Task[None]) -> None:
+        if self._recycling.get(key) is task:
+            del self._recycling[key]
+
+    async def _stop_recycling(self, keys: list[str]) -> None:
+        """Cancel recycles of sessions on their way out, so no fresh worker outlives them."""
+        tasks = [self._recycling.pop(key) for key in keys if key in self._recycling]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _started(self, key: str, task: asyncio.Task[None]) -> None:
+        if self._starting.get(key) is task:
+            del self._starting[key]
+        if not task.cancelled():
+            # Every waiter sees the failure; this marks it seen even if all of
+            # them were cancelled first.
+            task.exception()
+
+    async def fork(self, source_id: str, target_id: str) -> tuple[SageSession, str]:
+        """Register a copy of *source_id*'s workspace as *target_id*.
+
+        An ``os.fork()`` of the worker where it can be had; otherwise a fresh
+        worker replaying the source's journal. Returns the new session and which
+        of the two, "fork" or "replay". Raises ValueError if *target_id* exists.
+        """
+        async with self._lock:
+            if target_id in self._sessions:
+                raise ValueError(f"Session {target_id} already exists")
+        source = await self.get(source_id)
+        child, method = await source.branch(target_id)
+        async with self._lock:
+            if target_id in self._sessions:
+                await child.shutdown()
+                raise ValueError(f"Session {target_id} already exists")
+            self._sessions[target_id] = child
+        return child, method
+
     async def reset(self, session_id: str) -> None:
         session = await self.get(session_id)
         await session.reset()
@@ -772,6 +1247,7 @@ class SageSessionManager:
         if not sessions_to_shutdown:
             return
         LOGGER.info("Culling %d idle Sage session(s)", len(sessions_to_shutdown))
+        await self._stop_recycling([sid for sid, _ in sessions_to_shutdown])
         # Persist before terminating. shutdown() and stop() already do this, but
         # culling did not -- so with persistence enabled the ordinary idle
         # lifecycle silently discarded state that was meant to survive.
@@ -792,6 +1268,11 @@ class SageSessionManager:
         async with self._lock:
             sessions = list(self._sessions.values())
             self._sessions.clear()
+            starting = list(self._starting.values())
+        for task in starting:
+            task.cancel()
+        await asyncio.gather(*starting, return_exceptions=True)
+        await self._stop_recycling(list(self._recycling))
         # Persist journals before shutting down workers
         for session in sessions:
             try:
@@ -810,6 +1291,21 @@ class SageSessionManager:
                     "Failed to shut down session %s cleanly: %s", session.session_id, result
                 )
 
+    def worker_stats(self) -> list[dict[str, int | None]]:
+        """Per-workspace figures for the metrics exporter: pid, queue depth, journal length.
+
+        Without session ids, which are credentials (see session_resource); a
+        worker is named by its pid, or None when it is not running.
+        """
+        return [
+            {
+                "pid": session._process.pid if session.is_alive() and session._process else None,
+                "queued": session.requests.depth,
+                "statements": len(session._code_journal),
+            }
+            for session in list(self._sessions.values())
+        ]
+
     def snapshot(self) -> list[dict[str, float | str | bool]]:
         now = time.time()
         return [
@@ -819,6 +1315,7 @@ class SageSessionManager:
                 "started_at": sess.started_at,
                 "last_used_at": sess.last_used_at,
                 "idle_seconds": now - sess.last_used_at,
+                "queued": sess.requests.depth,
             }
             for sid, sess in self._sessions.items()
         ]
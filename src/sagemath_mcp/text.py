@@ -13,3 +13,39 @@ SESSION_ARG_DESC = (
     "Named workspace to use. Workspaces have independent variables; "
     f"omit for '{DEFAULT_SESSION_NAME}'."
 )
+
+# Appended to the `operation` description of every *_operation tool that takes
+# a list of operations.
+OPERATION_LIST_DESC = (
+    "Pass a list to compute several from one construction; the answer is then "
+    "a dict of results, errors and timings per operation."
+)
+
+# The `keep` parameter of the tools that construct an object from a description.
+KEEP_DESC = (
+    "Keep the constructed object in the workspace and return a 'handle'. Pass "
+    "the handle in place of the description on later calls to reuse the object "
+    "and everything Sage has cached on it."
+)
+
+# The `inline` parameter of the tools whose output goes to the artifact store.
+INLINE_DESC = (
+    "Return the output as base64 in the response. By default it is stored and "
+    "the response carries an 'artifact' URI to read it from, and a 'url' for "
+    "HTTP clients."
+)
+
+# The `fail_if_busy` parameter of the general evaluation tools.
+FAIL_IF_BUSY_DESC = (
+    "Fail at once instead of queueing when the workspace is already running "
+    "something, so the call can go to another workspace."
+)
+
+# The `algorithm` parameter of the symbolic tools that can race backends.
+ALGORITHM_DESC = (
+    "'default' runs Sage's usual algorithm (Maxima) in the workspace; a backend "
+    "name runs that one there. 'portfolio' races every backend in separate "
+    "workers and returns the first answer; 'auto' goes straight to the backend "
+    "that has won this kind of problem before, and races when it fails. "
+    "Portfolio workers do not see workspace variables."
+)
@@ -1,6 +1,6 @@
 """Tool modules, imported for their registration side effects.
 
-Importing this package is what puts the 37 tools and 3 resources on the shared
+Importing this package is what puts the 47 tools and 4 resources on the shared
 FastMCP object. ``server`` imports it for exactly that reason, so the names must
 stay listed here -- a module missing from this list registers nothing and its
 tools simply vanish from the catalogue.
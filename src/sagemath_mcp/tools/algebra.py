@@ -22,13 +22,24 @@ from ..codegen import (
     _encode_literal,
     _evaluate_structured,
     _exact_matrix_entries,
+    _kept_object,
+    _matrix_literal,
+    _matrix_ring,
+    _object_handle,
+    _requested_operations,
+    _run_operations,
     _sage_prelude,
+    _sparse_literal,
+    _sparse_matrix_entries,
+    _sparse_result,
     _validated_expression,
     _validated_identifier,
 )
 from ..session import (
     DEFAULT_SESSION_NAME,
 )
+from ..text import KEEP_DESC as _KEEP_DESC
+from ..text import OPERATION_LIST_DESC as _OPERATION_LIST_DESC
 from ..text import SESSION_ARG_DESC as _SESSION_ARG_DESC
 
 
@@ -76,6 +87,16 @@ async def solve_equation(
     return {"solutions": solutions}
 
 
+_RING_DESC = (
+    "Base ring: ZZ, QQ, QQbar, RDF, CDF or SR. Omit to use the narrowest exact "
+    "ring the entries allow -- ZZ for integers, QQ once a rational is present, SR "
+    "for floats -- which gives the same answers as SR, far faster."
+)
+_NUMERIC_DESC = (
+    "Compute in double precision (RDF) instead of exactly. Much faster for large "
+    "matrices; results are floating-point approximations."
+)
+
 # How a matrix entry or scalar comes back. Floats stay floats -- changing that
 # would alter every existing result -- except where a float cannot hold the
 # value: past MAX_SAFE_INTEGER an integral entry is returned exactly, and the
@@ -85,18 +106,31 @@ _EXACT_SCALAR = (
     "else (float(_v) if _v in RR else str(_v)))"
 )
 
+# Over ZZ and QQ the eigenvalues are QQbar elements, whose repr of a non-real
+# root is a decimal approximation ("1.414213562373095?*I"). SR printed the same
+# root as "sqrt(2)*I", so a complex one is converted to its radical form first
+# and the result stays as exact as it was when every matrix lived on SR.
+_EIGENVALUE = (
+    f"(lambda _v: {_EXACT_SCALAR}(_v.radical_expression() "
+    "if (_v.parent() is QQbar and _v not in RR) else _v))"
+)
+
 
 @mcp.tool(description="Multiply two matrices and return the result as nested lists")
 async def matrix_multiply(
     matrix_a: Annotated[
         list[list[float | int | str]],
         Field(description="Left matrix (rows of numbers). Integers stay exact; "
-              'pass values from 2^53 up as decimal strings, e.g. "9007199254740993".'),
+              'pass values from 2^53 up as decimal strings, e.g. "9007199254740993", '
+              'and rationals as "p/q" strings.'),
     ],
     matrix_b: Annotated[
         list[list[float | int | str]],
-        Field(description="Right matrix (rows of numbers). Integers stay exact."),
+        Field(description="Right matrix (rows of numbers). Integers and \"p/q\" "
+              "rationals stay exact."),
     ],
+    ring: Annotated[str | None, Field(description=_RING_DESC)] = None,
+    numeric: Annotated[bool, Field(description=_NUMERIC_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
@@ -115,12 +149,13 @@ async def matrix_multiply(
             f"{len(matrix_b)}x{len(matrix_b[0])} matrix: the number of columns in "
             "matrix_a must equal the number of rows in matrix_b"
         )
+    base_ring = _matrix_ring(matrix_a + matrix_b, ring, numeric)
     session = await runtime.resolve_session(ctx.session_id, session)
     code = textwrap.dedent(
         f"""
         from sage.all import *
-        A = matrix(SR, {matrix_a})
-        B = matrix(SR, {matrix_b})
+        A = matrix({base_ring}, {_matrix_literal(matrix_a)})
+        B = matrix({base_ring}, {_matrix_literal(matrix_b)})
         C = A * B
         [[{_EXACT_SCALAR}(entry) for entry in row] for row in C.rows()]
         """
@@ -137,26 +172,27 @@ async def matrix_operation(
     matrix: Annotated[
         list[list[float | int | str]],
         Field(description="Matrix as nested list of numbers. Integers stay exact; "
-              'pass values from 2^53 up as decimal strings.'),
+              'pass values from 2^53 up as decimal strings, and rationals as "p/q" '
+              "strings."),
     ],
     operation: Annotated[
-        str,
-        Field(description="One of: determinant, inverse, eigenvalues, rank, rref, transpose"),
+        str | list[str],
+        Field(description="One of: determinant, inverse, eigenvalues, rank, rref, "
+              "transpose. " + _OPERATION_LIST_DESC),
     ],
+    ring: Annotated[str | None, Field(description=_RING_DESC)] = None,
+    numeric: Annotated[bool, Field(description=_NUMERIC_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    operation = operation.strip()
     _check_matrix(matrix, "matrix")
     matrix = _exact_matrix_entries(matrix, "matrix")
-    allowed_ops = {"determinant", "inverse", "eigenvalues", "rank", "rref", "transpose"}
-    if operation not in allowed_ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Must be one of: {', '.join(sorted(allowed_ops))}"
-        )
+    operations = _requested_operations(
+        operation, {"determinant", "inverse", "eigenvalues", "rank", "rref", "transpose"}
+    )
+    base_ring = _matrix_ring(matrix, ring, numeric)
     session = await runtime.resolve_session(ctx.session_id, session)
     # int before float: an integer determinant or entry cast to a double loses
     # exactness for anything past 2^53, and these tools exist to be exact.
@@ -166,22 +202,307 @@ async def matrix_operation(
     op_code = {
         "determinant": f"{_EXACT_SCALAR}(M.determinant())",
         "inverse": _row_repr.format(obj="M.inverse()"),
-        "eigenvalues": f"[{_EXACT_SCALAR}(ev) for ev in M.eigenvalues()]",
+        "eigenvalues": f"[{_EIGENVALUE}(ev) for ev in M.eigenvalues()]",
         "rank": "int(M.rank())",
         "rref": _row_repr.format(obj="M.rref()"),
         "transpose": _row_repr.format(obj="M.transpose()"),
     }
-    code = textwrap.dedent(
+    setup = f"from sage.all import *\nM = matrix({base_ring}, {_matrix_literal(matrix)})\n"
+    return await _run_operations(
+        session, setup, op_code, operations, single=isinstance(operation, str)
+    )
+
+
+# The worker's half of a sparse result: [row, column, value] triples in position
+# order, which `_sparse_result` turns back into the caller's layout.
+_SPARSE_TRIPLES = (
+    f"(lambda _A: [[int(_i), int(_j), {_EXACT_SCALAR}(_v)] "
+    "for (_i, _j), _v in sorted(_A.dict().items())])"
+)
+
+
+@mcp.tool(description=(
+        "Linear algebra on a sparse matrix given by its non-zeros (coordinate "
+        "triples or CSR): rank, determinant, solve, kernel, a few eigenvalues "
+        "(double precision), transpose. Use this instead of matrix_operation for "
+        "large, mostly-zero matrices such as graph Laplacians."
+    ))
+async def sparse_matrix_operation(
+    shape: Annotated[
+        list[int],
+        Field(description="Matrix size as [rows, columns]."),
+    ],
+    operation: Annotated[
+        str,
+        Field(description="One of: rank, determinant, solve, kernel, eigenvalues, transpose"),
+    ],
+    entries: Annotated[
+        list[list[float | int | str]] | None,
+        Field(description="Coordinate form: [row, column, value] triples for the "
+              "non-zeros, 0-based. Values follow matrix_operation: integers and "
+              '"p/q" strings stay exact.'),
+    ] = None,
+    indptr: Annotated[
+        list[int] | None,
+        Field(description="CSR form: row pointers, rows + 1 of them. Use with "
+              "indices and data instead of entries."),
+    ] = None,
+    indices: Annotated[
+        list[int] | None,
+        Field(description="CSR form: column index of each non-zero."),
+    ] = None,
+    data: Annotated[
+        list[float | int | str] | None,
+        Field(description="CSR form: value of each non-zero."),
+    ] = None,
+    rhs: Annotated[
+        list[float | int | str] | None,
+        Field(description="Right-hand side b for operation='solve' (solves M*x = b)."),
+    ] = None,
+    count: Annotated[
+        int,
+        Field(description="How many eigenvalues to return, largest in magnitude first.", ge=1),
+    ] = 6,
+    ring: Annotated[str | None, Field(description=_RING_DESC)] = None,
+    numeric: Annotated[bool, Field(description=_NUMERIC_DESC)] = False,
+    session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> dict:
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required for stateful execution")
+    operation = operation.strip()
+    allowed_ops = {"rank", "determinant", "solve", "kernel", "eigenvalues", "transpose"}
+    if operation not in allowed_ops:
+        raise ToolError(
+            f"Unknown operation '{operation}'. "
+            f"Must be one of: {', '.join(sorted(allowed_ops))}"
+        )
+    nrows, ncols, triples, layout = _sparse_matrix_entries(
+        shape, entries, indptr, indices, data
+    )
+    if operation in {"determinant", "eigenvalues"} and nrows != ncols:
+        raise ToolError(f"'{operation}' needs a square matrix; this one is {nrows}x{ncols}")
+    vector_b = []
+    if operation == "solve":
+        if rhs is None or len(rhs) != nrows:
+            raise ToolError(f"'solve' needs 'rhs' with one value per row ({nrows})")
+        vector_b = _exact_matrix_entries([rhs], "rhs")[0]
+    base_ring = _matrix_ring([[value for *_, value in triples] + vector_b], ring, numeric)
+    session = await runtime.resolve_session(ctx.session_id, session)
+
+    # scipy's view of the same non-zeros, for the two operations where an exact
+    # Sage routine would densify: a handful of eigenvalues of a large operator,
+    # and a double-precision solve. Nothing here is proportional to rows*columns.
+    cast = "complex" if base_ring == "CDF" else "float"
+    to_scipy = textwrap.dedent(
         f"""
-        from sage.all import *
-        M = matrix(SR, {matrix})
-        {op_code[operation]}
+        import numpy
+        import scipy.sparse
+        import scipy.sparse.linalg
+        _d = M.dict()
+        _A = scipy.sparse.csr_matrix(
+            (numpy.array([{cast}(_v) for _v in _d.values()]),
+             ([_k[0] for _k in _d], [_k[1] for _k in _d])),
+            shape=({nrows}, {ncols}),
+        )
         """
     )
+    if operation == "eigenvalues":
+        # ARPACK finds k of n eigenvalues only for k < n - 1; a request for
+        # nearly all of them is a dense problem anyway and is answered densely.
+        symmetric = "M.is_hermitian()" if cast == "complex" else "M.is_symmetric()"
+        k = min(count, nrows)
+        op_code = to_scipy + textwrap.dedent(
+            f"""
+            if {k} < {nrows} - 1 and {symmetric}:
+                _ev = scipy.sparse.linalg.eigsh(_A, k={k}, which='LM', return_eigenvectors=False)
+            elif {k} < {nrows} - 1:
+                _ev = scipy.sparse.linalg.eigs(_A, k={k}, which='LM', return_eigenvectors=False)
+            else:
+                _ev = numpy.linalg.eigvals(_A.toarray())
+            _ev = sorted(_ev, key=lambda _z: -abs(_z))[:{k}]
+            [{_EXACT_SCALAR}(CDF(_z)) for _z in _ev]
+            """
+        )
+    elif operation == "solve" and base_ring in {"RDF", "CDF"} and nrows == ncols:
+        op_code = to_scipy + textwrap.dedent(
+            f"""
+            _x = scipy.sparse.linalg.spsolve(
+                _A.tocsc(), numpy.array([{cast}(_v) for _v in {_matrix_literal([vector_b])}[0]])
+            )
+            if not numpy.isfinite(_x).all():
+                raise ValueError("matrix is singular")
+            [{_EXACT_SCALAR}(CDF(_v)) for _v in _x]
+            """
+        )
+    else:
+        op_code = {
+            "rank": "int(M.rank())",
+            "determinant": f"{_EXACT_SCALAR}(M.determinant())",
+            "solve": (
+                f"[{_EXACT_SCALAR}(_v) for _v in M.solve_right("
+                f"vector({base_ring}, {_matrix_literal([vector_b])}[0]))]"
+            ),
+            "kernel": (
+                "_K = M.right_kernel_matrix().sparse_matrix()\n"
+                f"(int(_K.nrows()), {_SPARSE_TRIPLES}(_K))"
+            ),
+            "transpose": f"{_SPARSE_TRIPLES}(M.transpose())",
+        }[operation]
+    code = (
+        "from sage.all import *\n"
+        f"M = matrix({base_ring}, {nrows}, {ncols}, {_sparse_literal(triples)}, sparse=True)\n"
+        + op_code
+    )
     result = await _evaluate_structured(session, code)
+    if operation == "kernel":
+        dimension, basis = result
+        result = _sparse_result([dimension, ncols], basis, layout)
+    elif operation == "transpose":
+        result = _sparse_result([ncols, nrows], result, layout)
     return {"operation": operation, "result": result}
 
 
+# Factorizations kept by linear_solve, by name, in the session namespace. The
+# leading underscore keeps the dict out of reach of caller code, and because
+# the creating snippet is journaled like any other, a restored session has it
+# back.
+_FACTORS = "_linear_solve_factors"
+
+# Solve every right-hand side against one stored factorization.
+#
+# Exact rings keep T with T*A = rref(A), from one row reduction of [A | I]: a
+# right-hand side is then a matrix-vector product away. Rows of T*b past the
+# rank must vanish or that system is inconsistent (None); otherwise the pivot
+# variables take the leading entries and the free ones are 0 -- the particular
+# solution solve_right would give. RDF and CDF keep LAPACK's LU factors and
+# solve the whole batch in one lu_solve.
+_SOLVE_BATCH = textwrap.dedent(
+    """
+    def _solve_batch(_f, _rhs):
+        _kind, _data, _m, _n, _R = _f
+        if any(len(_b) != _m for _b in _rhs):
+            raise ValueError("each right-hand side needs %d entries, one per row" % _m)
+        if _kind == 'lu':
+            _dtype = complex if _R is CDF else float
+            _X = scipy.linalg.lu_solve(_data, numpy.array(_rhs, dtype=_dtype).T)
+            return [[_R(_v) for _v in _col] for _col in _X.T]
+        _T, _pivots = _data
+        _out = []
+        for _b in _rhs:
+            _c = _T * vector(_R, _b)
+            if any(_c[_i] != 0 for _i in range(len(_pivots), _m)):
+                _out.append(None)
+                continue
+            _x = [_R(0)] * _n
+            for _i, _p in enumerate(_pivots):
+                _x[_p] = _c[_i]
+            _out.append(_x)
+        return _out
+    """
+)
+
+
+@mcp.tool(description=(
+        "Solve A*x = b for a batch of right-hand sides, factoring A once. Can keep "
+        "the factorization in the session under a name so later calls skip it. "
+        "Prefer this over repeated evaluate_sage or matrix_operation calls."
+    ))
+async def linear_solve(
+    rhs: Annotated[
+        list[list[float | int | str]],
+        Field(description="Right-hand sides b, one list per system, each with one "
+              'value per row of A. Integers and "p/q" strings stay exact.'),
+    ],
+    matrix: Annotated[
+        list[list[float | int | str]] | None,
+        Field(description="The matrix A as nested lists. Omit to reuse a stored "
+              "factorization."),
+    ] = None,
+    factorization: Annotated[
+        str | None,
+        Field(description="Name to keep the factorization under in the session "
+              "(with matrix), or to reuse (without it), e.g. 'stiffness'."),
+    ] = None,
+    ring: Annotated[str | None, Field(description=_RING_DESC)] = None,
+    numeric: Annotated[bool, Field(description=_NUMERIC_DESC)] = False,
+    session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> dict:
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required for stateful execution")
+    if factorization is not None:
+        factorization = _validated_identifier(factorization, "factorization")
+    if matrix is None and factorization is None:
+        raise ToolError("Pass 'matrix', or the name of a stored 'factorization' to reuse")
+    if matrix is None and (ring is not None or numeric):
+        raise ToolError("'ring' and 'numeric' apply when factoring; the stored one keeps its own")
+    if not rhs:
+        raise ToolError("'rhs' must hold at least one right-hand side")
+    vectors = _exact_matrix_entries(rhs, "rhs")
+
+    code = "from sage.all import *\nimport numpy\nimport scipy.linalg\n" + textwrap.dedent(
+        f"""
+        try:
+            {_FACTORS}
+        except NameError:
+            {_FACTORS} = {{}}
+        """
+    ) + _SOLVE_BATCH
+    if matrix is not None:
+        _check_matrix(matrix, "matrix")
+        matrix = _exact_matrix_entries(matrix, "matrix")
+        base_ring = _matrix_ring(matrix, ring, numeric)
+        if base_ring in {"RDF", "CDF"}:
+            if len(matrix) != len(matrix[0]):
+                raise ToolError(
+                    f"A double-precision solve needs a square matrix; this one is "
+                    f"{len(matrix)}x{len(matrix[0])}"
+                )
+            factor = textwrap.dedent(
+                """
+                _lu = scipy.linalg.lu_factor(A.numpy())
+                if not numpy.diag(_lu[0]).all():
+                    raise ZeroDivisionError("matrix is singular to working precision")
+                _f = ('lu', _lu, A.nrows(), A.ncols(), A.base_ring())
+                """
+            )
+        else:
+            # Over ZZ the row reduction would be Hermite form, not rref; the
+            # solutions are rational anyway, so the factor lives over QQ.
+            factor = textwrap.dedent(
+                """
+                _R = A.base_ring().fraction_field()
+                _aug = A.change_ring(_R).augment(identity_matrix(_R, A.nrows())).rref()
+                _pivots = [_p for _p in _aug.pivots() if _p < A.ncols()]
+                _f = ('echelon', (_aug[:, A.ncols():], _pivots), A.nrows(), A.ncols(), _R)
+                """
+            )
+        code += f"A = matrix({base_ring}, {_matrix_literal(matrix)})\n" + factor
+        if factorization is not None:
+            code += f"{_FACTORS}[{_encode_literal(factorization)}] = _f\n"
+    else:
+        code += textwrap.dedent(
+            f"""
+            if {_encode_literal(factorization)} not in {_FACTORS}:
+                raise KeyError("no factorization named " + {_encode_literal(factorization)}
+                               + " in this session; pass 'matrix' to create it")
+            _f = {_FACTORS}[{_encode_literal(factorization)}]
+            """
+        )
+    session = await runtime.resolve_session(ctx.session_id, session)
+    code += (
+        f"[None if _x is None else [{_EXACT_SCALAR}(_v) for _v in _x] "
+        f"for _x in _solve_batch(_f, {_matrix_literal(vectors)})]"
+    )
+    solutions = await _evaluate_structured(session, code)
+    return {
+        "solutions": solutions,
+        "factorization": factorization,
+        "reused": matrix is None,
+    }
+
+
 @mcp.tool(
     description=(
         "Boolean polynomials over GF(2): evaluate, list variables, degree, and "
@@ -253,7 +574,11 @@ async def polynomial_ring_operation(
     ],
     polynomials: Annotated[
         list[str],
-        Field(description="Polynomials as strings, e.g. ['a^2+b', 'b^2-1']"),
+        Field(
+            description="Polynomials as strings, e.g. ['a^2+b', 'b^2-1']. The "
+            "first entry may instead be an ideal handle from an earlier call "
+            "with keep=true; the polynomials after it are then only used by reduce"
+        ),
     ],
     operation: Annotated[
         str,
@@ -263,6 +588,7 @@ async def polynomial_ring_operation(
         ),
     ],
     base_ring: Annotated[str, Field(description="Base ring")] = "QQ",
+    keep: Annotated[bool, Field(description=_KEEP_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
@@ -272,6 +598,9 @@ async def polynomial_ring_operation(
     session = await runtime.resolve_session(ctx.session_id, session)
     ring_vars = [_validated_identifier(v, "ring_vars") for v in ring_vars]
     var_list = ", ".join(ring_vars)
+    handle = _object_handle(polynomials[0], "ideal") if polynomials else None
+    if handle:
+        polynomials = polynomials[1:]
     ops = {
         "groebner_basis": "[str(g) for g in _I.groebner_basis()]",
         "ideal_dimension": "int(_I.dimension())",
@@ -292,13 +621,13 @@ async def polynomial_ring_operation(
     polys_code = ", ".join(
         f"_R({_encode_literal(p)})" for p in polynomials
     )
-    code = (
-        _sage_prelude(ring_vars)
-        + f"_R = PolynomialRing({_validated_expression(base_ring)}, '{var_list}')\n"
+    construct = "" if handle else (
+        f"_R = PolynomialRing({_validated_expression(base_ring)}, '{var_list}')\n"
         + "_R.inject_variables(verbose=False)\n"
         + f"_I = _R.ideal([{polys_code}])\n"
-        + ops[operation]
-        + "\n"
     )
+    setup, handle = _kept_object(handle, keep, "ideal", construct, ["_R", "_I"])
+    code = _sage_prelude(ring_vars) + setup + ops[operation] + "\n"
     result = await _evaluate_structured(session, code)
-    return {"operation": operation, "result": result}
+    answer = {"operation": operation, "result": result}
+    return {**answer, "handle": handle} if handle else answer
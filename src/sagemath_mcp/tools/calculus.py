@@ -8,6 +8,9 @@ would have prefixed them.
 
 from __future__ import annotations
 
+import base64
+import itertools
+import math
 import textwrap
 from typing import Annotated
 
@@ -18,17 +21,29 @@ from pydantic import Field
 from .. import runtime
 from ..app import mcp
 from ..codegen import (
+    _array_type,
     _declare_free_symbols,
     _encode_literal,
     _evaluate_structured,
     _sage_prelude,
+    _solve,
     _validated_identifier,
 )
+from ..portfolio import problem_class
 from ..session import (
     DEFAULT_SESSION_NAME,
 )
+from ..text import ALGORITHM_DESC as _ALGORITHM_DESC
+from ..text import INLINE_DESC as _INLINE_DESC
 from ..text import SESSION_ARG_DESC as _SESSION_ARG_DESC
 
+# solve_ode_numeric: scipy's solve_ivp methods. The implicit ones get the exact
+# Jacobian, differentiated symbolically and compiled like the right-hand side.
+_ODE_METHODS = ("RK45", "RK23", "DOP853", "Radau", "BDF", "LSODA")
+_ODE_IMPLICIT = ("Radau", "BDF", "LSODA")
+_ODE_MAX_EQUATIONS = 50
+_ODE_MAX_TIMES = 100_000
+
 
 @mcp.tool(description="Differentiate an expression with respect to a variable")
 async def differentiate_expression(
@@ -70,6 +85,7 @@ async def integrate_expression(
         str | None,
         Field(description="Upper bound for definite integral (e.g., '1', 'oo')"),
     ] = None,
+    algorithm: Annotated[str, Field(description=_ALGORITHM_DESC)] = "default",
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
@@ -77,35 +93,34 @@ async def integrate_expression(
         raise ToolError("MCP context with session_id is required for stateful execution")
     if (lower_bound is None) != (upper_bound is None):
         raise ToolError("Both lower_bound and upper_bound must be provided for a definite integral")
-    session = await runtime.resolve_session(ctx.session_id, session)
     definite = lower_bound is not None
-    if definite:
-        code = (
-            _sage_prelude([variable])
-            + textwrap.dedent(
+
+    def build(name: str | None) -> str:
+        algorithm_arg = f", algorithm={name!r}" if name else ""
+        if definite:
+            return _sage_prelude([variable]) + textwrap.dedent(
                 f"""
             _var = var({_encode_literal(variable)})
             _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
             {_declare_free_symbols(lower_bound, upper_bound)}
             _lb = sage_eval({_encode_literal(lower_bound)}, locals=_locals)
             _ub = sage_eval({_encode_literal(upper_bound)}, locals=_locals)
-            str(integrate(_expr, _var, _lb, _ub))
+            str(integrate(_expr, _var, _lb, _ub{algorithm_arg}))
             """
             )
-        )
-    else:
-        code = (
-            _sage_prelude([variable])
-            + textwrap.dedent(
-                f"""
+        return _sage_prelude([variable]) + textwrap.dedent(
+            f"""
             _var = var({_encode_literal(variable)})
             _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
-            str(integrate(_expr, _var))
+            str(integrate(_expr, _var{algorithm_arg}))
             """
-            )
         )
-    result = await _evaluate_structured(session, code)
-    return {"integral": result, "definite": definite}
+
+    problem = problem_class(
+        "integrate", expression, "definite" if definite else "indefinite"
+    )
+    result, how = await _solve(ctx.session_id, session, "integrate", algorithm, problem, build)
+    return {"integral": result, "definite": definite, **how}
 
 
 @mcp.tool(description="Compute the limit of an expression")
@@ -117,27 +132,29 @@ async def limit_expression(
         str | None,
         Field(description="Direction: 'plus' (right), 'minus' (left), or omit for both"),
     ] = None,
+    algorithm: Annotated[str, Field(description=_ALGORITHM_DESC)] = "default",
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    session = await runtime.resolve_session(ctx.session_id, session)
     dir_arg = f", dir={_encode_literal(direction)}" if direction else ""
-    code = (
-        _sage_prelude([variable])
-        + textwrap.dedent(
+
+    def build(name: str | None) -> str:
+        algorithm_arg = f", algorithm={name!r}" if name else ""
+        return _sage_prelude([variable]) + textwrap.dedent(
             f"""
         _var = var({_encode_literal(variable)})
         _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
         {_declare_free_symbols(point)}
         _point = sage_eval({_encode_literal(point)}, locals=_locals)
-        str(limit(_expr, _var, _point{dir_arg}))
+        str(limit(_expr, _var, _point{dir_arg}{algorithm_arg}))
         """
         )
-    )
-    result = await _evaluate_structured(session, code)
-    return {"limit": result}
+
+    problem = problem_class("limit", expression, "infinite" if "oo" in point else "finite")
+    result, how = await _solve(ctx.session_id, session, "limit", algorithm, problem, build)
+    return {"limit": result, **how}
 
 
 @mcp.tool(description="Compute a Taylor/Laurent series expansion")
@@ -223,6 +240,163 @@ async def solve_ode(
     return {"solution": result}
 
 
+@mcp.tool(description=(
+        "Integrate an initial value problem numerically: a system of first-order "
+        "ODEs dy/dt = f(t, y), with a choice of explicit or stiff method. Returns "
+        "the trajectory at the requested times as a binary float array. Prefer "
+        "this over solve_ode when no closed form is needed."
+    ))
+async def solve_ode_numeric(
+    rhs: Annotated[
+        list[str],
+        Field(
+            description="Right-hand side of each equation, one per dependent "
+            "variable (e.g. ['v', '-sin(y)'] for a pendulum)"
+        ),
+    ],
+    functions: Annotated[
+        list[str], Field(description="Dependent variables, in order (e.g. ['y', 'v'])")
+    ],
+    initial: Annotated[
+        list[float], Field(description="Value of each dependent variable at the start time")
+    ],
+    t_span: Annotated[list[float], Field(description="[start, end] of the integration")],
+    variable: Annotated[str, Field(description="Independent variable")] = "t",
+    times: Annotated[
+        list[float] | None,
+        Field(description="Times to report, in order from start to end; default evenly spaced"),
+    ] = None,
+    points: Annotated[
+        int, Field(description="Number of evenly spaced report times when 'times' is omitted")
+    ] = 101,
+    method: Annotated[
+        str,
+        Field(
+            description="LSODA (default; switches to a stiff method when needed), "
+            "RK45, RK23, DOP853, or the stiff Radau and BDF"
+        ),
+    ] = "LSODA",
+    rtol: Annotated[float, Field(description="Relative tolerance")] = 1e-8,
+    atol: Annotated[float, Field(description="Absolute tolerance")] = 1e-10,
+    dtype: Annotated[
+        str, Field(description="float64 (default) or float32, half the size")
+    ] = "float64",
+    inline: Annotated[bool, Field(description=_INLINE_DESC)] = False,
+    session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> dict:
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required for stateful execution")
+    variable = _validated_identifier(variable, "variable")
+    functions = [_validated_identifier(name, "functions") for name in functions]
+    if not 1 <= len(functions) <= _ODE_MAX_EQUATIONS:
+        raise ToolError(
+            f"'functions' must name between 1 and {_ODE_MAX_EQUATIONS} dependent variables"
+        )
+    if len(rhs) != len(functions) or len(initial) != len(functions):
+        raise ToolError(
+            f"{len(functions)} functions need {len(functions)} right-hand sides and "
+            f"initial values, got {len(rhs)} and {len(initial)}"
+        )
+    if variable in functions:
+        raise ToolError(f"'{variable}' cannot be both the variable and a function")
+    if method not in _ODE_METHODS:
+        raise ToolError(f"Unknown method '{method}'. Must be one of: {', '.join(_ODE_METHODS)}")
+    if (
+        len(t_span) != 2
+        or not all(math.isfinite(value) for value in [*t_span, *initial])
+        or t_span[0] == t_span[1]
+    ):
+        raise ToolError(
+            "'t_span' must be [start, end] with finite, distinct ends, "
+            "and every initial value finite"
+        )
+    if not (rtol > 0 and atol > 0):
+        raise ToolError("'rtol' and 'atol' must be positive")
+    start, end = float(t_span[0]), float(t_span[1])
+    if times is None:
+        if not 2 <= points <= _ODE_MAX_TIMES:
+            raise ToolError(f"'points' must be between 2 and {_ODE_MAX_TIMES}, got {points}")
+        report = f"numpy.linspace({start!r}, {end!r}, {points})"
+        rows = points
+    else:
+        direction = 1 if end > start else -1
+        if not 1 <= len(times) <= _ODE_MAX_TIMES or any(
+            not math.isfinite(value) or not 0 <= direction * (value - start) <= abs(end - start)
+            for value in times
+        ) or any(direction * (b - a) <= 0 for a, b in itertools.pairwise(times)):
+            raise ToolError(
+                f"'times' must be 1 to {_ODE_MAX_TIMES} distinct times inside t_span, "
+                "ordered from start to end"
+            )
+        report = f"numpy.array({_encode_literal([float(value) for value in times])})"
+        rows = len(times)
+    columns = [variable, *functions]
+    type_code = _array_type(
+        dtype, rows * len(columns), "report fewer times or use dtype float32"
+    )
+    session = await runtime.resolve_session(ctx.session_id, session)
+    code = (
+        _sage_prelude(columns)
+        + textwrap.dedent(
+            f"""
+        import base64
+        import numpy
+        from scipy.integrate import solve_ivp
+        _t = var({_encode_literal(variable)})
+        _ys = [var(_name) for _name in {_encode_literal(functions)}]
+        _rhs = [SR(sage_eval(_text, locals=_locals)) for _text in {_encode_literal(rhs)}]
+        # Compiled once; the solver then calls plain machine-float functions.
+        # Compiling is also the check that f uses no name beyond t and y.
+        _fs = [fast_callable(_e, vars=[_t] + _ys, domain=RDF) for _e in _rhs]
+
+        def _field(_tv, _yv):
+            return [float(_f(_tv, *_yv)) for _f in _fs]
+
+        _options = {{}}
+        if {method!r} in {_ODE_IMPLICIT!r}:
+            try:
+                _jac = [[fast_callable(diff(_e, _y), vars=[_t] + _ys, domain=RDF)
+                         for _y in _ys] for _e in _rhs]
+
+                def _jacobian(_tv, _yv):
+                    return [[float(_g(_tv, *_yv)) for _g in _row] for _row in _jac]
+
+                _options['jac'] = _jacobian
+            except Exception:
+                pass
+        _sol = solve_ivp(
+            _field, ({start!r}, {end!r}), {_encode_literal([float(v) for v in initial])},
+            method={method!r}, t_eval={report}, rtol={float(rtol)!r}, atol={float(atol)!r},
+            **_options,
+        )
+        _out = numpy.column_stack([_sol.t, numpy.asarray(_sol.y).T]).astype({type_code!r})
+        {{'values': base64.b64encode(_out.tobytes()).decode('ascii'),
+          'rows': int(_out.shape[0]), 'success': bool(_sol.success),
+          'message': str(_sol.message), 'nfev': int(_sol.nfev), 'njev': int(_sol.njev)}}
+        """
+        )
+    )
+    payload = await _evaluate_structured(session, code)
+    result = {
+        "columns": columns,
+        "shape": [payload["rows"], len(columns)],
+        "dtype": dtype,
+        "byte_order": "little",
+        "method": method,
+        "success": payload["success"],
+        "message": payload["message"],
+        "nfev": payload["nfev"],
+        "njev": payload["njev"],
+    }
+    if inline:
+        return {**result, "values": payload["values"]}
+    artifact = runtime.ARTIFACTS.put(
+        ctx.session_id, base64.b64decode(payload["values"]), "application/octet-stream"
+    )
+    return {**result, **artifact.describe()}
+
+
 @mcp.tool(description=(
         "Closed form of a symbolic sum or product over an index variable, "
         "including infinite series. Prefer this over evaluate_sage for summations."
@@ -235,28 +409,31 @@ async def symbolic_sum(
     product: Annotated[
         bool, Field(description="If true, compute a product instead of a sum")
     ] = False,
+    algorithm: Annotated[str, Field(description=_ALGORITHM_DESC)] = "default",
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    session = await runtime.resolve_session(ctx.session_id, session)
     op = "product" if product else "sum"
-    code = (
-        _sage_prelude([variable])
-        + textwrap.dedent(
+
+    def build(name: str | None) -> str:
+        algorithm_arg = f", algorithm={name!r}" if name else ""
+        return _sage_prelude([variable]) + textwrap.dedent(
             f"""
         _var = var({_encode_literal(variable)})
         _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
         {_declare_free_symbols(lower, upper)}
         _lo = sage_eval({_encode_literal(lower)}, locals=_locals)
         _hi = sage_eval({_encode_literal(upper)}, locals=_locals)
-        str({op}(_expr, _var, _lo, _hi))
+        str({op}(_expr, _var, _lo, _hi{algorithm_arg}))
         """
         )
-    )
-    result = await _evaluate_structured(session, code)
-    return {"result": result, "operation": op}
+
+    bounds = "infinite" if "oo" in lower or "oo" in upper else "finite"
+    problem = problem_class(op, expression, bounds)
+    result, how = await _solve(ctx.session_id, session, op, algorithm, problem, build)
+    return {"result": result, "operation": op, **how}
 
 
 @mcp.tool(
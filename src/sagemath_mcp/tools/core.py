@@ -9,35 +9,56 @@ would have prefixed them.
 from __future__ import annotations
 
 import asyncio
+import base64
 import contextlib
+import functools
+import json
 import logging
+import math
 import textwrap
+import time
+import uuid
 from typing import Annotated
 
 from fastmcp import Context
 from fastmcp.exceptions import ToolError
-from pydantic import Field
+from pydantic import Field, ValidationError, validate_call
+from pydantic_core import to_jsonable_python
 
-from .. import monitoring, runtime
+from .. import monitoring, pipeline, runtime
 from ..app import mcp
 from ..codegen import (
+    _ARRAY_DTYPES,
+    _array_type,
     _encode_literal,
     _evaluate_structured,
     _sage_prelude,
+    _solve,
+    _validated_identifier,
 )
 from ..config import DEFAULT_SETTINGS
+from ..jobs import JobQueueFull
 from ..models import (
     EvaluateResult,
 )
+from ..portfolio import problem_class
 from ..session import (
     DEFAULT_SESSION_NAME,
+    PRIORITY_BACKGROUND,
     SageEvaluationError,
     SageProcessError,
+    WorkspaceBusy,
 )
+from ..text import ALGORITHM_DESC as _ALGORITHM_DESC
+from ..text import FAIL_IF_BUSY_DESC as _FAIL_IF_BUSY_DESC
+from ..text import INLINE_DESC as _INLINE_DESC
 from ..text import SESSION_ARG_DESC as _SESSION_ARG_DESC
 
 LOGGER = logging.getLogger(__name__)
 
+_PARALLEL_MAX_INPUTS = 10_000
+_PIPELINE_MAX_STEPS = 50
+
 
 # NOTE ON THIS DESCRIPTION. It used to say "use this for anything not covered by
 # the specialized helpers" and then demonstrate fourteen domains that ARE covered
@@ -56,7 +77,7 @@ one of these first:
 - calculus: differentiate_expression, integrate_expression, limit_expression, \
 series_expansion, symbolic_sum, solve_ode
 - algebra: solve_equation, simplify_expression, expand_expression, \
-factor_expression, find_root
+factor_expression, find_root, evaluate_on_grid
 - linear algebra: matrix_operation (determinant, inverse, eigenvalues, rank, rref, \
 transpose), matrix_multiply
 - discrete: number_theory_operation, combinatorics_operation (binomial, partitions, \
@@ -96,6 +117,16 @@ async def evaluate_sage(
         ),
     ] = None,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    fail_if_busy: Annotated[bool, Field(description=_FAIL_IF_BUSY_DESC)] = False,
+    include_usage: Annotated[
+        bool,
+        Field(
+            description=(
+                "Add a usage breakdown: CPU time, peak memory growth, time per phase, "
+                "queue wait and transport"
+            )
+        ),
+    ] = False,
     ctx: Context | None = None,
 ) -> EvaluateResult:
     """Run SageMath code, preserving state within the caller's MCP session."""
@@ -114,7 +145,10 @@ async def evaluate_sage(
             want_latex=want_latex,
             capture_stdout=capture_stdout,
             timeout_seconds=timeout_seconds,
+            fail_if_busy=fail_if_busy,
         )
+    except WorkspaceBusy as exc:
+        raise ToolError(f"Workspace '{session}' is busy ({exc.ahead} ahead)") from exc
     except asyncio.CancelledError:
         monitoring.record_failure("cancelled", is_security=False, details="evaluation cancelled")
         await runtime.SESSION_MANAGER.cancel(session_key)
@@ -163,6 +197,7 @@ async def evaluate_sage(
         latex=worker_result.latex,
         stdout=_truncate_stdout(worker_result.stdout),
         elapsed_ms=worker_result.elapsed_ms,
+        usage=worker_result.usage if include_usage else None,
     )
 
 
@@ -233,23 +268,25 @@ async def calculate_expression(
 @mcp.tool(description="Simplify a mathematical expression")
 async def simplify_expression(
     expression: Annotated[str, Field(description="Expression to simplify")],
+    algorithm: Annotated[str, Field(description=_ALGORITHM_DESC)] = "default",
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    session = await runtime.resolve_session(ctx.session_id, session)
-    code = (
-        _sage_prelude()
-        + textwrap.dedent(
+
+    def build(name: str | None) -> str:
+        algorithm_arg = f", algorithm={name!r}" if name else ""
+        return _sage_prelude() + textwrap.dedent(
             f"""
         _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
-        str(simplify(_expr))
+        str(simplify(_expr{algorithm_arg}))
         """
         )
-    )
-    result = await _evaluate_structured(session, code)
-    return {"simplified": result}
+
+    problem = problem_class("simplify", expression)
+    result, how = await _solve(ctx.session_id, session, "simplify", algorithm, problem, build)
+    return {"simplified": result, **how}
 
 
 @mcp.tool(description="Expand a mathematical expression")
@@ -296,51 +333,378 @@ async def factor_expression(
     return {"factored": result}
 
 
-@mcp.tool(description="Find a numeric root of an expression or equation in a given interval")
+# Generated code shared by evaluate_on_grid and find_root: an expression's real
+# values at every point of the arrays *_cols*, NaN where it is complex or
+# undefined. _f is the expression compiled over RDF.
+_VECTORISED = textwrap.dedent(
+    """
+    import numpy
+
+    def _vectorised(_expr, _vars, _f, _cols):
+        # All points in one call where the expression takes arrays: over
+        # Python objects fast_callable hands the arrays to the operators and
+        # Sage's functions dispatch them to NumPy ufuncs.
+        try:
+            with numpy.errstate(all='ignore'):
+                _v = numpy.asarray(fast_callable(_expr, vars=_vars)(*_cols), dtype=complex)
+            _v = numpy.broadcast_to(_v, _cols[0].shape)
+            return numpy.where(_v.imag == 0, _v.real, numpy.nan)
+        except Exception:
+            pass
+
+        def _at(*_p):
+            try:
+                return float(_f(*_p))
+            except Exception:
+                return float('nan')
+
+        return numpy.frompyfunc(_at, len(_vars), 1)(*_cols).astype(float)
+    """
+)
+
+# find_root: an equation is what a caller reaches for when the problem is stated
+# as one -- Kepler's `E - e sin E = M`, a matching condition, a threshold. Every
+# model tried it, and `sage_eval` answered "invalid syntax (<string>, line 1)",
+# which names neither the cause nor the fix. `solve_equation` has always
+# accepted the form; this splits the same way, and only after the plain
+# expression fails to parse, so `f(x, base=2) - 1` is untouched.
+_PARSE_EQUATION = textwrap.dedent(
+    """
+    def _parse(_text):
+        try:
+            return sage_eval(_text, locals=_locals)
+        except SyntaxError:
+            _sep = '==' if '==' in _text else '='
+            _sides = _text.split(_sep)
+            if len(_sides) != 2:
+                raise
+            return (sage_eval(_sides[0].strip(), locals=_locals)
+                    - sage_eval(_sides[1].strip(), locals=_locals))
+    """
+)
+
+# find_root mode="all". One vectorised pass over the samples finds every sign
+# change and every local minimum of |f| that does not change sign; Brent's
+# method refines each bracket, a bounded minimisation each touching point. A
+# sign change across a pole refines to where |f| is huge, and is dropped.
+# Multiplicity is a hint: the first derivative that is clearly non-zero at the
+# root, forced to the parity the sampling saw -- odd where f crosses, even
+# where it only touches.
+_ALL_ROOTS = textwrap.dedent(
+    """
+    from scipy.optimize import brentq, minimize_scalar
+
+    def _solve(_expr, _a, _b):
+        _a, _b = min(_a, _b), max(_a, _b)
+        _f = fast_callable(_expr, vars=[_var], domain=RDF)
+
+        def _g(_t):
+            try:
+                return float(_f(_t))
+            except Exception:
+                return float('nan')
+
+        def _size(_t):
+            return abs(_g(_t))
+
+        _xs = numpy.linspace(_a, _b, _samples)
+        _ys = _vectorised(_expr, [_var], _f, [_xs])
+        _ok = numpy.isfinite(_ys)
+        _scale = max(1.0, float(numpy.median(numpy.abs(_ys[_ok])))) if _ok.any() else 1.0
+        _sign = numpy.sign(numpy.where(_ok, _ys, 0.0))
+        _found = []
+        for _k in numpy.nonzero(_ok & (_ys == 0))[0]:
+            _crosses = 0 < _k < len(_xs) - 1 and _sign[_k - 1] * _sign[_k + 1] < 0
+            _found.append((float(_xs[_k]), bool(_crosses)))
+        for _k in numpy.nonzero(_ok[:-1] & _ok[1:] & (_sign[:-1] * _sign[1:] < 0))[0]:
+            try:
+                _r = brentq(_g, float(_xs[_k]), float(_xs[_k + 1]), xtol=1e-15, maxiter=200)
+            except (ValueError, RuntimeError):
+                # Undefined somewhere inside the bracket, or no convergence.
+                continue
+            if _size(_r) <= 1e-6 * max(1.0, abs(_ys[_k]), abs(_ys[_k + 1])):
+                _found.append((float(_r), True))
+        _abs = numpy.abs(_ys)
+        _dips = numpy.nonzero(
+            _ok[:-2] & _ok[1:-1] & _ok[2:] & (_ys[1:-1] != 0)
+            & (_abs[1:-1] < _abs[:-2]) & (_abs[1:-1] <= _abs[2:])
+            & (_sign[:-2] == _sign[1:-1]) & (_sign[1:-1] == _sign[2:])
+        )[0] + 1
+        for _k in _dips:
+            _best = minimize_scalar(
+                _size, bounds=(float(_xs[_k - 1]), float(_xs[_k + 1])),
+                method='bounded', options={'xatol': 1e-13},
+            )
+            if _best.success and _size(_best.x) <= 1e-10 * _scale:
+                _found.append((float(_best.x), False))
+        _derivatives = []
+        try:
+            for _order in range(1, 6):
+                _derivatives.append(
+                    fast_callable(diff(_expr, _var, _order), vars=[_var], domain=RDF)
+                )
+        except Exception:
+            pass
+
+        def _multiplicity(_r, _crosses):
+            _m = None
+            for _order, _d in enumerate(_derivatives, 1):
+                try:
+                    if abs(float(_d(_r))) > 1e-6 * _scale:
+                        _m = _order
+                        break
+                except Exception:
+                    break
+            if _m is None:
+                return None
+            return _m + 1 if (_m % 2 == 1) != _crosses else _m
+
+        _roots = []
+        for _r, _crosses in sorted(_found):
+            if _roots and abs(_r - _roots[-1]['root']) <= 1e-8 * max(1.0, abs(_r)):
+                continue
+            _roots.append({'root': _r, 'multiplicity': _multiplicity(_r, _crosses),
+                           'sign_change': _crosses})
+        return {'roots': _roots, 'count': len(_roots)}
+    """
+)
+
+_FIND_ROOT_MODES = ("one", "all")
+_FIND_ROOT_MAX_SAMPLES = 100_000
+_FIND_ROOT_MAX_JOBS = 100
+
+
+@mcp.tool(
+    description="Find a numeric root of an expression or equation in a given interval, "
+    "or with mode 'all' every root in it. Takes a list of expressions or intervals "
+    "to solve many at once."
+)
 async def find_root(
     expression: Annotated[
-        str,
+        str | list[str],
         Field(
             description="Expression or equation to find a root of "
-            "(e.g. 'x - cos(x)', or 'E - 0.6*sin(E) = 0.75')"
+            "(e.g. 'x - cos(x)', or 'E - 0.6*sin(E) = 0.75'), or a list of them"
         ),
     ],
     variable: Annotated[str, Field(description="Variable")] = "x",
     lower_bound: Annotated[float, Field(description="Left bound of search interval")] = -10.0,
     upper_bound: Annotated[float, Field(description="Right bound of search interval")] = 10.0,
+    mode: Annotated[
+        str,
+        Field(
+            description="one (default): a single root by Sage's find_root. all: "
+            "every root in the interval, each with a multiplicity hint"
+        ),
+    ] = "one",
+    intervals: Annotated[
+        list[list[float]] | None,
+        Field(description="Several [lower, upper] intervals, in place of the two bounds"),
+    ] = None,
+    samples: Annotated[
+        int,
+        Field(
+            description="Mode all: points sampled across each interval to bracket "
+            "roots. Roots closer together than the spacing can be missed"
+        ),
+    ] = 1000,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
+    mode = mode.strip().lower()
+    if mode not in _FIND_ROOT_MODES:
+        raise ToolError(f"Unknown mode '{mode}'. Must be one of: one, all")
+    if not 10 <= samples <= _FIND_ROOT_MAX_SAMPLES:
+        raise ToolError(
+            f"'samples' must be between 10 and {_FIND_ROOT_MAX_SAMPLES}, got {samples}"
+        )
+    expressions = [expression] if isinstance(expression, str) else list(expression)
+    bounds = [[lower_bound, upper_bound]] if intervals is None else intervals
+    if not expressions or not bounds:
+        raise ToolError("Pass at least one expression and one interval")
+    for interval in bounds:
+        if len(interval) != 2 or not all(math.isfinite(value) for value in interval):
+            raise ToolError(f"Each interval is [lower, upper] with finite bounds, got {interval}")
+    jobs = [[text, float(a), float(b)] for text in expressions for a, b in bounds]
+    if len(jobs) > _FIND_ROOT_MAX_JOBS:
+        raise ToolError(
+            f"{len(expressions)} expressions on {len(bounds)} intervals is {len(jobs)} "
+            f"problems; at most {_FIND_ROOT_MAX_JOBS} per call"
+        )
     session = await runtime.resolve_session(ctx.session_id, session)
-    # An equation is what a caller reaches for when the problem is stated as one
-    # -- Kepler's `E - e sin E = M`, a matching condition, a threshold. Every
-    # model tried it, and `sage_eval` answered "invalid syntax (<string>, line
-    # 1)", which names neither the cause nor the fix. `solve_equation` has always
-    # accepted the form; this splits the same way, and only after the plain
-    # expression fails to parse, so `f(x, base=2) - 1` is untouched.
+    if mode == "all":
+        solver = _VECTORISED + f"_samples = {samples}\n" + _ALL_ROOTS
+    else:
+        solver = textwrap.dedent(
+            """
+            def _solve(_expr, _a, _b):
+                return float(find_root(_expr, _a, _b))
+            """
+        )
     code = (
         _sage_prelude([variable])
+        + f"_var = var({_encode_literal(variable)})\n"
+        + _PARSE_EQUATION
+        + solver
+    )
+    if isinstance(expression, str) and intervals is None:
+        # One problem: its failure is the tool's failure, as it always was.
+        text, a, b = jobs[0]
+        result = await _evaluate_structured(
+            session, code + f"_solve(_parse({_encode_literal(text)}), {a!r}, {b!r})\n"
+        )
+        return result if mode == "all" else {"root": result}
+    code += textwrap.dedent(
+        f"""
+        def _attempt(_text, _a, _b):
+            try:
+                _answer = _solve(_parse(_text), _a, _b)
+                if not isinstance(_answer, dict):
+                    _answer = {{'root': _answer}}
+            except Exception as _exc:
+                _answer = {{'error': str(_exc) or repr(_exc)}}
+            return {{'expression': _text, 'interval': [_a, _b], **_answer}}
+
+        [_attempt(*_job) for _job in {_encode_literal(jobs)}]
+        """
+    )
+    return {"results": await _evaluate_structured(session, code)}
+
+
+# evaluate_on_grid: explicit points arrive inside the generated code, so they
+# are capped well below what a grid may produce.
+_GRID_MAX_POINTS = 100_000
+
+
+@mcp.tool(
+    description="Evaluate an expression at many points in one vectorised pass: "
+    "over a 1D to 3D grid, or at a list of points. Returns the values as a "
+    "binary float array. Prefer this over looping in evaluate_sage."
+)
+async def evaluate_on_grid(
+    expression: Annotated[
+        str, Field(description="Expression in the variables (e.g. 'exp(-x^2)*cos(3*y)')")
+    ],
+    variables: Annotated[
+        list[str], Field(description="One to three variables, in axis order (e.g. ['x', 'y'])")
+    ],
+    grid: Annotated[
+        list[list[float]] | None,
+        Field(
+            description="One [start, stop, count] per variable; the values are "
+            "evaluated at every combination, endpoints included"
+        ),
+    ] = None,
+    points: Annotated[
+        list[list[float]] | None,
+        Field(
+            description="Explicit points, one coordinate per variable, instead of "
+            f"a grid; at most {_GRID_MAX_POINTS}"
+        ),
+    ] = None,
+    dtype: Annotated[
+        str, Field(description="float64 (default) or float32, half the size")
+    ] = "float64",
+    inline: Annotated[bool, Field(description=_INLINE_DESC)] = False,
+    session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> dict:
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required for stateful execution")
+    if not 1 <= len(variables) <= 3:
+        raise ToolError(f"'variables' must name one to three variables, got {len(variables)}")
+    if dtype not in _ARRAY_DTYPES:
+        raise ToolError(f"Unknown dtype '{dtype}'. Must be one of: float64, float32")
+    if (grid is None) == (points is None):
+        raise ToolError("Pass exactly one of 'grid' and 'points'")
+    if grid is not None:
+        if len(grid) != len(variables):
+            raise ToolError(
+                f"'grid' needs one [start, stop, count] per variable: "
+                f"{len(variables)} variables, {len(grid)} axes"
+            )
+        shape = []
+        for axis in grid:
+            if (
+                len(axis) != 3
+                or not all(math.isfinite(value) for value in axis)
+                or not float(axis[2]).is_integer()
+                or axis[2] < 1
+            ):
+                raise ToolError(
+                    f"Each grid axis is [start, stop, count] with finite bounds and a "
+                    f"positive whole count, got {axis}"
+                )
+            shape.append(int(axis[2]))
+        axes = [[float(start), float(stop), int(count)] for start, stop, count in grid]
+        sample = textwrap.dedent(
+            f"""
+            _cols = numpy.meshgrid(
+                *[numpy.linspace(_a, _b, _n) for _a, _b, _n in {_encode_literal(axes)}],
+                indexing='ij',
+            )
+            """
+        )
+    else:
+        if not 1 <= len(points) <= _GRID_MAX_POINTS:
+            raise ToolError(
+                f"'points' must hold between 1 and {_GRID_MAX_POINTS} points, got {len(points)}"
+            )
+        if any(len(point) != len(variables) for point in points):
+            raise ToolError(f"Every point needs {len(variables)} coordinates, one per variable")
+        if not all(math.isfinite(value) for point in points for value in point):
+            raise ToolError("'points' must have finite coordinates")
+        shape = [len(points)]
+        sample = textwrap.dedent(
+            f"""
+            _cols = list(numpy.array({_encode_literal(points)}, dtype=float).T)
+            """
+        )
+    count = 1
+    for size in shape:
+        count *= size
+    type_code = _array_type(dtype, count, "use a coarser grid or dtype float32")
+    session = await runtime.resolve_session(ctx.session_id, session)
+    code = (
+        _sage_prelude(variables)
         + textwrap.dedent(
             f"""
-        _var = var({_encode_literal(variable)})
-        _text = {_encode_literal(expression)}
-        try:
-            _expr = sage_eval(_text, locals=_locals)
-        except SyntaxError:
-            _sep = '==' if '==' in _text else '='
-            _sides = _text.split(_sep)
-            if len(_sides) != 2:
-                raise
-            _expr = (sage_eval(_sides[0].strip(), locals=_locals)
-                     - sage_eval(_sides[1].strip(), locals=_locals))
-        float(find_root(_expr, {lower_bound}, {upper_bound}))
+        import base64
+        import numpy
+        _vars = [var(_name) for _name in {_encode_literal(variables)}]
+        _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
+        # Compiled once, and compiling is also the check that the expression
+        # uses no name beyond the variables.
+        _f = fast_callable(_expr, vars=_vars, domain=RDF)
+        """
+        )
+        + sample
+        + _VECTORISED
+        + "_V = _vectorised(_expr, _vars, _f, _cols)\n"
+        + textwrap.dedent(
+            f"""
+        _V = numpy.where(numpy.isfinite(_V), _V, numpy.nan).astype({type_code!r})
+        {{'values': base64.b64encode(_V.tobytes()).decode('ascii'),
+          'nan_count': int(numpy.isnan(_V).sum())}}
         """
         )
     )
-    result = await _evaluate_structured(session, code)
-    return {"root": result}
+    payload = await _evaluate_structured(session, code)
+    result = {
+        "shape": shape,
+        "dtype": dtype,
+        "byte_order": "little",
+        "count": count,
+        "nan_count": payload["nan_count"],
+    }
+    if inline:
+        return {**result, "values": payload["values"]}
+    artifact = runtime.ARTIFACTS.put(
+        ctx.session_id, base64.b64decode(payload["values"]), "application/octet-stream"
+    )
+    return {**result, **artifact.describe()}
 
 
 @mcp.tool(
@@ -354,6 +718,7 @@ async def evaluate_sage_streaming(
         Field(description="Override timeout in seconds", gt=0.0),
     ] = None,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    fail_if_busy: Annotated[bool, Field(description=_FAIL_IF_BUSY_DESC)] = False,
     ctx: Context | None = None,
 ) -> EvaluateResult:
     """Like evaluate_sage but emits each stdout line as a progress event."""
@@ -379,7 +744,10 @@ async def evaluate_sage_streaming(
             capture_stdout=True,
             timeout_seconds=timeout_seconds,
             on_stdout=_forward,
+            fail_if_busy=fail_if_busy,
         )
+    except WorkspaceBusy as exc:
+        raise ToolError(f"Workspace '{session}' is busy ({exc.ahead} ahead)") from exc
     except TimeoutError as exc:
         # This path had no handler at all: a timeout, a security violation or a
         # dead worker propagated raw from the streaming tool while evaluate_sage
@@ -404,3 +772,313 @@ async def evaluate_sage_streaming(
         stdout=_truncate_stdout(worker_result.stdout),
         elapsed_ms=worker_result.elapsed_ms,
     )
+
+
+@mcp.tool(
+    description="Apply a function defined in a workspace to every input in a list, "
+    "in parallel across a pool of workers. Results come back in input order, with "
+    "an error in place of any item that failed or timed out."
+)
+async def parallel_map(
+    function: Annotated[
+        str, Field(description="Name of a function defined in the workspace (e.g. 'f')")
+    ],
+    inputs: Annotated[
+        list,
+        Field(description="Inputs, each passed as the function's argument (e.g. [-3, -4, -7])"),
+    ],
+    unpack: Annotated[
+        bool, Field(description="Pass each input's elements as separate arguments")
+    ] = False,
+    workers: Annotated[
+        int | None,
+        Field(description="Most workers to use; default the whole parallel pool", ge=1),
+    ] = None,
+    item_timeout: Annotated[
+        float | None, Field(description="Timeout per input in seconds", gt=0.0)
+    ] = None,
+    session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> dict:
+    """Fan *function* out over *inputs* on workers replaying the workspace journal."""
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required for stateful execution")
+    function = _validated_identifier(function, "function")
+    if not 1 <= len(inputs) <= _PARALLEL_MAX_INPUTS:
+        raise ToolError(f"'inputs' must hold between 1 and {_PARALLEL_MAX_INPUTS} items")
+    if unpack and not all(isinstance(item, list) for item in inputs):
+        raise ToolError("With unpack=true every input must be a list of arguments")
+    calls = [
+        f"{function}({', '.join(_encode_literal(arg) for arg in item)})"
+        if unpack
+        else f"{function}({_encode_literal(item)})"
+        for item in inputs
+    ]
+    source = await runtime.resolve_session(ctx.session_id, session)
+    journal = source.journal()
+    pool = runtime.WORKER_POOL
+    borrowed = await pool.acquire(min(workers or pool.size, len(inputs)))
+    results: list[dict | None] = [None] * len(inputs)
+    emitted = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(len(inputs)):
+        queue.put_nowait(index)
+
+    async def emit_in_order() -> None:
+        # Completion order is arbitrary; the stream is not. Each result goes out
+        # once everything before it has.
+        nonlocal emitted
+        while emitted < len(results) and results[emitted] is not None:
+            emitted += 1
+            await ctx.report_progress(
+                float(emitted), float(len(results)), json.dumps(results[emitted - 1])
+            )
+
+    async def prepare(worker) -> None:
+        await worker.restore_from_journal(journal)
+        # Under the caller policy, as every item is: a name the workspace never
+        # defined fails here once rather than once per input.
+        await worker.evaluate(
+            f"callable({function})", want_latex=False, capture_stdout=False
+        )
+
+    async def drain(worker) -> None:
+        while not queue.empty():
+            index = queue.get_nowait()
+            try:
+                outcome = await worker.evaluate(
+                    calls[index], want_latex=False, capture_stdout=False,
+                    timeout_seconds=item_timeout,
+                )
+                results[index] = {"result": outcome.result}
+            except SageEvaluationError as exc:
+                results[index] = {"error": exc.args[0]}
+            except (TimeoutError, SageProcessError) as exc:
+                results[index] = {"error": str(exc) or type(exc).__name__}
+                await emit_in_order()
+                # The worker came back with an empty namespace. One that cannot
+                # be rebuilt leaves its share of the queue to the others.
+                try:
+                    await prepare(worker)
+                except Exception:
+                    return
+                continue
+            await emit_in_order()
+
+    try:
+        try:
+            await asyncio.gather(*(prepare(worker) for worker in borrowed))
+        except SageEvaluationError as exc:
+            raise ToolError(
+                f"'{function}' is not usable in workspace '{session}': {exc.args[0]}"
+            ) from exc
+        await asyncio.gather(*(drain(worker) for worker in borrowed))
+    finally:
+        await pool.release(borrowed)
+    for index, entry in enumerate(results):
+        if entry is None:
+            results[index] = {"error": "Not run: no worker could be rebuilt"}
+    return {
+        "results": results,
+        "count": len(results),
+        "errors": sum("error" in entry for entry in results),
+        "workers": len(borrowed),
+    }
+
+
+@mcp.tool(
+    description="Run long SageMath code in the background and return a job id at once. "
+    "The job has its own worker, a fresh one or a fork of a workspace, and a budget of "
+    "up to an hour by default; poll it with get_sage_job, even after reconnecting."
+)
+async def submit_sage_job(
+    code: Annotated[str, Field(description="SageMath code to execute")],
+    source: Annotated[
+        str | None,
+        Field(description="Workspace to fork so the job sees its variables; omit for a fresh one"),
+    ] = None,
+    timeout_seconds: Annotated[
+        float | None,
+        Field(
+            description="Budget in seconds; default and maximum SAGEMATH_MCP_JOB_TIMEOUT",
+            alias="timeout",
+            validation_alias="timeout",
+            serialization_alias="timeout",
+            gt=0.0,
+            default=None,
+        ),
+    ] = None,
+    want_latex: Annotated[
+        bool, Field(description="Return LaTeX representation when possible")
+    ] = False,
+    capture_stdout: Annotated[
+        bool, Field(description="Capture stdout emitted by Sage code")
+    ] = True,
+    ctx: Context | None = None,
+) -> dict:
+    """Queue *code* as a job that outlives this call and the connection it came on."""
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required to submit a job")
+    jobs = runtime.JOBS
+    limit = jobs.settings.job_timeout
+    if timeout_seconds is not None and timeout_seconds > limit:
+        raise ToolError(f"'timeout' must be at most {limit:g} seconds")
+    if jobs.full():
+        raise ToolError("The job queue is full; try again once a job has finished")
+    worker = None
+    if source is not None:
+        # Forked now, so the job sees the workspace as it is at submission.
+        workspace = await runtime.resolve_session(ctx.session_id, source)
+        worker, _ = await workspace.branch(
+            f"job-{uuid.uuid4().hex}", keep_journal=False, priority=PRIORITY_BACKGROUND
+        )
+    try:
+        job = jobs.submit(
+            ctx.session_id,
+            code,
+            timeout=timeout_seconds or limit,
+            want_latex=want_latex,
+            capture_stdout=capture_stdout,
+            worker=worker,
+            source=source,
+        )
+    except JobQueueFull as exc:
+        if worker is not None:
+            await worker.shutdown()
+        raise ToolError(str(exc)) from exc
+    await ctx.info(f"Submitted Sage job {job.job_id}")
+    return job.describe()
+
+
+@mcp.tool(description="Report a background Sage job's status, and its result once finished")
+async def get_sage_job(
+    job_id: Annotated[str, Field(description="Id returned by submit_sage_job")],
+    ctx: Context | None = None,
+) -> dict:
+    """Poll a job. The id alone identifies it, so this works from a new connection."""
+    del ctx
+    job = runtime.JOBS.get(job_id)
+    if job is None:
+        raise ToolError(f"No Sage job '{job_id}'; finished jobs expire after a while")
+    return job.describe()
+
+
+@mcp.tool(description="Cancel a queued or running background Sage job")
+async def cancel_sage_job(
+    job_id: Annotated[str, Field(description="Id returned by submit_sage_job")],
+    ctx: Context | None = None,
+) -> dict:
+    """Stop a job and release its worker. A finished job is reported unchanged."""
+    job = await runtime.JOBS.cancel(job_id)
+    if job is None:
+        raise ToolError(f"No Sage job '{job_id}'; finished jobs expire after a while")
+    if ctx is not None:
+        await ctx.info(f"Sage job {job_id} is {job.status}")
+    return job.describe()
+
+
+class _StepContext:
+    """The pipeline's context as its steps see it.
+
+    The same client, but no progress of their own: the pipeline reports one
+    event per finished step.
+    """
+
+    def __init__(self, ctx: Context):
+        self._ctx = ctx
+
+    def __getattr__(self, name: str):
+        return getattr(self._ctx, name)
+
+    async def report_progress(self, progress, total=None, message=None) -> None:
+        pass
+
+
+@mcp.tool(
+    description="Run several tool calls in one request. Each step names a tool and its "
+    "args; an argument may use an earlier step's result as '${id}', or one field of it "
+    "as '${id.field}'. Steps run once what they refer to is done, side by side across "
+    "workspaces, and every result comes back with its timing."
+)
+async def run_pipeline(
+    steps: Annotated[
+        list[dict],
+        Field(
+            description='Steps, e.g. [{"id": "d", "tool": "differentiate_expression", '
+            '"args": {"expression": "x^3*sin(x)"}}, {"id": "s", "tool": '
+            '"simplify_expression", "args": {"expression": "${d.derivative}"}}]; '
+            'optional "needs": [ids] orders steps without a reference'
+        ),
+    ],
+    session: Annotated[
+        str, Field(description="Workspace for steps that take one and do not name it")
+    ] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> dict:
+    """Run a DAG of tool calls in dependency order and report every step."""
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required for stateful execution")
+    names = {
+        entry["tool"] for entry in steps
+        if isinstance(entry, dict) and isinstance(entry.get("tool"), str)
+    }
+    tools = {}
+    for name in sorted(names):
+        if name == "run_pipeline":
+            raise ToolError("A pipeline cannot contain run_pipeline")
+        tool = await mcp.get_tool(name)
+        if tool is None:
+            raise ToolError(f"Unknown tool in pipeline: {name}")
+        tools[name] = tool
+
+    def takes_session(tool: str) -> bool:
+        return "session" in tools[tool].parameters.get("properties", {})
+
+    def workspace_of(tool: str, args: dict) -> str | None:
+        return args.get("session", session) if takes_session(tool) else None
+
+    try:
+        parsed = pipeline.parse_steps(steps, workspace_of, _PIPELINE_MAX_STEPS)
+    except pipeline.PipelineError as exc:
+        raise ToolError(str(exc)) from exc
+    # validate_call applies the checks FastMCP would at the protocol edge, to
+    # everything but the context, which is bound here rather than validated.
+    step_ctx = _StepContext(ctx)
+    functions = {
+        name: validate_call(functools.partial(tool.fn, ctx=step_ctx))
+        for name, tool in tools.items()
+    }
+    started = time.perf_counter()
+
+    async def call(step: pipeline.Step, args: dict) -> object:
+        if "ctx" in args:
+            raise ToolError("'ctx' is not an argument")
+        if takes_session(step.tool):
+            args.setdefault("session", session)
+        try:
+            result = await functions[step.tool](**args)
+        except ValidationError as exc:
+            raise ToolError(
+                "Invalid arguments: "
+                + "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                    for error in exc.errors()
+                )
+            ) from exc
+        return to_jsonable_python(result)
+
+    done = 0
+
+    async def on_done(report: dict) -> None:
+        nonlocal done
+        done += 1
+        await ctx.report_progress(float(done), float(len(parsed)), json.dumps(report))
+
+    reports = await pipeline.run(parsed, call, on_done)
+    return {
+        "steps": reports,
+        "count": len(reports),
+        "errors": sum("error" in report for report in reports),
+        "skipped": sum("skipped" in report for report in reports),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
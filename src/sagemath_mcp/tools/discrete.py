@@ -21,12 +21,18 @@ from ..codegen import (
     _encode_literal,
     _evaluate_structured,
     _exact_int,
+    _kept_object,
+    _object_handle,
+    _requested_operations,
+    _run_operations,
     _sage_prelude,
     _validated_expression,
 )
 from ..session import (
     DEFAULT_SESSION_NAME,
 )
+from ..text import KEEP_DESC as _KEEP_DESC
+from ..text import OPERATION_LIST_DESC as _OPERATION_LIST_DESC
 from ..text import SESSION_ARG_DESC as _SESSION_ARG_DESC
 
 
@@ -36,8 +42,9 @@ from ..text import SESSION_ARG_DESC as _SESSION_ARG_DESC
     ))
 async def number_theory_operation(
     operation: Annotated[
-        str,
-        Field(description="Operation: 'is_prime', 'factor_integer', 'next_prime', 'gcd', 'lcm'"),
+        str | list[str],
+        Field(description="Operation: 'is_prime', 'factor_integer', 'next_prime', 'gcd', "
+              "'lcm'. " + _OPERATION_LIST_DESC),
     ],
     a: Annotated[
         int | str,
@@ -59,17 +66,14 @@ async def number_theory_operation(
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    operation = operation.strip()
     a = _exact_int(a, "a")
     b = _exact_int(b, "b") if b is not None else None
-    allowed_ops = {"is_prime", "factor_integer", "next_prime", "gcd", "lcm"}
-    if operation not in allowed_ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Must be one of: {', '.join(sorted(allowed_ops))}"
-        )
-    if operation in {"gcd", "lcm"} and b is None:
-        raise ToolError(f"Operation '{operation}' requires both 'a' and 'b' arguments")
+    operations = _requested_operations(
+        operation, {"is_prime", "factor_integer", "next_prime", "gcd", "lcm"}
+    )
+    for name in operations:
+        if name in {"gcd", "lcm"} and b is None:
+            raise ToolError(f"Operation '{name}' requires both 'a' and 'b' arguments")
     session = await runtime.resolve_session(ctx.session_id, session)
     op_code = {
         "is_prime": f"bool(is_prime({a}))",
@@ -78,9 +82,9 @@ async def number_theory_operation(
         "gcd": f"int(gcd({a}, {b}))",
         "lcm": f"int(lcm({a}, {b}))",
     }
-    code = _sage_prelude() + op_code[operation] + "\n"
-    result = await _evaluate_structured(session, code)
-    return {"operation": operation, "result": result}
+    return await _run_operations(
+        session, _sage_prelude(), op_code, operations, single=isinstance(operation, str)
+    )
 
 
 @mcp.tool(description=(
@@ -161,26 +165,28 @@ async def graph_operation(
         str,
         Field(
             description="Graph constructor: a named graph like 'PetersenGraph' "
-            "or an adjacency dict like '{0:[1,2], 1:[0,2], 2:[0,1]}'"
+            "or an adjacency dict like '{0:[1,2], 1:[0,2], 2:[0,1]}', or a "
+            "graph handle from an earlier call with keep=true"
         ),
     ],
     operation: Annotated[
-        str,
+        str | list[str],
         Field(
             description="One of: chromatic_number, is_connected, is_planar, "
             "diameter, order, size, degree_sequence, adjacency_matrix, "
-            "shortest_path (requires source and target)"
+            "shortest_path (requires source and target). " + _OPERATION_LIST_DESC
         ),
     ],
     source: Annotated[int | str | None, Field(description="Source vertex")] = None,
     target: Annotated[int | str | None, Field(description="Target vertex")] = None,
+    keep: Annotated[bool, Field(description=_KEEP_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required")
-    operation = operation.strip()
     session = await runtime.resolve_session(ctx.session_id, session)
+    handle = _object_handle(graph, "graph")
     # A named graph is an identifier, optionally already called with arguments.
     # Matching on a "Graph" suffix missed every parameterised constructor:
     # "CompleteGraph(4)" ends in ")", so it fell through to Graph(CompleteGraph(4))
@@ -188,16 +194,19 @@ async def graph_operation(
     # take parameters, so that was the majority of the catalogue.
     # Validated as an expression in its own right: this string is interpolated
     # into code that runs under the trusted policy, where sage_eval is allowed.
-    graph = _validated_expression(graph)
+    graph = graph if handle else _validated_expression(graph)
     source = _exact_int(source, "source") if source is not None else None
     target = _exact_int(target, "target") if target is not None else None
     named = _NAMED_GRAPH_RE.match(graph.strip())
-    if named:
+    if handle:
+        graph_code = ""
+    elif named:
         call = named.group("call") or "()"
-        graph_code = f"_G = graphs.{named.group('name')}{call}"
+        graph_code = f"_G = graphs.{named.group('name')}{call}\n"
     else:
         # Anything else is a literal, such as an adjacency dict.
-        graph_code = f"_G = Graph({graph})"
+        graph_code = f"_G = Graph({graph})\n"
+    setup, handle = _kept_object(handle, keep, "graph", graph_code, ["_G"])
     ops = {
         "chromatic_number": "int(_G.chromatic_number())",
         "is_connected": "bool(_G.is_connected())",
@@ -216,14 +225,11 @@ async def graph_operation(
             else "None"
         ),
     }
-    if operation not in ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Use: {', '.join(ops)}"
-        )
-    code = _sage_prelude() + graph_code + "\n" + ops[operation] + "\n"
-    result = await _evaluate_structured(session, code)
-    return {"operation": operation, "result": result}
+    operations = _requested_operations(operation, ops)
+    answer = await _run_operations(
+        session, _sage_prelude() + setup, ops, operations, single=isinstance(operation, str)
+    )
+    return {**answer, "handle": handle} if handle else answer
 
 
 @mcp.tool(
@@ -236,22 +242,23 @@ async def group_operation(
         Field(
             description="Sage group constructor, e.g. "
             "'SymmetricGroup(5)', 'DihedralGroup(4)', "
-            "'CyclicPermutationGroup(6)', 'AlternatingGroup(5)'"
+            "'CyclicPermutationGroup(6)', 'AlternatingGroup(5)', or a group "
+            "handle from an earlier call with keep=true"
         ),
     ],
     operation: Annotated[
-        str,
+        str | list[str],
         Field(
             description="One of: order, is_abelian, is_cyclic, "
-            "center_order, conjugacy_classes_count, exponent"
+            "center_order, conjugacy_classes_count, exponent. " + _OPERATION_LIST_DESC
         ),
     ],
+    keep: Annotated[bool, Field(description=_KEEP_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required")
-    operation = operation.strip()
     session = await runtime.resolve_session(ctx.session_id, session)
     ops = {
         "order": "int(_G.order())",
@@ -263,14 +270,14 @@ async def group_operation(
         ),
         "exponent": "int(_G.exponent())",
     }
-    if operation not in ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Use: {', '.join(ops)}"
-        )
-    code = _sage_prelude() + f"_G = {_validated_expression(group)}\n" + ops[operation] + "\n"
-    result = await _evaluate_structured(session, code)
-    return {"group": group, "operation": operation, "result": result}
+    operations = _requested_operations(operation, ops)
+    handle = _object_handle(group, "group")
+    construct = "" if handle else f"_G = {_validated_expression(group)}\n"
+    setup, handle = _kept_object(handle, keep, "group", construct, ["_G"])
+    answer = await _run_operations(
+        session, _sage_prelude() + setup, ops, operations, single=isinstance(operation, str)
+    )
+    return {"group": group, **answer, "handle": handle} if handle else {"group": group, **answer}
 
 
 @mcp.tool(
@@ -285,22 +292,23 @@ async def elliptic_curve_operation(
         list[int | str],
         Field(
             description="Curve coefficients [a1,a2,a3,a4,a6] or "
-            "short Weierstrass [a,b] for y^2 = x^3 + a*x + b"
+            "short Weierstrass [a,b] for y^2 = x^3 + a*x + b, or [handle] for a "
+            "curve kept by an earlier call with keep=true"
         ),
     ],
     operation: Annotated[
-        str,
+        str | list[str],
         Field(
             description="One of: rank, torsion_order, discriminant, "
-            "j_invariant, conductor, gens"
+            "j_invariant, conductor, gens. " + _OPERATION_LIST_DESC
         ),
     ],
+    keep: Annotated[bool, Field(description=_KEEP_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required")
-    operation = operation.strip()
     session = await runtime.resolve_session(ctx.session_id, session)
     ops = {
         "rank": "int(_E.rank())",
@@ -310,20 +318,17 @@ async def elliptic_curve_operation(
         "conductor": "int(_E.conductor())",
         "gens": "[str(p) for p in _E.gens()]",
     }
-    if operation not in ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Use: {', '.join(ops)}"
-        )
-    coefficients = [_exact_int(c, "coefficients") for c in coefficients]
-    code = (
-        _sage_prelude()
-        + f"_E = EllipticCurve({_encode_literal(coefficients)})\n"
-        + ops[operation]
-        + "\n"
+    operations = _requested_operations(operation, ops)
+    handle = _object_handle(coefficients[0], "curve") if len(coefficients) == 1 else None
+    construct = ""
+    if handle is None:
+        coefficients = [_exact_int(c, "coefficients") for c in coefficients]
+        construct = f"_E = EllipticCurve({_encode_literal(coefficients)})\n"
+    setup, handle = _kept_object(handle, keep, "curve", construct, ["_E"])
+    answer = await _run_operations(
+        session, _sage_prelude() + setup, ops, operations, single=isinstance(operation, str)
     )
-    result = await _evaluate_structured(session, code)
-    return {"operation": operation, "result": result}
+    return {**answer, "handle": handle} if handle else answer
 
 
 @mcp.tool(
@@ -341,22 +346,23 @@ async def coding_theory_operation(
             # ReedSolomonCode(GF(7),3,5) was documented here but has never been
             # a valid constructor in current Sage; it raises AttributeError.
             "'HammingCode(GF(2),3)', "
-            "'GeneralizedReedSolomonCode(GF(7).list()[:6],3)'"
+            "'GeneralizedReedSolomonCode(GF(7).list()[:6],3)', or a code handle "
+            "from an earlier call with keep=true"
         ),
     ],
     operation: Annotated[
-        str,
+        str | list[str],
         Field(
             description="One of: length, dimension, "
-            "minimum_distance, generator_matrix, rate"
+            "minimum_distance, generator_matrix, rate. " + _OPERATION_LIST_DESC
         ),
     ],
+    keep: Annotated[bool, Field(description=_KEEP_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required")
-    operation = operation.strip()
     session = await runtime.resolve_session(ctx.session_id, session)
     ops = {
         "length": "int(_C.length())",
@@ -368,16 +374,11 @@ async def coding_theory_operation(
         ),
         "rate": "float(_C.dimension() / _C.length())",
     }
-    if operation not in ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Use: {', '.join(ops)}"
-        )
-    code = (
-        _sage_prelude()
-        + f"_C = codes.{_validated_expression(code_type)}\n"
-        + ops[operation]
-        + "\n"
+    operations = _requested_operations(operation, ops)
+    handle = _object_handle(code_type, "code")
+    construct = "" if handle else f"_C = codes.{_validated_expression(code_type)}\n"
+    setup, handle = _kept_object(handle, keep, "code", construct, ["_C"])
+    answer = await _run_operations(
+        session, _sage_prelude() + setup, ops, operations, single=isinstance(operation, str)
     )
-    result = await _evaluate_structured(session, code)
-    return {"operation": operation, "result": result}
+    return {**answer, "handle": handle} if handle else answer
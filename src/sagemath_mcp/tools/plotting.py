@@ -8,6 +8,8 @@ would have prefixed them.
 
 from __future__ import annotations
 
+import base64
+import json
 import textwrap
 from typing import Annotated
 
@@ -15,23 +17,203 @@ from fastmcp import Context
 from fastmcp.exceptions import ToolError
 from pydantic import Field
 
-from .. import runtime
+from .. import monitoring, runtime
 from ..app import mcp
 from ..codegen import (
     _encode_literal,
     _evaluate_structured,
+    _requested_operations,
+    _run_operations,
     _sage_prelude,
 )
+from ..plot_cache import plot_key
+from ..render import RenderError
 from ..session import (
     DEFAULT_SESSION_NAME,
 )
+from ..text import INLINE_DESC as _INLINE_DESC
+from ..text import OPERATION_LIST_DESC as _OPERATION_LIST_DESC
 from ..text import SESSION_ARG_DESC as _SESSION_ARG_DESC
 
-# Samples per axis for the 3D surface. 48x48 keeps the rendered surface smooth
-# while staying well inside the evaluation timeout.
+# Samples per axis for the 3D surface, and the most a caller may ask for. The
+# surface is sampled in one vectorised pass, so the cost is dominated by the
+# render; 256x256 is ~65k quads, which matplotlib still draws in a second or two.
 _PLOT3D_GRID = 48
+_PLOT3D_MAX_GRID = 256
+_PLOT3D_FORMATS = ("png", "mesh")
+_PLOT3D_FORMAT_DESC = (
+    "png (default), or mesh: the sampled surface as base64 float32 arrays for "
+    "the client to render and rotate itself, with no image drawn here"
+)
+
+# 2D output. A raster or an SVG is drawn by the render pool; "points" skips it
+# and returns what plot() sampled, for the client to draw. Sizes are pixels, so
+# the defaults reproduce matplotlib's 640x480 at 100 dpi.
+_OUTPUT_FORMATS = ("png", "svg", "points")
+_MEDIA_TYPES = {"png": ("image/png", ""), "svg": ("image/svg+xml", "gzip")}
+_MAX_PIXELS = 4096
+_MIN_DPI, _MAX_DPI = 25, 600
+_MIN_PLOT_POINTS, _MAX_PLOT_POINTS = 5, 10_000
+
+_OUTPUT_FORMAT_DESC = (
+    "png (default), svg (gzip-compressed), or points: the adaptively sampled "
+    "curve as coordinate lists, far smaller than an image, for the client to draw"
+)
+_WIDTH_DESC = f"Image width in pixels, at most {_MAX_PIXELS}"
+_HEIGHT_DESC = f"Image height in pixels, at most {_MAX_PIXELS}"
+_DPI_DESC = "Dots per inch: scales text and line widths within the same pixel size"
+_PLOT_POINTS_DESC = (
+    "Initial samples across the range. plot() then subdivides wherever the "
+    "curve bends, so a curvy region gets more points than this"
+)
+
+# Generated code, completing plot3d_expression once _Z holds the sampled grid:
+# a render spec for the pool, or the mesh itself. The mesh travels as raw
+# little-endian float32 -- half the bytes of float64, a quarter of the JSON
+# numbers -- which a browser reads straight into a Float32Array. NaN marks a
+# gap; the bit mask says the same for clients that would rather not test for it.
+_SURFACE_SPEC = """
+{{
+    'kind': 'surface', 'n': _n, 'x': {x}, 'y': {y},
+    'z': [[None if _v != _v else _v for _v in _row] for _row in _Z.tolist()],
+    'xlabel': {xlabel}, 'ylabel': {ylabel},
+}}
+"""
+_MESH_RESULT = """
+import base64
+_finite = numpy.isfinite(_Z)
+{{
+    'format': 'mesh', 'shape': [_n, _n], 'x': {x}, 'y': {y},
+    'dtype': 'float32', 'byte_order': 'little',
+    'z': base64.b64encode(_Z.astype('<f4').tobytes()).decode('ascii'),
+    'nan_mask': base64.b64encode(numpy.packbits(~_finite).tobytes()).decode('ascii'),
+    'z_range': [float(_Z[_finite].min()), float(_Z[_finite].max())] if _finite.any() else None,
+    'xlabel': {xlabel}, 'ylabel': {ylabel},
+}}
+"""
+
+# Generated code: the points of every line in a 2D Graphics, which is what the
+# render process draws. Each Line primitive is one unbroken run; plot() splits a
+# curve at a pole into several. JSON has no NaN, so a gap travels as None.
+_LINE_POINTS = textwrap.dedent(
+    """
+    import math
+
+    def _points(_g):
+        return [
+            [[float(_v) for _v in _p.xdata],
+             [float(_v) if math.isfinite(float(_v)) else None for _v in _p.ydata]]
+            for _p in _g
+        ]
+    """
+)
+
+
+def _check_2d_output(
+    output_format: str, width: int, height: int, dpi: int, plot_points: int
+) -> str:
+    output_format = output_format.strip().lower()
+    if output_format not in _OUTPUT_FORMATS:
+        raise ToolError(
+            f"Unknown output_format '{output_format}'. Must be one of: "
+            + ", ".join(_OUTPUT_FORMATS)
+        )
+    for name, value in (("width", width), ("height", height)):
+        if not 16 <= value <= _MAX_PIXELS:
+            raise ToolError(f"'{name}' must be between 16 and {_MAX_PIXELS} pixels, got {value}")
+    if not _MIN_DPI <= dpi <= _MAX_DPI:
+        raise ToolError(f"'dpi' must be between {_MIN_DPI} and {_MAX_DPI}, got {dpi}")
+    if not _MIN_PLOT_POINTS <= plot_points <= _MAX_PLOT_POINTS:
+        raise ToolError(
+            f"'plot_points' must be between {_MIN_PLOT_POINTS} and {_MAX_PLOT_POINTS}, "
+            f"got {plot_points}"
+        )
+    return output_format
+
+
+def _over_budget(what: str, size: int, advice: str) -> None:
+    budget = runtime.SETTINGS.plot_max_bytes
+    if size > budget:
+        raise ToolError(f"The {what} is {size} bytes, over the {budget}-byte plot budget; {advice}")
+
+
+def _plot_result(ctx: Context, image: str, inline: bool, image_format: str) -> dict:
+    media_type, encoding = _MEDIA_TYPES[image_format]
+    data = base64.b64decode(image)
+    _over_budget(
+        f"{image_format} image", len(data),
+        "lower width, height or dpi, or ask for output_format 'points'",
+    )
+    if inline:
+        result = {"image_base64": image, "format": image_format}
+        if encoding:
+            result["encoding"] = encoding
+        return result
+    artifact = runtime.ARTIFACTS.put(ctx.session_id, data, media_type, encoding)
+    return {**artifact.describe(), "format": image_format}
+
+
+async def _plot(
+    ctx: Context,
+    session_name: str,
+    code: str,
+    key: str | None,
+    inline: bool,
+    style: dict | None = None,
+) -> dict:
+    """Sample in the caller's session, render in the pool -- or answer from the cache.
+
+    *key* is the plot's :func:`plot_key`, None when the expression may depend
+    on the session. A cached plot needs no worker at all. *style* is merged into
+    the render spec: ``format``, and the size as ``width``, ``height`` and
+    ``dpi``. Unless *inline*, the image goes to the artifact store and the
+    caller gets its URI.
+    """
+    style = style or {}
+    image_format = style.get("format", "png")
+    suffix = "svgz" if image_format == "svg" else image_format
+    cache = runtime.PLOT_CACHE
+    if key is not None and cache.enabled:
+        image = cache.get(key, suffix)
+        monitoring.record_plot_cache(hit=image is not None)
+        if image is not None:
+            return _plot_result(ctx, image, inline, image_format)
+    session = await runtime.resolve_session(ctx.session_id, session_name)
+    spec = await _evaluate_structured(session, code)
+    try:
+        image = await runtime.RENDER_POOL.render({**spec, **style})
+    except RenderError as exc:
+        raise ToolError(str(exc)) from exc
+    if key is not None and cache.enabled:
+        cache.put(key, image, suffix)
+    return _plot_result(ctx, image, inline, image_format)
+
 
-@mcp.tool(description="Plot a 3D surface of a two-variable expression as base64 PNG")
+def _significant(value: float | None) -> float | None:
+    # Seven significant digits is below a pixel at any size a client will
+    # draw, and about halves the JSON next to a full repr.
+    return None if value is None else float(f"{value:.7g}")
+
+
+async def _plot_points(ctx: Context, session_name: str, code: str, variable: str) -> dict:
+    """The sampled curves themselves, for a client that draws its own plot."""
+    session = await runtime.resolve_session(ctx.session_id, session_name)
+    spec = await _evaluate_structured(session, code)
+    series = [
+        [[[_significant(x) for x in xs], [_significant(y) for y in ys]] for xs, ys in segments]
+        for segments in spec["series"]
+    ]
+    result = {
+        "format": "points",
+        "series": series,
+        "points": sum(len(xs) for segments in series for xs, _ in segments),
+        "xlabel": variable,
+    }
+    _over_budget("point data", len(json.dumps(result)), "lower plot_points or narrow the range")
+    return result
+
+
+@mcp.tool(description="Plot a 3D surface of a two-variable expression as a PNG, or return its mesh")
 async def plot3d_expression(
     expression: Annotated[
         str, Field(description="Expression of two variables (e.g. 'sin(x)*cos(y)')")
@@ -42,71 +224,100 @@ async def plot3d_expression(
     x_range_max: Annotated[float, Field(description="X upper bound")] = 5.0,
     y_range_min: Annotated[float, Field(description="Y lower bound")] = -5.0,
     y_range_max: Annotated[float, Field(description="Y upper bound")] = 5.0,
+    grid: Annotated[
+        int,
+        Field(
+            description=f"Samples per axis, at most {_PLOT3D_MAX_GRID}. Higher "
+            "values give a smoother surface"
+        ),
+    ] = _PLOT3D_GRID,
+    output_format: Annotated[str, Field(description=_PLOT3D_FORMAT_DESC)] = "png",
+    inline: Annotated[bool, Field(description=_INLINE_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    session = await runtime.resolve_session(ctx.session_id, session)
+    if not 2 <= grid <= _PLOT3D_MAX_GRID:
+        raise ToolError(f"'grid' must be between 2 and {_PLOT3D_MAX_GRID}, got {grid}")
+    output_format = output_format.strip().lower()
+    if output_format not in _PLOT3D_FORMATS:
+        raise ToolError(
+            f"Unknown output_format '{output_format}'. Must be one of: "
+            + ", ".join(_PLOT3D_FORMATS)
+        )
     code = (
         _sage_prelude([x_variable, y_variable])
         + textwrap.dedent(
             f"""
-        import base64
-        import io as _io
-        from sage.plot.graphics import Graphics as _Graphics
+        import numpy
         _xv = var({_encode_literal(x_variable)})
         _yv = var({_encode_literal(y_variable)})
         _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
-        # Sage's plot3d returns a Graphics3d, whose save()/save_image() require
-        # a filesystem path and reject a BytesIO. There is no .matplotlib()
-        # figure on it either, and a temp file is unreachable from the sandbox
-        # (`open` is forbidden, tempfile/os are not importable). So sample the
-        # surface and render it through matplotlib's 3D axes, which writes to
-        # memory. A 2D Graphics is only used to obtain a Figure without
-        # importing matplotlib directly.
-        try:
-            _f = fast_callable(_expr, vars=(_xv, _yv), domain=float)
-        except Exception:
-            _f = None
-
-        def _z_at(_a, _b):
-            # Singular or complex-valued points become NaN, which matplotlib
-            # renders as a gap rather than failing the whole plot.
+        # Sampled here, drawn by the render pool. Sage's own plot3d returns a
+        # Graphics3d, which can only be saved to a path and has no matplotlib
+        # figure, so the surface was always going to be drawn from samples.
+        _n = {grid}
+        _X, _Y = numpy.meshgrid(
+            numpy.linspace(float({x_range_min}), float({x_range_max}), _n),
+            numpy.linspace(float({y_range_min}), float({y_range_max}), _n),
+        )
+
+        def _surface():
+            # The whole grid in one call: fast_callable over Python objects
+            # hands the arrays to the operators, and Sage's functions dispatch
+            # an ndarray argument to the matching NumPy ufunc. Sampling point
+            # by point, with a try/except each, cost more than the render.
+            try:
+                return numpy.broadcast_to(
+                    numpy.asarray(fast_callable(_expr, vars=(_xv, _yv))(_X, _Y), dtype=complex),
+                    _X.shape,
+                )
+            except Exception:
+                pass
+            # Something in the expression does not take arrays: fall back to a
+            # compiled scalar function, then to substitution.
             try:
-                if _f is not None:
-                    return float(_f(_a, _b))
-                return float(_expr.subs({{_xv: _a, _yv: _b}}))
+                _f = fast_callable(_expr, vars=(_xv, _yv), domain=float)
             except Exception:
-                return float('nan')
-
-        _n = {_PLOT3D_GRID}
-        _xlo, _xhi = float({x_range_min}), float({x_range_max})
-        _ylo, _yhi = float({y_range_min}), float({y_range_max})
-        _gx, _gy, _gz = [], [], []
-        for _i in range(_n):
-            _a = _xlo + (_xhi - _xlo) * _i / (_n - 1)
-            for _j in range(_n):
-                _b = _ylo + (_yhi - _ylo) * _j / (_n - 1)
-                _gx.append(_a)
-                _gy.append(_b)
-                _gz.append(_z_at(_a, _b))
-        _fig = _Graphics().matplotlib()
-        _fig.clf()
-        _ax = _fig.add_subplot(111, projection='3d')
-        # plot_trisurf accepts flat sequences, so no numpy import is needed.
-        _ax.plot_trisurf(_gx, _gy, _gz, cmap='viridis')
-        _ax.set_xlabel({_encode_literal(x_variable)})
-        _ax.set_ylabel({_encode_literal(y_variable)})
-        _buf = _io.BytesIO()
-        _fig.savefig(_buf, format='png')
-        _buf.seek(0)
-        base64.b64encode(_buf.read()).decode('ascii')
+                _f = None
+
+            def _z_at(_a, _b):
+                try:
+                    if _f is not None:
+                        return float(_f(_a, _b))
+                    return float(_expr.subs({{_xv: _a, _yv: _b}}))
+                except Exception:
+                    return float('nan')
+
+            return numpy.vectorize(_z_at, otypes=[float])(_X, _Y)
+
+        with numpy.errstate(all='ignore'):
+            _Z = _surface()
+        # Singular or complex-valued points become NaN, which matplotlib
+        # renders as a gap rather than failing the whole plot.
+        if numpy.iscomplexobj(_Z):
+            _Z = numpy.where(_Z.imag == 0, _Z.real, numpy.nan)
+        _Z = numpy.where(numpy.isfinite(_Z), _Z, numpy.nan)
         """
         )
+        + (_MESH_RESULT if output_format == "mesh" else _SURFACE_SPEC).format(
+            x=f"[float({x_range_min}), float({x_range_max})]",
+            y=f"[float({y_range_min}), float({y_range_max})]",
+            xlabel=_encode_literal(x_variable),
+            ylabel=_encode_literal(y_variable),
+        )
     )
-    result = await _evaluate_structured(session, code)
-    return {"image_base64": result, "format": "png"}
+    if output_format == "mesh":
+        session = await runtime.resolve_session(ctx.session_id, session)
+        mesh = await _evaluate_structured(session, code)
+        _over_budget("mesh", len(json.dumps(mesh)), "lower grid")
+        return mesh
+    key = plot_key(
+        "plot3d_expression", [expression], [x_variable, y_variable],
+        x_range=[x_range_min, x_range_max], y_range=[y_range_min, y_range_max], grid=grid,
+    )
+    return await _plot(ctx, session, code, key, inline)
 
 
 @mcp.tool(description="Plot multiple expressions overlaid on a single 2D graph")
@@ -117,68 +328,81 @@ async def plot_multi_expression(
     variable: Annotated[str, Field(description="Plot variable")] = "x",
     range_min: Annotated[float, Field(description="Lower bound of plot range")] = -10.0,
     range_max: Annotated[float, Field(description="Upper bound of plot range")] = 10.0,
+    output_format: Annotated[str, Field(description=_OUTPUT_FORMAT_DESC)] = "png",
+    width: Annotated[int, Field(description=_WIDTH_DESC)] = 640,
+    height: Annotated[int, Field(description=_HEIGHT_DESC)] = 480,
+    dpi: Annotated[int, Field(description=_DPI_DESC)] = 100,
+    plot_points: Annotated[int, Field(description=_PLOT_POINTS_DESC)] = 200,
+    inline: Annotated[bool, Field(description=_INLINE_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    session = await runtime.resolve_session(ctx.session_id, session)
+    output_format = _check_2d_output(output_format, width, height, dpi, plot_points)
     code = (
         _sage_prelude([variable])
+        + _LINE_POINTS
         + textwrap.dedent(
             f"""
-        import base64
-        import io as _io
         _var = var({_encode_literal(variable)})
         _exprs = [sage_eval(e, locals=_locals) for e in {_encode_literal(expressions)}]
-        _plt = sum(plot(e, (_var, {range_min}, {range_max})) for e in _exprs)
-        _buf = _io.BytesIO()
-        # Graphics.save() needs a filesystem path and rejects a BytesIO with
-        # "expected str, bytes or os.PathLike object". Going through the
-        # matplotlib figure renders to memory, which the sandbox allows.
-        _plt.matplotlib().savefig(_buf, format='png')
-        _buf.seek(0)
-        base64.b64encode(_buf.read()).decode('ascii')
+        {{'kind': 'lines', 'series': [
+            _points(plot(e, (_var, {range_min}, {range_max}), plot_points={plot_points}))
+            for e in _exprs
+        ]}}
         """
         )
     )
-    result = await _evaluate_structured(session, code)
-    return {"image_base64": result, "format": "png"}
+    if output_format == "points":
+        return await _plot_points(ctx, session, code, variable)
+    style = {"format": output_format, "width": width, "height": height, "dpi": dpi}
+    key = plot_key(
+        "plot_multi_expression", expressions, [variable], range=[range_min, range_max],
+        plot_points=plot_points, **style,
+    )
+    return await _plot(ctx, session, code, key, inline, style)
 
 
-@mcp.tool(description="Plot an expression and return a base64-encoded PNG image")
+@mcp.tool(description="Plot an expression as a PNG or SVG image, or as sampled points")
 async def plot_expression(
     expression: Annotated[str, Field(description="Expression to plot")],
     variable: Annotated[str, Field(description="Plot variable")] = "x",
     range_min: Annotated[float, Field(description="Lower bound of plot range")] = -10.0,
     range_max: Annotated[float, Field(description="Upper bound of plot range")] = 10.0,
+    output_format: Annotated[str, Field(description=_OUTPUT_FORMAT_DESC)] = "png",
+    width: Annotated[int, Field(description=_WIDTH_DESC)] = 640,
+    height: Annotated[int, Field(description=_HEIGHT_DESC)] = 480,
+    dpi: Annotated[int, Field(description=_DPI_DESC)] = 100,
+    plot_points: Annotated[int, Field(description=_PLOT_POINTS_DESC)] = 200,
+    inline: Annotated[bool, Field(description=_INLINE_DESC)] = False,
     session: Annotated[str, Field(description=_SESSION_ARG_DESC)] = DEFAULT_SESSION_NAME,
     ctx: Context | None = None,
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required for stateful execution")
-    session = await runtime.resolve_session(ctx.session_id, session)
+    output_format = _check_2d_output(output_format, width, height, dpi, plot_points)
     code = (
         _sage_prelude([variable])
+        + _LINE_POINTS
         + textwrap.dedent(
             f"""
-        import base64
-        import io as _io
         _var = var({_encode_literal(variable)})
         _expr = sage_eval({_encode_literal(expression)}, locals=_locals)
-        _plt = plot(_expr, (_var, {range_min}, {range_max}))
-        _buf = _io.BytesIO()
-        # Graphics.save() needs a filesystem path and rejects a BytesIO with
-        # "expected str, bytes or os.PathLike object". Going through the
-        # matplotlib figure renders to memory, which the sandbox allows.
-        _plt.matplotlib().savefig(_buf, format='png')
-        _buf.seek(0)
-        base64.b64encode(_buf.read()).decode('ascii')
+        {{'kind': 'lines', 'series': [
+            _points(plot(_expr, (_var, {range_min}, {range_max}), plot_points={plot_points}))
+        ]}}
         """
         )
     )
-    result = await _evaluate_structured(session, code)
-    return {"image_base64": result, "format": "png"}
+    if output_format == "points":
+        return await _plot_points(ctx, session, code, variable)
+    style = {"format": output_format, "width": width, "height": height, "dpi": dpi}
+    key = plot_key(
+        "plot_expression", [expression], [variable], range=[range_min, range_max],
+        plot_points=plot_points, **style,
+    )
+    return await _plot(ctx, session, code, key, inline, style)
 
 
 @mcp.tool(
@@ -190,10 +414,10 @@ async def plot_expression(
 )
 async def geometry_operation(
     operation: Annotated[
-        str,
+        str | list[str],
         Field(
             description="One of: distance, polygon_area, "
-            "polytope_volume, convex_hull_vertices, is_convex"
+            "polytope_volume, convex_hull_vertices, is_convex. " + _OPERATION_LIST_DESC
         ),
     ],
     points: Annotated[
@@ -205,16 +429,19 @@ async def geometry_operation(
 ) -> dict:
     if ctx is None or ctx.session_id is None:
         raise ToolError("MCP context with session_id is required")
-    operation = operation.strip()
     if not points:
         raise ToolError("'points' must contain at least one point")
-    if operation == "is_convex" and len(points) < 3:
+    operations = _requested_operations(
+        operation,
+        {"distance", "polygon_area", "polytope_volume", "convex_hull_vertices", "is_convex"},
+    )
+    if "is_convex" in operations and len(points) < 3:
         raise ToolError(
             f"Operation 'is_convex' needs at least three points, got {len(points)}"
         )
     # distance previously generated the literal "None" for a single point, so
     # the tool returned {'result': None} as though that were an answer.
-    if operation == "distance" and len(points) < 2:
+    if "distance" in operations and len(points) < 2:
         raise ToolError(
             f"Operation 'distance' requires two points, got {len(points)}"
         )
@@ -280,11 +507,6 @@ async def geometry_operation(
             "bool(_simple and len(_turns) <= 1)"
         ),
     }
-    if operation not in ops:
-        raise ToolError(
-            f"Unknown operation '{operation}'. "
-            f"Use: {', '.join(ops)}"
-        )
-    code = _sage_prelude() + ops[operation] + "\n"
-    result = await _evaluate_structured(session, code)
-    return {"operation": operation, "result": result}
+    return await _run_operations(
+        session, _sage_prelude(), ops, operations, single=isinstance(operation, str)
+    )
@@ -8,16 +8,20 @@ would have prefixed them.
 
 from __future__ import annotations
 
+import gzip
+import time
 from typing import Annotated
 
 from fastmcp import Context
-from fastmcp.exceptions import ToolError
+from fastmcp.exceptions import ResourceError, ToolError
+from fastmcp.resources import ResourceContent, ResourceResult
 from pydantic import Field
 
 from .. import monitoring, runtime
 from ..app import mcp
 from ..models import (
     DocumentationLink,
+    ForkResponse,
     MonitoringSnapshot,
     ResetResponse,
     SessionSnapshot,
@@ -119,6 +123,44 @@ async def start_sage_session(
     return ResetResponse(message=f"Session '{name}' ready")
 
 
+@mcp.tool(
+    description="Copy a Sage workspace, variables and all, into a new named workspace"
+)
+async def fork_sage_session(
+    name: Annotated[str, Field(description="Name of the new workspace")],
+    source: Annotated[
+        str, Field(description="Workspace to copy (default: the default workspace)")
+    ] = DEFAULT_SESSION_NAME,
+    ctx: Context | None = None,
+) -> ForkResponse:
+    """Branch a workspace so a what-if can run without disturbing the original.
+
+    The worker is forked, so the copy shares the source's memory until either
+    side writes to it and an expensive state costs nothing to duplicate. Where
+    the worker cannot fork, the source's statements are replayed instead, which
+    is slower but gives the same namespace; ``method`` says which happened.
+    """
+    if ctx is None or ctx.session_id is None:
+        raise ToolError("MCP context with session_id is required to fork a session")
+    if not name.strip():
+        raise ToolError("Session name must not be empty")
+    manager = runtime.SESSION_MANAGER
+    started = time.perf_counter()
+    try:
+        _, method = await manager.fork(
+            manager.key_for(ctx.session_id, source), manager.key_for(ctx.session_id, name)
+        )
+    except ValueError as exc:
+        raise ToolError(f"A Sage session named '{name}' already exists for this client") from exc
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    await ctx.info(f"Forked Sage session '{source}' into '{name}'")
+    return ForkResponse(
+        message=f"Session '{name}' ready, copied from '{source}'",
+        method=method,
+        elapsed_ms=round(elapsed_ms, 1),
+    )
+
+
 @mcp.tool(description="List the named Sage workspaces belonging to this client")
 async def list_sage_sessions(ctx: Context | None = None) -> dict:
     """Report every workspace for this client, with liveness and statement counts."""
@@ -179,6 +221,7 @@ async def session_resource(scope: str, ctx: Context | None = None) -> str:
                 started_at=float(entry["started_at"]),
                 last_used_at=float(entry["last_used_at"]),
                 idle_seconds=float(entry["idle_seconds"]),
+                queued=int(entry["queued"]),
             )
         )
     return _json.dumps([s.model_dump() for s in snapshots])
@@ -209,3 +252,21 @@ async def documentation_resource(scope: str, ctx: Context | None = None) -> list
     if scope == "all":
         return DOC_LINKS
     return [link for link in DOC_LINKS if link.slug == scope]
+
+
+@mcp.resource("resource://sagemath/artifacts/{artifact_id}")
+async def artifact_resource(artifact_id: str, ctx: Context | None = None) -> ResourceResult:
+    """Serve a stored artifact -- a rendered plot, say -- to the client that made it.
+
+    Scoped like the session resource: another client's artifact, an expired one
+    and one that never existed all read as not found, so the answer says nothing
+    about which artifacts exist.
+    """
+    owner = ctx.session_id if ctx is not None else None
+    artifact = runtime.ARTIFACTS.get(artifact_id, owner=owner) if owner else None
+    if artifact is None:
+        raise ResourceError(f"No artifact '{artifact_id}' for this client; it may have expired")
+    # The HTTP route says Content-Encoding: gzip and lets the client inflate;
+    # a resource has no way to say it, so it serves what the mime type names.
+    data = gzip.decompress(artifact.data) if artifact.encoding == "gzip" else artifact.data
+    return ResourceResult([ResourceContent(data, mime_type=artifact.media_type)])
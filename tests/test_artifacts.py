@@ -0,0 +1,62 @@
+import pytest
+
+from sagemath_mcp import artifacts
+from sagemath_mcp.artifacts import ArtifactStore
+
+
+def test_an_artifact_is_described_by_uri_not_by_its_bytes():
+    store = ArtifactStore()
+    artifact = store.put("client-a", b"\x89PNG data", "image/png")
+    described = artifact.describe()
+    assert described["artifact"] == f"resource://sagemath/artifacts/{artifact.artifact_id}"
+    assert described["url"] == f"/artifacts/{artifact.artifact_id}"
+    assert (described["media_type"], described["bytes"]) == ("image/png", 9)
+    assert "data" not in described
+    assert store.get(artifact.artifact_id) is artifact
+
+
+def test_artifacts_are_scoped_to_their_owner():
+    store = ArtifactStore()
+    artifact = store.put("client-a", b"png", "image/png")
+    assert store.get(artifact.artifact_id, owner="client-a") is artifact
+    assert store.get(artifact.artifact_id, owner="client-b") is None
+    # The same bytes from two clients are two artifacts, with one ETag.
+    other = store.put("client-b", b"png", "image/png")
+    assert other.artifact_id != artifact.artifact_id
+    assert other.etag == artifact.etag
+
+
+def test_artifacts_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(artifacts.time, "time", lambda: now[0])
+    store = ArtifactStore(ttl=10.0)
+    first = store.put("a", b"1", "image/png")
+    now[0] += 5
+    second = store.put("a", b"2", "image/png")
+    now[0] += 6
+    assert store.get(first.artifact_id) is None
+    assert store.get(second.artifact_id) is second
+    now[0] += 5
+    assert store.cull() == 1
+    assert len(store) == 0
+
+
+def test_the_oldest_artifacts_go_when_the_byte_budget_is_spent():
+    store = ArtifactStore(max_bytes=10)
+    first = store.put("a", b"x" * 4, "image/png")
+    second = store.put("a", b"x" * 4, "image/png")
+    third = store.put("a", b"x" * 4, "image/png")
+    assert store.get(first.artifact_id) is None
+    assert store.get(second.artifact_id) is second
+    assert store.get(third.artifact_id) is third
+    # One artifact larger than the budget is still kept, alone.
+    big = store.put("a", b"x" * 20, "image/png")
+    assert len(store) == 1
+    assert store.get(big.artifact_id) is big
+
+
+@pytest.mark.parametrize("owner", [None, "client-b"])
+def test_unknown_and_foreign_ids_read_the_same(owner):
+    store = ArtifactStore()
+    store.put("client-a", b"png", "image/png")
+    assert store.get("0" * 32, owner=owner) is None
@@ -460,3 +460,127 @@ def test_matrix_entries_refuse_a_number_that_has_already_been_rounded() -> None:
         _exact_matrix_entries([[True]], "m")
     with pytest.raises(ToolError, match="list of rows"):
         _exact_matrix_entries(["not a row"], "m")
+
+
+def test_matrix_entries_accept_rationals_as_strings() -> None:
+    from fractions import Fraction
+
+    from sagemath_mcp.codegen import _exact_matrix_entries
+
+    rows = _exact_matrix_entries([["1/3", "4/2"], ["-7/2", 5]], "m")
+    assert rows == [[Fraction(1, 3), 2], [Fraction(-7, 2), 5]]
+    assert isinstance(rows[0][1], int), "a rational that reduces to an integer is one"
+    with pytest.raises(ToolError, match="zero denominator"):
+        _exact_matrix_entries([["1/0"]], "m")
+    # Only two integers either side of the slash; anything else is not a rational.
+    with pytest.raises(ToolError, match="not a decimal integer"):
+        _exact_matrix_entries([["1/x"]], "m")
+
+
+def test_matrix_ring_is_the_narrowest_exact_one() -> None:
+    """Integers on ZZ, a rational moves it to QQ, a float keeps today's SR."""
+    from fractions import Fraction
+
+    from sagemath_mcp.codegen import _matrix_ring
+
+    assert _matrix_ring([[1, 2], [3, 4]]) == "ZZ"
+    assert _matrix_ring([[1, Fraction(1, 2)], [3, 4]]) == "QQ"
+    assert _matrix_ring([[1, Fraction(1, 2)], [3, 4.5]]) == "SR"
+    assert _matrix_ring([[1, 2]], numeric=True) == "RDF"
+    assert _matrix_ring([[1, 2]], ring=" QQbar ") == "QQbar"
+    assert _matrix_ring([[1, 2]], ring="CDF", numeric=True) == "CDF"
+
+
+def test_matrix_ring_refuses_what_it_cannot_honour() -> None:
+    from sagemath_mcp.codegen import _matrix_ring
+
+    # Interpolated into generated code, so only the listed names get through.
+    with pytest.raises(ToolError, match="Unknown ring"):
+        _matrix_ring([[1]], ring="ZZ); evil(")
+    with pytest.raises(ToolError, match="cannot be combined"):
+        _matrix_ring([[1]], ring="QQ", numeric=True)
+
+
+def test_matrix_literal_writes_rationals_exactly() -> None:
+    """Generated code is not preparsed, where 1/3 would be a float."""
+    from fractions import Fraction
+
+    from sagemath_mcp.codegen import _matrix_literal
+
+    assert _matrix_literal([[1, Fraction(1, 3)], [2.5, -4]]) == "[[1, QQ((1, 3))], [2.5, -4]]"
+
+
+def test_sparse_entries_accept_coordinate_and_csr_forms():
+    from fractions import Fraction
+
+    from sagemath_mcp.codegen import _sparse_matrix_entries
+
+    coordinate = _sparse_matrix_entries([2, 3], entries=[[1, 0, "2/4"], [0, 2, 5], [0, 1, 0]])
+    compressed = _sparse_matrix_entries(
+        [2, 3], indptr=[0, 2, 3], indices=[1, 2, 0], data=[0, 5, "1/2"]
+    )
+    assert coordinate == (2, 3, [(0, 2, 5), (1, 0, Fraction(1, 2))], "coo")
+    assert compressed == (2, 3, [(0, 2, 5), (1, 0, Fraction(1, 2))], "csr")
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"shape": [0, 3], "entries": []}, "two positive integers"),
+        ({"shape": [2, 2], "entries": [[0, 2, 1]]}, "out of range"),
+        ({"shape": [2, 2], "entries": [[0, 0, 1], [0, 0, 2]]}, "more than once"),
+        ({"shape": [2, 2], "entries": [[0, 1]]}, "triples"),
+        ({"shape": [2, 2], "entries": [], "data": []}, "not both"),
+        ({"shape": [2, 2], "indptr": [0, 1], "indices": [0], "data": [1]}, "rows \\+ 1"),
+        ({"shape": [2, 2], "indptr": [0, 2, 1], "indices": [0], "data": [1]}, "never decrease"),
+    ],
+)
+def test_sparse_entries_refuse_malformed_input(kwargs, message):
+    from sagemath_mcp.codegen import _sparse_matrix_entries
+
+    with pytest.raises(ToolError, match=message):
+        _sparse_matrix_entries(**kwargs)
+
+
+def test_sparse_result_round_trips_through_csr():
+    from fractions import Fraction
+
+    from sagemath_mcp.codegen import _sparse_literal, _sparse_result
+
+    triples = [[0, 2, 5], [2, 0, 1.5]]
+    assert _sparse_result([3, 3], triples, "csr") == {
+        "shape": [3, 3], "indptr": [0, 1, 1, 2], "indices": [2, 0], "data": [5, 1.5],
+    }
+    assert _sparse_literal([(0, 1, Fraction(1, 3))]) == "{(0, 1): QQ((1, 3))}"
+
+
+def test_batched_operations_isolate_failures_and_time_each_one():
+    """Run the generated batch as plain Python: no Sage needed to check its shape."""
+    from sagemath_mcp.codegen import _batched_operations
+
+    code = _batched_operations(
+        {
+            "double": "_x * 2",
+            "broken": "1 // 0",
+            "helper": "def _inc(v):\n    return v + 1\n_inc(_x)",
+        },
+        ["double", "broken", "helper"],
+    )
+    clock = iter(range(100))
+    namespace = {"_x": 21, "walltime": lambda start=None: next(clock) - (start or 0)}
+    *body, last = code.strip().split("\n")
+    exec("\n".join(body), namespace)
+    answer = eval(last, namespace)
+
+    assert answer["results"] == {"double": 42, "helper": 22}
+    assert answer["errors"] == {"broken": "integer division or modulo by zero"}
+    assert set(answer["timings_ms"]) == {"double", "broken", "helper"}
+
+
+def test_requested_operations_accepts_a_name_or_a_list():
+    from sagemath_mcp.codegen import _requested_operations
+
+    assert _requested_operations(" rank ", {"rank"}) == ["rank"]
+    assert _requested_operations(["rank", "det", "rank"], {"rank", "det"}) == ["rank", "det"]
+    with pytest.raises(ToolError, match="Unknown operation 'trace'"):
+        _requested_operations(["rank", "trace"], {"rank"})
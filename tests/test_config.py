@@ -48,3 +48,77 @@ def test_bool_flag_parsing(monkeypatch, raw_value, expected):
     monkeypatch.setenv("SAGEMATH_MCP_FORCE_PYTHON_WORKER", raw_value)
     settings = SageSettings.from_env()
     assert settings.force_python_worker is expected
+
+
+def test_render_workers_from_env(monkeypatch):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("SAGEMATH_MCP_RENDER_WORKERS", "4")
+    assert SageSettings.from_env().render_workers == 4
+    monkeypatch.delenv("SAGEMATH_MCP_RENDER_WORKERS")
+    assert SageSettings.from_env().render_workers == 2
+
+
+def test_plot_cache_settings_from_env(monkeypatch, tmp_path):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("SAGEMATH_MCP_PLOT_CACHE_ENTRIES", "0")
+    monkeypatch.setenv("SAGEMATH_MCP_PLOT_CACHE_DIR", str(tmp_path))
+    settings = SageSettings.from_env()
+    assert (settings.plot_cache_entries, settings.plot_cache_dir) == (0, str(tmp_path))
+
+
+def test_artifact_settings_from_env(monkeypatch):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("SAGEMATH_MCP_ARTIFACT_TTL", "60")
+    monkeypatch.setenv("SAGEMATH_MCP_ARTIFACT_MAX_BYTES", "1048576")
+    monkeypatch.setenv("SAGEMATH_MCP_PLOT_MAX_BYTES", "65536")
+    settings = SageSettings.from_env()
+    assert (settings.artifact_ttl, settings.artifact_max_bytes) == (60.0, 1048576)
+    assert settings.plot_max_bytes == 65536
+
+
+def test_portfolio_settings_from_env(monkeypatch):
+    _clear_env(monkeypatch)
+    monkeypatch.delenv("SAGEMATH_MCP_PORTFOLIO_ALGORITHMS", raising=False)
+    assert SageSettings.from_env().portfolio_algorithms == "maxima,sympy,giac,fricas"
+    monkeypatch.setenv("SAGEMATH_MCP_PORTFOLIO_ALGORITHMS", "maxima,sympy")
+    monkeypatch.setenv("SAGEMATH_MCP_PORTFOLIO_PREWARM", "true")
+    settings = SageSettings.from_env()
+    assert (settings.portfolio_algorithms, settings.portfolio_prewarm) == ("maxima,sympy", True)
+
+
+def test_parallel_workers_from_env(monkeypatch):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("SAGEMATH_MCP_PARALLEL_WORKERS", "6")
+    assert SageSettings.from_env().parallel_workers == 6
+    assert SageSettings().parallel_workers >= 1
+
+
+def test_job_settings_from_env(monkeypatch):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("SAGEMATH_MCP_JOB_WORKERS", "4")
+    monkeypatch.setenv("SAGEMATH_MCP_JOB_TIMEOUT", "7200")
+    monkeypatch.setenv("SAGEMATH_MCP_JOB_QUEUE_LIMIT", "8")
+    monkeypatch.setenv("SAGEMATH_MCP_JOB_RESULTS", "10")
+    monkeypatch.setenv("SAGEMATH_MCP_JOB_TTL", "60")
+    settings = SageSettings.from_env()
+    assert (
+        settings.job_workers, settings.job_timeout, settings.job_queue_limit,
+        settings.job_results, settings.job_ttl,
+    ) == (4, 7200.0, 8, 10, 60.0)
+
+
+def test_recycle_settings_from_env(monkeypatch):
+    _clear_env(monkeypatch)
+    defaults = SageSettings.from_env()
+    assert (
+        defaults.recycle_max_evaluations, defaults.recycle_max_age,
+        defaults.recycle_max_rss_growth_mb,
+    ) == (0, 0.0, 0.0)
+    monkeypatch.setenv("SAGEMATH_MCP_RECYCLE_MAX_EVALUATIONS", "2000")
+    monkeypatch.setenv("SAGEMATH_MCP_RECYCLE_MAX_AGE", "21600")
+    monkeypatch.setenv("SAGEMATH_MCP_RECYCLE_MAX_RSS_GROWTH_MB", "1024")
+    settings = SageSettings.from_env()
+    assert (
+        settings.recycle_max_evaluations, settings.recycle_max_age,
+        settings.recycle_max_rss_growth_mb,
+    ) == (2000, 21600.0, 1024.0)
@@ -441,6 +441,206 @@ async def test_matrix_determinant_stays_exact_past_the_safe_integer(sage_manager
     assert isinstance(floats["result"], float)
 
 
+@pytest.mark.asyncio
+@requires_sage
+async def test_matrix_tools_answer_the_same_over_the_inferred_ring(real_sage_manager):
+    """ZZ/QQ instead of SR must change the speed, not the answer."""
+    ctx = FakeContext("matrix-rings")
+    rows = [[2, 1, 0], [1, 3, 1], [0, 1, 4]]
+    for operation in ("determinant", "inverse", "rank", "rref", "eigenvalues"):
+        inferred = await server.matrix_operation(rows, operation, ctx=ctx)
+        symbolic = await server.matrix_operation(rows, operation, ring="SR", ctx=ctx)
+        if operation == "eigenvalues":
+            assert sorted(inferred["result"]) == pytest.approx(sorted(symbolic["result"]))
+        else:
+            assert inferred["result"] == symbolic["result"], operation
+
+    # A rational entry stays exact: det([[1/3, 0], [0, 3]]) is exactly 1.
+    rational = await server.matrix_operation(
+        [["1/3", 0], [0, 3]], "determinant", ctx=ctx
+    )
+    assert rational["result"] == 1.0
+
+    # A complex eigenvalue keeps its radical form rather than a QQbar decimal.
+    rotation = await server.matrix_operation([[0, -2], [1, 0]], "eigenvalues", ctx=ctx)
+    assert all("sqrt(2)" in str(value) for value in rotation["result"])
+
+    numeric = await server.matrix_operation(rows, "determinant", numeric=True, ctx=ctx)
+    assert numeric["result"] == pytest.approx(18.0)
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_sparse_matrix_operation_agrees_with_the_dense_tool(real_sage_manager):
+    """The path Laplacian of P_n: singular, rank n - 1, kernel spanned by ones."""
+    ctx = FakeContext("sparse-matrix")
+    n = 40
+    entries = [[i, i, 2 if 0 < i < n - 1 else 1] for i in range(n)]
+    entries += [[i, i + 1, -1] for i in range(n - 1)] + [[i + 1, i, -1] for i in range(n - 1)]
+
+    rank = await server.sparse_matrix_operation([n, n], "rank", entries=entries, ctx=ctx)
+    assert rank["result"] == n - 1
+    kernel = await server.sparse_matrix_operation([n, n], "kernel", entries=entries, ctx=ctx)
+    assert kernel["result"]["shape"] == [1, n]
+    assert {value for *_, value in kernel["result"]["entries"]} == {1.0}
+
+    dense = [[0] * n for _ in range(n)]
+    for i, j, value in entries:
+        dense[i][j] = value
+    dense[0][0] += 1            # ground one node so the system is solvable
+    entries[0][2] += 1
+    determinant = await server.sparse_matrix_operation(
+        [n, n], "determinant", entries=entries, ctx=ctx
+    )
+    expected = await server.matrix_operation(dense, "determinant", ctx=ctx)
+    assert determinant["result"] == expected["result"]
+
+    rhs = [1] * n
+    exact = await server.sparse_matrix_operation(
+        [n, n], "solve", entries=entries, rhs=rhs, ctx=ctx
+    )
+    approximate = await server.sparse_matrix_operation(
+        [n, n], "solve", entries=entries, rhs=rhs, numeric=True, ctx=ctx
+    )
+    assert approximate["result"] == pytest.approx(exact["result"])
+
+    eigen = await server.sparse_matrix_operation(
+        [n, n], "eigenvalues", entries=entries, count=3, ctx=ctx
+    )
+    everything = await server.matrix_operation(dense, "eigenvalues", numeric=True, ctx=ctx)
+    largest = sorted(everything["result"], key=abs, reverse=True)[:3]
+    assert eigen["result"] == pytest.approx(largest)
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_linear_solve_reuses_a_stored_factorization(real_sage_manager):
+    ctx = FakeContext("linear-solve")
+    A = [[2, 1, 0], [1, 3, 1], [0, 1, 4]]
+    batch = [[1, 0, 0], [0, 1, 0], [3, 6, 9]]
+
+    first = await server.linear_solve(batch, matrix=A, factorization="tridiagonal", ctx=ctx)
+    inverse = await server.matrix_operation(A, "inverse", ctx=ctx)
+    columns = [list(column) for column in zip(*inverse["result"], strict=True)]
+    assert first["solutions"][:2] == columns[:2]
+    assert first["solutions"][2] == [1.0, 1.0, 2.0]
+
+    reused = await server.linear_solve([[3, 6, 9]], factorization="tridiagonal", ctx=ctx)
+    assert reused["solutions"] == [[1.0, 1.0, 2.0]]
+
+    numeric = await server.linear_solve(batch, matrix=A, numeric=True, ctx=ctx)
+    assert numeric["solutions"][2] == pytest.approx([1.0, 1.0, 2.0])
+
+    # A singular system: consistent right-hand sides get a particular solution,
+    # inconsistent ones come back as None rather than failing the batch.
+    singular = await server.linear_solve([[1, 2], [1, 0]], matrix=[[1, 1], [2, 2]], ctx=ctx)
+    assert singular["solutions"] == [[1.0, 0.0], None]
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_operation_lists_answer_what_single_calls_answer(real_sage_manager):
+    ctx = FakeContext("operation-lists")
+    group = await server.group_operation(
+        "DihedralGroup(4)", ["order", "center_order", "exponent"], ctx=ctx
+    )
+    assert group["results"] == {"order": 8, "center_order": 2, "exponent": 4}
+    assert group["errors"] == {}
+    assert set(group["timings_ms"]) == {"order", "center_order", "exponent"}
+
+    matrix = await server.matrix_operation([[2, 1], [1, 2]], ["determinant", "rank"], ctx=ctx)
+    assert matrix["results"] == {"determinant": 3.0, "rank": 2}
+
+    # One failing operation does not take the others with it.
+    singular = await server.matrix_operation([[1, 2], [2, 4]], ["inverse", "rank"], ctx=ctx)
+    assert singular["results"] == {"rank": 1}
+    assert "inverse" in singular["errors"]
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_kept_objects_answer_through_their_handle(real_sage_manager):
+    ctx = FakeContext("handles")
+    kept = await server.graph_operation("PetersenGraph", "order", keep=True, ctx=ctx)
+    assert kept["result"] == 10
+    again = await server.graph_operation(kept["handle"], ["diameter", "is_planar"], ctx=ctx)
+    assert again["results"] == {"diameter": 2, "is_planar": False}
+
+    ideal = await server.polynomial_ring_operation(
+        ["a", "b"], ["a^2+b", "b^2-1"], "ideal_dimension", keep=True, ctx=ctx
+    )
+    reduced = await server.polynomial_ring_operation(
+        ["a", "b"], [ideal["handle"], "b^3"], "reduce", ctx=ctx
+    )
+    assert reduced["result"] == "b"
+
+    listed = await server.list_sage_sessions(ctx=ctx)
+    [entry] = listed["sessions"]
+    assert set(entry["handles"]) == {kept["handle"], ideal["handle"]}
+
+    await server.reset_sage_session(ctx=ctx)
+    with pytest.raises(SageEvaluationError, match="handles do not survive a reset"):
+        await server.graph_operation(kept["handle"], "order", ctx=ctx)
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_a_reset_forgets_assumptions(real_sage_manager):
+    ctx = FakeContext("assumptions")
+    await server.evaluate_sage("assume(x > 0)", ctx=ctx)
+    assert (await server.evaluate_sage("sqrt(x^2)", ctx=ctx)).result == "x"
+    await server.reset_sage_session(ctx=ctx)
+    assert (await server.evaluate_sage("sqrt(x^2)", ctx=ctx)).result == "abs(x)"
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_an_assumption_slipped_into_a_race_does_not_reach_the_next(
+    real_sage_manager, monkeypatch
+):
+    from sagemath_mcp.portfolio import Portfolio
+
+    portfolio = Portfolio(
+        SageSettings(force_python_worker=False, eval_timeout=90.0, portfolio_algorithms="maxima")
+    )
+    monkeypatch.setattr(runtime, "PORTFOLIO", portfolio)
+    try:
+        with pytest.raises(server.ToolError):
+            await server.integrate_expression(
+                "x*0+assume(x>0)", algorithm="portfolio", ctx=FakeContext("tenant-a")
+            )
+        result = await server.integrate_expression(
+            "sqrt(x^2)", algorithm="portfolio", ctx=FakeContext("tenant-b")
+        )
+        assert "abs(x)" in result["integral"]
+    finally:
+        await portfolio.shutdown()
+
+
+@pytest.mark.asyncio
+@requires_sage
+async def test_a_pooled_worker_forgets_its_last_callers_assumptions(
+    real_sage_manager, monkeypatch
+):
+    from sagemath_mcp.parallel import WorkerPool
+
+    pool = WorkerPool(
+        SageSettings(force_python_worker=False, eval_timeout=90.0, parallel_workers=1)
+    )
+    monkeypatch.setattr(runtime, "WORKER_POOL", pool)
+    try:
+        first = FakeContext("assuming")
+        await server.evaluate_sage("assume(x > 0)\ndef f(n):\n    return n*sqrt(x^2)\n", ctx=first)
+        assert (await server.parallel_map("f", [1], ctx=first))["results"] == [{"result": "x"}]
+        second = FakeContext("not-assuming")
+        await server.evaluate_sage("def g(n):\n    return n*sqrt(x^2)\n", ctx=second)
+        assert (await server.parallel_map("g", [1], ctx=second))["results"] == [
+            {"result": "abs(x)"}
+        ]
+    finally:
+        await pool.shutdown()
+
+
 SAGE_SEMANTICS = [
     ("2^3", "8"),                                   # power, not XOR
     ("x", "x"),                                     # the REPL predefines x
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from sagemath_mcp import monitoring, runtime, server
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.jobs import FINISHED, JobManager
+from sagemath_mcp.session import SageSession, SageSessionManager
+
+
+class FakeContext:
+    session_id = "jobs-client"
+
+    async def info(self, message):
+        pass
+
+    async def report_progress(self, progress, total=None, message=None):
+        pass
+
+
+async def _finished(job_id: str, within: float = 10.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + within
+    while True:
+        job = await server.get_sage_job(job_id)
+        if job["status"] in FINISHED:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"job still {job['status']}"
+        await asyncio.sleep(0.05)
+
+
+@pytest.fixture
+async def python_jobs(monkeypatch):
+    """Pure-Python workspaces and a job manager running one job at a time."""
+    settings = SageSettings(
+        force_python_worker=True, job_workers=1, job_queue_limit=2, job_results=2,
+        job_timeout=5.0,
+    )
+    manager = SageSessionManager(settings)
+    jobs = JobManager(settings)
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    monkeypatch.setattr(runtime, "JOBS", jobs)
+    monitoring.reset_metrics()
+    yield jobs
+    await jobs.shutdown()
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_a_job_runs_after_submit_returns(python_jobs):
+    submitted = await server.submit_sage_job("print('hi')\n6 * 7", ctx=FakeContext())
+    assert submitted["status"] in {"queued", "running"}
+    assert len(submitted["job_id"]) == 32
+    job = await _finished(submitted["job_id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["result"] == "42"
+    assert job["result"]["stdout"] == "hi\n"
+    metrics = monitoring.snapshot()
+    assert metrics["jobs_submitted"] == 1
+    assert metrics["jobs_finished"] == {"succeeded": 1}
+    assert (metrics["jobs_queued"], metrics["jobs_running"]) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_a_job_forked_from_a_workspace_sees_it_as_submitted(python_jobs):
+    ctx = FakeContext()
+    await server.evaluate_sage("x = 21", ctx=ctx)
+    submitted = await server.submit_sage_job("x * 2", source="default", ctx=ctx)
+    await server.evaluate_sage("x = 0", ctx=ctx)
+    job = await _finished(submitted["job_id"])
+    assert (job["status"], job["source"], job["result"]["result"]) == ("succeeded", "default", "42")
+    # The job's fork is its own: the workspace keeps its own value.
+    result = await server.evaluate_sage("x", ctx=ctx)
+    assert result.result == "0"
+
+
+@pytest.mark.asyncio
+async def test_jobs_queue_behind_the_running_one_and_can_be_cancelled(python_jobs):
+    ctx = FakeContext()
+    spinning = await server.submit_sage_job("while True:\n    pass\n", ctx=ctx)
+    waiting = await server.submit_sage_job("1 + 1", ctx=ctx)
+    assert (await server.get_sage_job(waiting["job_id"]))["status"] == "queued"
+    assert monitoring.snapshot()["jobs_queued"] == 1
+
+    cancelled = await server.cancel_sage_job(waiting["job_id"], ctx=ctx)
+    assert (cancelled["status"], cancelled["started_at"]) == ("cancelled", None)
+    await asyncio.sleep(0.2)
+    cancelled = await server.cancel_sage_job(spinning["job_id"], ctx=ctx)
+    assert cancelled["status"] == "cancelled"
+    assert cancelled["runtime_ms"] > 0
+    assert monitoring.snapshot()["jobs_finished"] == {"cancelled": 2}
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_reported_on_the_job(python_jobs):
+    ctx = FakeContext()
+    failed = await server.submit_sage_job("1 / 0", ctx=ctx)
+    timed_out = await server.submit_sage_job(
+        "while True:\n    pass\n", timeout_seconds=0.5, ctx=ctx
+    )
+    job = await _finished(failed["job_id"])
+    assert (job["status"], job["error"]) == ("failed", "division by zero")
+    job = await _finished(timed_out["job_id"])
+    assert job["status"] == "failed"
+    assert "timed out" in job["error"]
+
+
+@pytest.mark.asyncio
+async def test_a_job_whose_worker_cannot_run_is_failed(python_jobs, monkeypatch):
+    async def unspawnable(self, *args, **kwargs):
+        raise FileNotFoundError("No such file or directory: 'sage'")
+
+    monkeypatch.setattr(SageSession, "evaluate", unspawnable)
+    submitted = await server.submit_sage_job("1 + 1", ctx=FakeContext())
+    job = await _finished(submitted["job_id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "FileNotFoundError: No such file or directory: 'sage'"
+    assert python_jobs._running == {}
+    assert monitoring.snapshot()["jobs_finished"] == {"failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_only_the_newest_finished_jobs_are_kept(python_jobs):
+    ctx = FakeContext()
+    ids = [(await server.submit_sage_job(f"{n}", ctx=ctx))["job_id"] for n in range(2)]
+    for job_id in ids:
+        await _finished(job_id)
+    ids.append((await server.submit_sage_job("2", ctx=ctx))["job_id"])
+    await _finished(ids[2])
+    with pytest.raises(ToolError, match="No Sage job"):
+        await server.get_sage_job(ids[0])
+    assert (await server.get_sage_job(ids[1]))["result"]["result"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_submissions_beyond_the_limits_are_refused(python_jobs):
+    ctx = FakeContext()
+    with pytest.raises(ToolError, match="at most 5 seconds"):
+        await server.submit_sage_job("1", timeout_seconds=60, ctx=ctx)
+    for _ in range(3):
+        await server.submit_sage_job("while True:\n    pass\n", ctx=ctx)
+    with pytest.raises(ToolError, match="queue is full"):
+        await server.submit_sage_job("1", ctx=ctx)
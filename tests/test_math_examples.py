@@ -16,8 +16,10 @@ Cases are grouped per tool. Each group runs all of its cases and reports every
 failure at once, rather than stopping at the first.
 """
 
+import base64
 import math
 import shutil
+import struct
 
 import pytest
 
@@ -59,6 +61,20 @@ def contains(*fragments: str):
     return check
 
 
+def doubles(*values: float):
+    """Match base64 little-endian float64 values, NaN matching NaN."""
+
+    def check(actual):
+        decoded = struct.unpack(f"<{len(values)}d", base64.b64decode(actual))
+        return all(
+            (math.isnan(want) and math.isnan(got)) or math.isclose(got, want, abs_tol=1e-12)
+            for want, got in zip(values, decoded, strict=True)
+        )
+
+    check.__name__ = f"doubles{values}"
+    return check
+
+
 def _matches(expected, actual) -> bool:
     if callable(expected):
         return bool(expected(actual))
@@ -91,6 +107,13 @@ GROUPS: dict[str, list] = {
     ],
     "integrate_expression": [
         ("indefinite", lambda c: S.integrate_expression("x^2", "x", ctx=c), "integral", "1/3*x^3"),
+        # Whichever backend answers first, the antiderivative is the same.
+        ("portfolio",
+         lambda c: S.integrate_expression("x^2", "x", algorithm="portfolio", ctx=c),
+         "integral", "1/3*x^3"),
+        ("named algorithm",
+         lambda c: S.integrate_expression("x^2", "x", algorithm="sympy", ctx=c),
+         "integral", "1/3*x^3"),
         # doc: lower '0' / upper '1'
         ("doc:definite 0..1",
          lambda c: S.integrate_expression("x^2", "x", lower_bound="0", upper_bound="1", ctx=c),
@@ -158,6 +181,50 @@ GROUPS: dict[str, list] = {
         ("keyword argument is not an equation",
          lambda c: S.find_root("log(x, base=2) - 1", "x", 1.0, 4.0, ctx=c),
          "root", approx(2.0, 1e-9)),
+        # Every root at once: sin has seven in [-10, 10].
+        ("all roots of sin",
+         lambda c: S.find_root("sin(x)", mode="all", ctx=c), "count", 7),
+        # A double root never changes sign, so it is found as a dip in |f|;
+        # the multiplicity hints tell it from the simple one.
+        ("double root found by its dip",
+         lambda c: S.find_root("(x-1)^2*(x+2)", mode="all", ctx=c), "roots",
+         lambda roots: [(round(r["root"], 4), r["multiplicity"]) for r in roots]
+         == [(-2.0, 1), (1.0, 2)]),
+        # A pole is a sign change too, and is not reported as a root.
+        ("pole is not a root",
+         lambda c: S.find_root("1/x", mode="all", ctx=c), "count", 0),
+    ],
+    "evaluate_on_grid": [
+        # doc: 'exp(-x^2)*cos(3*y)' over ['x', 'y'], on a 2x2 grid.
+        ("doc:2d grid",
+         lambda c: S.evaluate_on_grid(
+             "exp(-x^2)*cos(3*y)", ["x", "y"], grid=[[0, 1, 2], [0, 1, 2]], inline=True, ctx=c
+         ),
+         "values", doubles(1.0, math.cos(3), math.exp(-1), math.exp(-1) * math.cos(3))),
+        # Complex and singular points come back as NaN, not as an error.
+        ("gaps are nan",
+         lambda c: S.evaluate_on_grid("sqrt(x)/x", ["x"], points=[[4], [0], [-1]],
+                                      inline=True, ctx=c),
+         "values", doubles(0.5, math.nan, math.nan)),
+    ],
+    "solve_ode_numeric": [
+        # doc: the pendulum ['v', '-sin(y)'] in ['y', 'v'] conserves v^2/2 - cos(y).
+        ("doc:pendulum energy",
+         lambda c: S.solve_ode_numeric(["v", "-sin(y)"], ["y", "v"], [1, 0], [0, 10],
+                                       points=5, inline=True, ctx=c),
+         "values",
+         lambda values: all(
+             math.isclose(v * v / 2 - math.cos(y), -math.cos(1), abs_tol=1e-6)
+             for _, y, v in zip(*[iter(struct.unpack("<15d", base64.b64decode(values)))] * 3,
+                                strict=True)
+         )),
+        # A stiff decay, integrated with BDF and its exact Jacobian.
+        ("stiff decay",
+         lambda c: S.solve_ode_numeric(["-1000*(y - cos(t))"], ["y"], [0], [0, 1],
+                                       times=[1], method="BDF", inline=True, ctx=c),
+         "values",
+         lambda values: math.isclose(struct.unpack("<2d", base64.b64decode(values))[1],
+                                     math.cos(1), abs_tol=1e-3)),
     ],
     "matrix_multiply": [
         ("2x2", lambda c: S.matrix_multiply([[1, 2], [3, 4]], [[5, 6], [7, 8]], ctx=c),
@@ -429,13 +496,13 @@ GROUPS: dict[str, list] = {
     "plot_expression": [
         # A PNG payload starts with the base64 of the PNG magic bytes.
         ("doc:sin renders a png",
-         lambda c: S.plot_expression("sin(x)", "x", -3.14, 3.14, ctx=c),
+         lambda c: S.plot_expression("sin(x)", "x", -3.14, 3.14, inline=True, ctx=c),
          "image_base64", contains("iVBORw0KGgo")),
     ],
     "plot_multi_expression": [
         # doc: ['sin(x)', 'cos(x)']
         ("doc:two curves render a png",
-         lambda c: S.plot_multi_expression(["sin(x)", "cos(x)"], ctx=c),
+         lambda c: S.plot_multi_expression(["sin(x)", "cos(x)"], inline=True, ctx=c),
          "image_base64", contains("iVBORw0KGgo")),
     ],
 }
@@ -507,11 +574,18 @@ async def test_plot3d_expression_renders_png(monkeypatch, label, expression):
     ctx = FakeContext("examples-plot3d")
 
     try:
-        result = await S.plot3d_expression(expression, ctx=ctx)
+        result = await S.plot3d_expression(expression, inline=True, ctx=ctx)
         assert result["format"] == "png"
+        # The surface is sampled as one array, so a fine grid is affordable.
+        fine = await S.plot3d_expression(expression, grid=200, inline=True, ctx=ctx)
+        assert fine["image_base64"].startswith("iVBORw0KGgo"), f"{label}: fine grid"
         payload = result["image_base64"]
         # Base64 of the PNG magic bytes.
         assert payload.startswith("iVBORw0KGgo"), f"{label}: not a PNG payload"
         assert len(payload) > 1000, f"{label}: payload suspiciously small"
+        mesh = await S.plot3d_expression(expression, grid=16, output_format="mesh", ctx=ctx)
+        assert mesh["shape"] == [16, 16]
+        assert len(base64.b64decode(mesh["z"])) == 16 * 16 * 4, f"{label}: not float32"
+        assert len(base64.b64decode(mesh["nan_mask"])) == 16 * 16 // 8
     finally:
         await manager.shutdown()
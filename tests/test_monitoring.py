@@ -0,0 +1,130 @@
+import json
+import threading
+
+import pytest
+from fastmcp import Client
+
+from sagemath_mcp import monitoring, prometheus, runtime, server
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.monitoring import LATENCY_BUCKETS_MS, LatencyHistogram
+from sagemath_mcp.session import SageSessionManager
+
+
+@pytest.fixture
+def python_manager(monkeypatch):
+    manager = SageSessionManager(SageSettings(force_python_worker=True))
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    monitoring.reset_metrics()
+    yield manager
+
+
+def test_quantiles_are_read_off_the_buckets():
+    histogram = LatencyHistogram()
+    for elapsed_ms in [0.1] * 50 + [3.0] * 40 + [100.0] * 9 + [250.0]:
+        histogram.record(elapsed_ms)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    # Each quantile is the upper bound of the bucket it falls in.
+    assert (summary["p50_ms"], summary["p90_ms"], summary["p99_ms"]) == (0.5, 4.0, 128.0)
+    assert summary["max_ms"] == 250.0
+    assert summary["total_ms"] == pytest.approx(5 + 120 + 900 + 250)
+
+
+def test_a_quantile_never_exceeds_the_maximum_and_overflow_is_counted():
+    histogram = LatencyHistogram()
+    histogram.record(3.0)
+    assert histogram.summary()["p99_ms"] == 3.0
+    histogram.record(LATENCY_BUCKETS_MS[-1] * 10)
+    counts, _, peak = histogram.merged()
+    assert counts[-1] == 1
+    assert histogram.summary()["p99_ms"] == peak
+
+
+def test_each_thread_records_into_its_own_shard():
+    histogram = LatencyHistogram()
+
+    def record():
+        for _ in range(1000):
+            histogram.record(1.0)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.summary()["count"] == 4000
+
+
+@pytest.mark.asyncio
+async def test_every_tool_call_is_timed_by_outcome(python_manager):
+    async with Client(server.mcp) as client:
+        await client.call_tool("evaluate_sage", {"code": "1 + 1"})
+        await client.call_tool("evaluate_sage", {"code": "1 / 0"}, raise_on_error=False)
+        await client.call_tool("list_sage_sessions", {})
+        await client.call_tool("no_such_tool", {}, raise_on_error=False)
+        metrics = json.loads(
+            (await client.read_resource("resource://sagemath/monitoring/metrics"))[0].text
+        )
+    latency = metrics["tool_latency"]
+    assert set(latency) == {"evaluate_sage", "list_sage_sessions"}
+    assert latency["evaluate_sage"]["ok"]["count"] == 1
+    assert latency["evaluate_sage"]["error"]["count"] == 1
+    assert latency["evaluate_sage"]["ok"]["p50_ms"] > 0
+    events = metrics["worker_events"]
+    assert events["starts"] == 1
+    assert events["restarts"] == events["timeouts"] == events["interrupts"] == 0
+    await python_manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_lifecycle_events_are_counted(python_manager):
+    session = await python_manager.get("events")
+    try:
+        with pytest.raises(TimeoutError):
+            await session.evaluate(
+                "while True:\n    pass\n", want_latex=False, capture_stdout=False,
+                timeout_seconds=0.5,
+            )
+        await session.evaluate("x = 1", want_latex=False, capture_stdout=False)
+        await session.restore_from_journal(session.journal())
+    finally:
+        await python_manager.shutdown()
+    events = monitoring.snapshot()["worker_events"]
+    assert (events["starts"], events["timeouts"], events["restarts"]) == (2, 1, 1)
+    assert events["journal_replays"] == 1
+
+
+def test_loop_lag_keeps_the_latest_and_the_largest_recent_sample():
+    monitoring.reset_metrics()
+    assert monitoring.loop_lag() == (0.0, 0.0)
+    for seconds in (0.002, 0.25, -0.001):
+        monitoring.record_loop_lag(seconds)
+    assert monitoring.loop_lag() == (0.0, 0.25)
+    for _ in range(200):
+        monitoring.record_loop_lag(0.001)
+    # The old spike has aged out of the window.
+    assert monitoring.loop_lag() == (0.001, 0.001)
+
+
+@pytest.mark.asyncio
+async def test_the_prometheus_exposition_covers_tools_and_workspaces(python_manager):
+    async with Client(server.mcp) as client:
+        await client.call_tool("evaluate_sage", {"code": "x = 1"})
+        await client.call_tool("evaluate_sage", {"code": "1 / 0"}, raise_on_error=False)
+        monitoring.record_loop_lag(0.004)
+        text = prometheus.render()
+    await python_manager.shutdown()
+    samples = dict(line.rsplit(" ", 1) for line in text.splitlines() if line[0] != "#")
+    prefix = 'sagemath_mcp_tool_call_duration_seconds'
+    ok = 'tool="evaluate_sage",outcome="ok"'
+    assert samples[f'{prefix}_bucket{{{ok},le="+Inf"}}'] == "1"
+    assert samples[f'{prefix}_count{{{ok}}}'] == "1"
+    assert float(samples[f'{prefix}_sum{{{ok}}}']) > 0
+    assert samples['sagemath_mcp_workspaces{state="idle"}'] == "1"
+    assert samples['sagemath_mcp_workspaces{state="busy"}'] == "0"
+    assert samples["sagemath_mcp_journal_statements"] == "1"
+    assert samples['sagemath_mcp_evaluations_total{outcome="failure"}'] == "1"
+    assert samples["sagemath_mcp_event_loop_lag_seconds"] == "0.004"
+    assert "# TYPE sagemath_mcp_tool_call_duration_seconds histogram" in text
+    # Session ids are credentials; the endpoint is unauthenticated.
+    assert "default" not in text
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from sagemath_mcp import runtime, server
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.parallel import WorkerPool
+from sagemath_mcp.session import SageSessionManager
+
+
+class ProgressContext:
+    session_id = "parallel-client"
+
+    def __init__(self):
+        self.progress = []
+
+    async def report_progress(self, progress, total=None, message=None):
+        self.progress.append((progress, total, message))
+
+    async def info(self, message):
+        pass
+
+    async def error(self, message):
+        pass
+
+
+@pytest.fixture
+async def python_pool(monkeypatch):
+    """Pure-Python workspaces and a pure-Python parallel pool of two."""
+    settings = SageSettings(force_python_worker=True, parallel_workers=2)
+    manager = SageSessionManager(settings)
+    pool = WorkerPool(settings)
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    monkeypatch.setattr(runtime, "WORKER_POOL", pool)
+    yield pool
+    await pool.shutdown()
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_parallel_map_returns_results_in_input_order(python_pool):
+    ctx = ProgressContext()
+    await server.evaluate_sage("def f(n):\n    return n * n if n != 3 else 1 / 0\n", ctx=ctx)
+    ctx.progress.clear()
+    result = await server.parallel_map("f", [1, 2, 3, 4, 5], ctx=ctx)
+    assert result["results"] == [
+        {"result": "1"}, {"result": "4"}, {"error": "division by zero"},
+        {"result": "16"}, {"result": "25"},
+    ]
+    assert (result["count"], result["errors"], result["workers"]) == (5, 1, 2)
+    # Streamed in input order, whichever worker finished first.
+    assert [json.loads(message) for _, _, message in ctx.progress] == result["results"]
+    assert [progress for progress, _, _ in ctx.progress] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_parallel_map_unpacks_arguments(python_pool):
+    ctx = ProgressContext()
+    await server.evaluate_sage("def add(a, b):\n    return a + b\n", ctx=ctx)
+    result = await server.parallel_map("add", [[1, 2], [3, 4]], unpack=True, ctx=ctx)
+    assert result["results"] == [{"result": "3"}, {"result": "7"}]
+
+
+@pytest.mark.asyncio
+async def test_an_item_that_times_out_does_not_stop_the_rest(python_pool):
+    ctx = ProgressContext()
+    await server.evaluate_sage("def spin(n):\n    while n:\n        pass\n    return 7\n", ctx=ctx)
+    result = await server.parallel_map(
+        "spin", [0, 1, 0], workers=1, item_timeout=1, ctx=ctx
+    )
+    assert result["results"][0] == result["results"][2] == {"result": "7"}
+    assert "timed out" in result["results"][1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_a_returned_worker_keeps_nothing_of_its_last_caller(python_pool):
+    ctx = ProgressContext()
+    await server.evaluate_sage("def f(n):\n    return n\n", ctx=ctx)
+    await server.parallel_map("f", [1, 2], ctx=ctx)
+    # Another workspace never defined f; the pool's workers must not remember it.
+    with pytest.raises(ToolError, match="'f' is not usable in workspace 'other'"):
+        await server.parallel_map("f", [1], session="other", ctx=ctx)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"inputs": []}, "between 1 and 10000 items"),
+        ({"function": "f(1)"}, "function"),
+        ({"inputs": [1, 2], "unpack": True}, "every input must be a list"),
+    ],
+)
+async def test_parallel_map_rejects_bad_requests(kwargs, message):
+    kwargs = {"function": "f", "inputs": [1], **kwargs}
+    with pytest.raises(ToolError, match=message):
+        await server.parallel_map(ctx=ProgressContext(), **kwargs)
@@ -0,0 +1,136 @@
+import pytest
+from fastmcp.exceptions import ToolError
+
+from sagemath_mcp import runtime, server
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.pipeline import PipelineError, parse_steps, resolve
+from sagemath_mcp.session import SageSessionManager
+
+
+class FakeContext:
+    session_id = "pipeline-client"
+
+    def __init__(self):
+        self.progress = []
+
+    async def info(self, message):
+        pass
+
+    async def error(self, message):
+        pass
+
+    async def report_progress(self, progress, total=None, message=None):
+        self.progress.append((progress, total))
+
+
+@pytest.fixture
+async def python_workspaces(monkeypatch):
+    manager = SageSessionManager(SageSettings(force_python_worker=True))
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    yield manager
+    await manager.shutdown()
+
+
+def _workspace(tool, args):
+    return args.get("session", "default")
+
+
+def test_steps_wait_for_references_needs_and_their_workspace():
+    steps = parse_steps(
+        [
+            {"id": "a", "tool": "t"},
+            {"id": "b", "tool": "t", "args": {"session": "other"}},
+            {"id": "c", "tool": "t", "args": {"x": "${b.result}"}},
+            {"tool": "t", "args": {"session": "other"}, "needs": ["a"]},
+        ],
+        _workspace,
+        10,
+    )
+    assert [(s.id, s.needs, s.after) for s in steps] == [
+        ("a", [], []),
+        ("b", [], []),
+        ("c", ["b"], ["a", "b"]),
+        ("step3", ["a"], ["a", "b"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("raw", "message"),
+    [
+        ([], "between 1 and 10 steps"),
+        ([{"id": "a", "tool": "t"}, {"id": "a", "tool": "t"}], "used twice"),
+        ([{"id": "a", "tool": "t", "args": {"x": "${b}"}}], "not an earlier step"),
+        ([{"id": "a", "tool": "t", "needs": ["a"]}], "not an earlier step"),
+        ([{"id": "a", "tool": "t", "when": 1}], "unknown keys: when"),
+        ([{"id": "a b", "tool": "t"}], "needs an 'id'"),
+    ],
+)
+def test_malformed_pipelines_are_refused(raw, message):
+    with pytest.raises(PipelineError, match=message):
+        parse_steps(raw, _workspace, 10)
+
+
+def test_references_keep_their_type_alone_and_become_text_inside_strings():
+    results = {"d": {"derivative": "3*x^2", "order": 1}, "r": [1, 2]}
+    assert resolve({"n": "${d.order}", "e": "(${d.derivative}) + 1"}, results) == {
+        "n": 1, "e": "(3*x^2) + 1",
+    }
+    assert resolve(["${r}", "${r.1}"], results) == [[1, 2], 2]
+    with pytest.raises(PipelineError, match="has no 'latex'"):
+        resolve("${d.latex}", results)
+    with pytest.raises(PipelineError, match="is not text"):
+        resolve("f(${d})", results)
+
+
+@pytest.mark.asyncio
+async def test_a_pipeline_chains_results_in_one_call(python_workspaces):
+    ctx = FakeContext()
+    result = await server.run_pipeline(
+        [
+            {"id": "a", "tool": "evaluate_sage", "args": {"code": "6 * 7"}},
+            {"id": "b", "tool": "evaluate_sage", "args": {"code": "${a.result} + 1"}},
+            {"id": "bad", "tool": "evaluate_sage", "args": {"code": "1 / 0"}},
+            {"id": "after_bad", "tool": "evaluate_sage", "args": {"code": "${bad.result}"}},
+            {"id": "typo", "tool": "evaluate_sage", "args": {"cod": "1"}},
+        ],
+        ctx=ctx,
+    )
+    steps = {step["id"]: step for step in result["steps"]}
+    assert steps["b"]["result"]["result"] == "43"
+    assert steps["bad"]["error"] == "division by zero"
+    assert "depends on bad" in steps["after_bad"]["skipped"]
+    assert "Invalid arguments" in steps["typo"]["error"]
+    assert (result["count"], result["errors"], result["skipped"]) == (5, 2, 1)
+    assert [progress for progress, _ in ctx.progress] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_workspaces_run_side_by_side_and_each_keeps_its_order(python_workspaces):
+    spin = "n = 0\nwhile n < 300000:\n    n += 1\n"
+    result = await server.run_pipeline(
+        [
+            {"id": "a1", "tool": "evaluate_sage", "args": {"code": spin}},
+            {"id": "b1", "tool": "evaluate_sage", "args": {"code": spin, "session": "b"}},
+            {"id": "a2", "tool": "evaluate_sage", "args": {"code": "n"}},
+        ],
+        ctx=FakeContext(),
+    )
+    a1, b1, a2 = result["steps"]
+    assert b1["started_ms"] < a1["started_ms"] + a1["elapsed_ms"]
+    # Timings are rounded to 0.1 ms each.
+    assert a2["started_ms"] >= a1["started_ms"] + a1["elapsed_ms"] - 0.2
+    assert a2["result"]["result"] == "300000"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("steps", "message"),
+    [
+        ([{"tool": "no_such_tool"}], "Unknown tool in pipeline: no_such_tool"),
+        ([{"tool": "run_pipeline"}], "cannot contain run_pipeline"),
+        ([{"tool": "evaluate_sage", "args": "1"}], "'args' must be an object"),
+    ],
+)
+async def test_run_pipeline_rejects_bad_pipelines(steps, message):
+    with pytest.raises(ToolError, match=message):
+        await server.run_pipeline(steps, ctx=FakeContext())
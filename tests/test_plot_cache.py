@@ -0,0 +1,71 @@
+import base64
+
+import pytest
+
+from sagemath_mcp.plot_cache import PlotCache, plot_key
+
+_PNG = base64.b64encode(b"\x89PNG\r\n\x1a\nfake").decode("ascii")
+
+
+def test_equivalent_requests_share_a_key():
+    key = plot_key("plot_expression", ["sin(x) + 1"], ["x"], range=[-10.0, 10.0])
+    assert key == plot_key("plot_expression", ["sin( x )+1"], ["x"], range=[-10.0, 10.0])
+    assert key != plot_key("plot_expression", ["sin(x) + 1"], ["x"], range=[-10.0, 9.0])
+    assert key != plot_key("plot_multi_expression", ["sin(x) + 1"], ["x"], range=[-10.0, 10.0])
+    # More digits is more precision to the preparser, so not the same plot.
+    assert plot_key("p", ["1.0*x"], ["x"]) != plot_key("p", ["1.00000000000000000000*x"], ["x"])
+
+
+@pytest.mark.parametrize(
+    ("expressions", "variables", "cacheable"),
+    [
+        (["sin(x)*cos(y)"], ["x", "y"], True),
+        # A predefined symbol that is not a plot variable.
+        (["t*x"], ["x"], True),
+        (["exp(-w^2)"], ["w"], True),
+        # `a` is declared on the fly, or could be anything the caller bound.
+        (["a*x"], ["x"], False),
+        (["my_function(x)"], ["x"], False),
+        # Binds a name of its own.
+        (["(lambda u: u^2)(x)"], ["x"], False),
+        (["sin(x", "cos(x)"], ["x"], False),
+    ],
+)
+def test_only_session_independent_plots_get_a_key(expressions, variables, cacheable):
+    assert (plot_key("plot_multi_expression", expressions, variables) is not None) is cacheable
+
+
+def test_the_memory_layer_evicts_the_least_recently_used():
+    cache = PlotCache(max_entries=2)
+    cache.put("a" * 64, _PNG)
+    cache.put("b" * 64, _PNG)
+    assert cache.get("a" * 64) == _PNG      # now the most recent
+    cache.put("c" * 64, _PNG)
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == _PNG
+    assert len(cache) == 2
+
+
+def test_the_disk_layer_outlives_the_process(tmp_path):
+    key = plot_key("plot_expression", ["sin(x)"], ["x"])
+    PlotCache(directory=str(tmp_path)).put(key, _PNG)
+    assert (tmp_path / key[:2] / f"{key}.png").read_bytes().startswith(b"\x89PNG")
+
+    fresh = PlotCache(directory=str(tmp_path))
+    assert fresh.get(key) == _PNG
+    assert len(fresh) == 1
+
+
+def test_the_disk_layer_names_files_by_format(tmp_path):
+    key = plot_key("plot_expression", ["sin(x)"], ["x"], format="svg")
+    PlotCache(directory=str(tmp_path)).put(key, _PNG, "svgz")
+    assert (tmp_path / key[:2] / f"{key}.svgz").exists()
+    assert PlotCache(directory=str(tmp_path)).get(key, "svgz") == _PNG
+
+
+def test_an_unwritable_disk_layer_still_caches_in_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = PlotCache(directory=str(blocker))
+    cache.put("ab" * 32, _PNG)
+    assert cache.get("ab" * 32) == _PNG
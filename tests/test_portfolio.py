@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from sagemath_mcp import monitoring
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.portfolio import Portfolio, PortfolioError, is_answer, problem_class
+
+
+def _runner(outcomes: dict, cancelled: list):
+    """A race entrant per algorithm: (delay, result), or (delay, exception)."""
+
+    async def run(worker, name):
+        delay, outcome = outcomes[name]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_the_first_answer_wins_and_the_rest_are_cancelled():
+    monitoring.reset_metrics()
+    portfolio = Portfolio(SageSettings())
+    cancelled = []
+    run = _runner(
+        {"maxima": (5, "never"), "sympy": (0, "1/3*x^3"), "giac": (5, "never")}, cancelled
+    )
+    race = await portfolio.race("integrate", "integrate::", ["maxima", "sympy", "giac"], run)
+    assert (race.algorithm, race.result) == ("sympy", "1/3*x^3")
+    assert race.raced == ["maxima", "sympy", "giac"]
+    assert sorted(cancelled) == ["giac", "maxima"]
+    assert portfolio.winner("integrate::") == "sympy"
+    assert monitoring.snapshot()["portfolio_wins"] == {"integrate": {"sympy": 1}}
+
+
+@pytest.mark.asyncio
+async def test_a_problem_handed_back_is_not_an_answer():
+    portfolio = Portfolio(SageSettings())
+    run = _runner(
+        {"maxima": (0, "integrate(e^(x^3), x)"), "sympy": (0.01, "-1/3*gamma(1/3, -x^3)")}, []
+    )
+    race = await portfolio.race("integrate", "integrate::", ["maxima", "sympy"], run)
+    assert race.algorithm == "sympy"
+
+
+@pytest.mark.asyncio
+async def test_without_an_answer_the_preferred_result_stands_and_nothing_is_recorded():
+    portfolio = Portfolio(SageSettings())
+    run = _runner(
+        {"maxima": (0.01, "limit(f(x), x, 0)"), "sympy": (0, RuntimeError("no"))}, []
+    )
+    race = await portfolio.race("limit", "limit:finite:f", ["maxima", "sympy"], run)
+    assert (race.algorithm, race.errors) == ("maxima", {"sympy": "no"})
+    assert portfolio.winner("limit:finite:f") is None
+
+
+@pytest.mark.asyncio
+async def test_a_race_nobody_finishes_reports_every_error():
+    portfolio = Portfolio(SageSettings())
+    run = _runner({"maxima": (0, TimeoutError()), "giac": (0, RuntimeError("giac missing"))}, [])
+    with pytest.raises(PortfolioError, match="maxima: TimeoutError; giac: giac missing"):
+        await portfolio.race("sum", "sum:finite:", ["maxima", "giac"], run)
+
+
+def test_races_are_only_run_with_configured_algorithms():
+    portfolio = Portfolio(SageSettings(portfolio_algorithms="sympy, fricas"))
+    assert portfolio.available("integrate") == ["sympy", "fricas"]
+    assert portfolio.available("sum") == ["sympy"]
+
+
+def test_problem_classes_are_coarse():
+    assert problem_class("integrate", "x*exp(-x)*sin(2*x)", "indefinite") == (
+        "integrate:indefinite:exp+sin"
+    )
+    assert problem_class("integrate", "x^2 + 1", "definite") == "integrate:definite:"
+    assert is_answer("sum", "1/6*pi^2")
+    assert not is_answer("sum", "sum(1/factorial(n^2), n, 0, +Infinity)")
+    assert is_answer("simplify", "integrate(f(x), x)")
+
+
+@pytest.mark.asyncio
+async def test_one_race_leaves_nothing_behind_for_the_next():
+    portfolio = Portfolio(SageSettings(force_python_worker=True, portfolio_algorithms="sympy"))
+
+    def runner(code):
+        async def run(worker, name):
+            return (await worker.evaluate(code, want_latex=False, capture_stdout=False)).result
+
+        return run
+
+    try:
+        # Two clients' races, at once, on the one shared worker.
+        leaked, probe = await asyncio.gather(
+            portfolio.race("simplify", "simplify::", ["sympy"], runner("leak = 7\nleak")),
+            portfolio.race("simplify", "simplify::", ["sympy"], runner("leak")),
+            return_exceptions=True,
+        )
+        assert leaked.result == "7"
+        assert isinstance(probe, PortfolioError)
+        assert "leak" in str(probe)
+    finally:
+        await portfolio.shutdown()
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from sagemath_mcp import _render_worker
+from sagemath_mcp.config import SageSettings
+from sagemath_mcp.render import RenderError, RenderPool
+
+
+@pytest.fixture
+def render_settings():
+    return SageSettings(force_python_worker=True, render_workers=2, eval_timeout=30.0)
+
+
+def _has_matplotlib() -> bool:
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        # Two expressions, the second split at a pole into two segments.
+        {"kind": "lines", "series": [
+            [[[0.0, 1.0, 2.0], [0.0, 1.0, None]]],
+            [[[-1.0, -0.1], [10.0, 100.0]], [[0.1, 1.0], [-100.0, -10.0]]],
+        ]},
+        {"kind": "surface", "n": 2, "x": [0.0, 1.0], "y": [0.0, 1.0],
+         "z": [[0.0, 1.0], [None, 2.0]], "xlabel": "x", "ylabel": "y"},
+    ],
+)
+def test_the_render_worker_draws_sampled_data(spec):
+    pytest.importorskip("matplotlib")
+    assert _render_worker._render(spec).startswith("iVBORw0KGgo")
+
+
+def test_the_render_worker_sizes_the_image_and_compresses_svg():
+    pytest.importorskip("matplotlib")
+    import base64
+    import gzip
+    import struct
+
+    spec = {"kind": "lines", "series": [[[[0.0, 1.0], [0.0, 1.0]]]]}
+    png = base64.b64decode(_render_worker._render({**spec, "width": 320, "height": 200, "dpi": 80}))
+    # The IHDR chunk holds the pixel size right after the signature.
+    assert struct.unpack(">II", png[16:24]) == (320, 200)
+    svgz = _render_worker._render({**spec, "format": "svg"})
+    assert svgz == _render_worker._render({**spec, "format": "svg"})
+    assert b"<svg" in gzip.decompress(base64.b64decode(svgz))
+
+
+def test_the_render_worker_refuses_an_unknown_kind():
+    with pytest.raises(ValueError, match="Unknown plot kind 'pie'"):
+        _render_worker._render({"kind": "pie"})
+    with pytest.raises(ValueError, match="Unknown image format 'jpeg'"):
+        _render_worker._render({"kind": "lines", "series": [], "format": "jpeg"})
+
+
+@pytest.mark.asyncio
+async def test_render_failures_leave_the_process_running(render_settings):
+    pool = RenderPool(render_settings)
+    try:
+        await pool.start()
+        pids = {process._process.pid for process in pool._processes}
+        assert len(pids) == 2
+
+        with pytest.raises(RenderError, match="Unknown plot kind"):
+            await pool.render({"kind": "pie"})
+        # The process reported the failure and carries on serving.
+        assert {process._process.pid for process in pool._processes} == pids
+        assert pool._idle.qsize() == 2
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_renders_run_in_parallel_on_the_pool(render_settings):
+    spec = {"kind": "lines", "series": [[[[0.0, 1.0], [0.0, 1.0]]]]}
+    pool = RenderPool(render_settings)
+    try:
+        if _has_matplotlib():
+            images = await asyncio.gather(*(pool.render(spec) for _ in range(4)))
+            assert all(image.startswith("iVBORw0KGgo") for image in images)
+        else:
+            with pytest.raises(RenderError, match="matplotlib"):
+                await pool.render(spec)
+        assert pool._idle.qsize() == 2
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_a_dead_render_process_is_replaced(render_settings):
+    pool = RenderPool(render_settings)
+    try:
+        await pool.start()
+        for process in pool._processes:
+            process._process.kill()
+            await process._process.wait()
+        with pytest.raises(RenderError, match="Unknown plot kind"):
+            await pool.render({"kind": "pie"})
+        assert any(process.is_alive() for process in pool._processes)
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_render_does_not_hand_its_response_to_the_next():
+    import os
+    import signal
+
+    pool = RenderPool(SageSettings(force_python_worker=True, render_workers=1, eval_timeout=30.0))
+    try:
+        await pool.start()
+        stopped = pool._processes[0]._process
+        # Held mid-render: the request is written, the response not yet read.
+        os.kill(stopped.pid, signal.SIGSTOP)
+        task = asyncio.create_task(pool.render({"kind": "pie"}))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert await asyncio.wait_for(stopped.wait(), 5) == -signal.SIGKILL
+        with pytest.raises(RenderError, match="Unknown plot kind"):
+            await pool.render({"kind": "pie"})
+    finally:
+        await pool.shutdown()
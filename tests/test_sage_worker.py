@@ -132,6 +132,26 @@ def test_latex_handles_none(monkeypatch):
     assert _sage_worker._latex(3) == "latex(3)"
 
 
+def test_reset_forgets_sage_assumptions(monkeypatch):
+    from sagemath_mcp import _sage_worker
+
+    forgotten = []
+    fake_assumptions = types.SimpleNamespace(forget=lambda: forgotten.append(True))
+    monkeypatch.setitem(sys.modules, "sage.symbolic.assumptions", fake_assumptions)
+    monkeypatch.setattr(_sage_worker, "PURE_PYTHON", False)
+    monkeypatch.setattr(_sage_worker, "STARTUP_CODE", "")
+    commands = [
+        json.dumps({"type": "reset", "id": "1"}),
+        json.dumps({"type": "shutdown", "id": "2"}),
+    ]
+    monkeypatch.setattr(_sage_worker.sys, "stdin", io.StringIO("\n".join(commands) + "\n"))
+    captured = io.StringIO()
+    monkeypatch.setattr(_sage_worker.sys, "stdout", captured)
+    assert _sage_worker._main() == 0
+    assert json.loads(captured.getvalue().splitlines()[0]) == {"ok": True, "id": "1"}
+    assert forgotten == [True]
+
+
 def test_build_namespace_without_preload(monkeypatch):
     from sagemath_mcp import _sage_worker
 
@@ -193,6 +213,28 @@ def test_execute_with_want_latex_false(monkeypatch):
     assert response["latex"] is None
 
 
+def test_execute_accounts_for_each_phase(monkeypatch):
+    from sagemath_mcp import _sage_worker
+
+    monkeypatch.setattr(_sage_worker, "PURE_PYTHON", True)
+    monkeypatch.setattr(_sage_worker, "_STARTUP_ERROR", None)
+    monkeypatch.setattr(_sage_worker, "_latex", lambda result: str(result))
+
+    ns: dict[str, object] = {"__builtins__": __builtins__}
+    response = _sage_worker._execute(
+        "total = 0\nfor n in range(200000):\n    total += n\ntotal", True, False, ns
+    )
+    usage = response["usage"]
+    assert list(usage["phases_ms"]) == [
+        "preparse", "validate", "compile", "execute", "format", "latex",
+    ]
+    assert all(ms >= 0 for ms in usage["phases_ms"].values())
+    assert usage["phases_ms"]["execute"] == max(usage["phases_ms"].values())
+    assert sum(usage["phases_ms"].values()) <= response["elapsed_ms"] + 0.01
+    assert usage["cpu_user_ms"] + usage["cpu_system_ms"] > 0
+    assert usage["peak_rss_delta_kb"] >= 0
+
+
 def test_execute_reports_startup_error(monkeypatch):
     """Test that _execute returns an error when startup code failed."""
     from sagemath_mcp import _sage_worker
@@ -1,10 +1,11 @@
 import asyncio
+import base64
 import contextlib
 import json
 import shutil
 
 import pytest
-from fastmcp.exceptions import ToolError
+from fastmcp.exceptions import ResourceError, ToolError
 
 from sagemath_mcp import app, codegen, runtime, server
 from sagemath_mcp.config import SageSettings
@@ -213,6 +214,13 @@ class StubSession:
     def __init__(self, result: str | None):
         self.result = result
         self.calls = []
+        self.resets = 0
+
+    def is_alive(self):
+        return True
+
+    async def reset(self):
+        self.resets += 1
 
     async def evaluate(
         self,
@@ -222,6 +230,8 @@ class StubSession:
         timeout_seconds: float | None = None,
         trusted: bool = False,
         on_stdout=None,
+        priority: int = 0,
+        fail_if_busy: bool = False,
     ):
         self.calls.append(
             {
@@ -243,6 +253,26 @@ class StubSession:
         )
 
 
+class StubRenderPool:
+    def __init__(self, image: str = "aWdub3JlZA=="):
+        self.image = image
+        self.specs = []
+
+    async def render(self, spec: dict, timeout_seconds: float | None = None) -> str:
+        self.specs.append(spec)
+        return self.image
+
+
+def _stub_render_pool(monkeypatch) -> StubRenderPool:
+    from sagemath_mcp.plot_cache import PlotCache
+
+    pool = StubRenderPool()
+    monkeypatch.setattr(runtime, "RENDER_POOL", pool)
+    # A fresh cache too, so one test's plot is not another's cache hit.
+    monkeypatch.setattr(runtime, "PLOT_CACHE", PlotCache())
+    return pool
+
+
 async def _stub_manager(monkeypatch, session: StubSession):
     manager = SageSessionManager(server.DEFAULT_SETTINGS)
 
@@ -484,6 +514,71 @@ async def test_integrate_expression_definite(monkeypatch):
     assert result == {"integral": "1/3", "definite": True}
 
 
+@pytest.mark.asyncio
+async def test_integrate_expression_with_a_named_algorithm(monkeypatch):
+    session = StubSession("'-1/3*gamma(1/3, -x^3)'")
+    await _stub_manager(monkeypatch, session)
+    result = await server.integrate_expression("exp(x^3)", algorithm="sympy", ctx=FakeContext())
+    assert result["algorithm"] == "sympy"
+    assert "str(integrate(_expr, _var, algorithm='sympy'))" in session.calls[0]["code"]
+
+
+def _stub_portfolio(monkeypatch, results: dict[str, str]):
+    """A portfolio whose worker per algorithm is a StubSession returning *results*."""
+    from sagemath_mcp.config import SageSettings
+    from sagemath_mcp.portfolio import Portfolio
+
+    portfolio = Portfolio(SageSettings())
+    workers = {name: StubSession(repr(result)) for name, result in results.items()}
+    monkeypatch.setattr(portfolio, "_worker", workers.__getitem__)
+    monkeypatch.setattr(runtime, "PORTFOLIO", portfolio)
+    return portfolio, workers
+
+
+@pytest.mark.asyncio
+async def test_integrate_expression_races_a_portfolio(monkeypatch):
+    session = StubSession("'unused'")
+    await _stub_manager(monkeypatch, session)
+    portfolio, workers = _stub_portfolio(monkeypatch, {
+        "maxima": "integrate(e^(x^3), x)", "sympy": "-1/3*gamma(1/3, -x^3)",
+        "giac": "-1/3*gamma(1/3, -x^3)", "fricas": "integrate(e^(x^3), x)",
+    })
+    ctx = FakeContext()
+    result = await server.integrate_expression("exp(x^3)", algorithm="portfolio", ctx=ctx)
+    assert result["integral"] == "-1/3*gamma(1/3, -x^3)"
+    assert result["algorithm"] == "sympy"
+    assert result["raced"] == ["maxima", "sympy", "giac", "fricas"]
+    assert not session.calls
+    assert "algorithm='fricas'" in workers["fricas"].calls[0]["code"]
+    assert all(worker.resets == 1 for worker in workers.values())
+    assert portfolio.winner("integrate:indefinite:exp") == "sympy"
+
+    # Now "auto" goes straight to the recorded winner.
+    routed = await server.integrate_expression("exp(x^3)", algorithm="auto", ctx=ctx)
+    assert (routed["algorithm"], routed["routed"]) == ("sympy", True)
+    assert len(workers["maxima"].calls) == 1
+    assert len(workers["sympy"].calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_auto_races_the_others_when_the_favourite_hands_back(monkeypatch):
+    await _stub_manager(monkeypatch, StubSession("'unused'"))
+    portfolio, workers = _stub_portfolio(monkeypatch, {
+        "maxima": "limit(f(x), x, 0)", "sympy": "1", "giac": "1", "fricas": "1",
+    })
+    portfolio.record("limit:finite:f", "maxima")
+    result = await server.limit_expression("f(x)", algorithm="auto", ctx=FakeContext())
+    assert result["algorithm"] == "sympy"
+    assert result["raced"] == ["sympy", "giac", "fricas"]
+    assert len(workers["maxima"].calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ToolError, match="Unknown algorithm 'fricas' for sum"):
+        await server.symbolic_sum("1/n^2", algorithm="fricas", ctx=FakeContext())
+
+
 @pytest.mark.asyncio
 async def test_integrate_expression_mixed_bounds():
     ctx = FakeContext()
@@ -655,6 +750,174 @@ async def test_matrix_operation_invalid():
         await server.matrix_operation([[1]], "nonsense", ctx=ctx)
 
 
+@pytest.mark.asyncio
+async def test_matrix_tools_build_over_the_inferred_ring(monkeypatch):
+    """An integer matrix used to go through SR; now it is built over ZZ."""
+    session = StubSession("-2")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+
+    await server.matrix_operation([[1, 2], [3, 4]], "determinant", ctx=ctx)
+    await server.matrix_operation([[1, "1/2"], [3, 4]], "determinant", ctx=ctx)
+    await server.matrix_operation([[1.5, 2], [3, 4]], "determinant", ctx=ctx)
+    await server.matrix_operation([[1, 2], [3, 4]], "determinant", numeric=True, ctx=ctx)
+    await server.matrix_multiply([[1, 2]], [[3], [4]], ring="QQbar", ctx=ctx)
+
+    codes = [call["code"] for call in session.calls]
+    assert "M = matrix(ZZ, [[1, 2], [3, 4]])" in codes[0]
+    assert "M = matrix(QQ, [[1, QQ((1, 2))], [3, 4]])" in codes[1]
+    assert "M = matrix(SR, [[1.5, 2], [3, 4]])" in codes[2]
+    assert "M = matrix(RDF, [[1, 2], [3, 4]])" in codes[3]
+    assert "A = matrix(QQbar, [[1, 2]])" in codes[4]
+    assert "B = matrix(QQbar, [[3], [4]])" in codes[4]
+
+
+@pytest.mark.asyncio
+async def test_matrix_operation_rejects_an_unknown_ring():
+    ctx = FakeContext()
+    with pytest.raises(ToolError, match="Unknown ring"):
+        await server.matrix_operation([[1]], "rank", ring="GF(2)", ctx=ctx)
+
+
+@pytest.mark.asyncio
+async def test_sparse_matrix_operation_builds_only_the_non_zeros(monkeypatch):
+    session = StubSession("2")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+
+    await server.sparse_matrix_operation(
+        [1000, 1000], "rank", entries=[[0, 0, 2], [999, 3, "1/2"], [5, 5, 0]], ctx=ctx
+    )
+    await server.sparse_matrix_operation(
+        [2, 3], "rank", indptr=[0, 1, 2], indices=[2, 0], data=[1.5, 4], ctx=ctx
+    )
+
+    first, second = (call["code"] for call in session.calls)
+    # The explicit zero is dropped, the rational keeps the matrix on QQ, and
+    # nothing in the code grows with the 10^6 positions that are empty.
+    assert "M = matrix(QQ, 1000, 1000, {(0, 0): 2, (999, 3): QQ((1, 2))}, sparse=True)" in first
+    assert "M = matrix(SR, 2, 3, {(0, 2): 1.5, (1, 0): 4}, sparse=True)" in second
+    assert len(first) < 1000
+
+
+@pytest.mark.asyncio
+async def test_sparse_matrix_operation_answers_in_the_callers_layout(monkeypatch):
+    session = StubSession("[[0, 1, 1.0], [2, 0, 3.0]]")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+
+    coordinate = await server.sparse_matrix_operation(
+        [2, 3], "transpose", entries=[[1, 0, 1], [0, 2, 3]], ctx=ctx
+    )
+    assert coordinate["result"] == {
+        "shape": [3, 2], "entries": [[0, 1, 1.0], [2, 0, 3.0]],
+    }
+    compressed = await server.sparse_matrix_operation(
+        [2, 3], "transpose", indptr=[0, 1, 2], indices=[2, 0], data=[3, 1], ctx=ctx
+    )
+    assert compressed["result"] == {
+        "shape": [3, 2], "indptr": [0, 1, 1, 2], "indices": [1, 0], "data": [1.0, 3.0],
+    }
+
+    session.result = "(1, [[0, 0, -1.0], [0, 1, 1.0]])"
+    kernel = await server.sparse_matrix_operation(
+        [1, 2], "kernel", entries=[[0, 0, 1], [0, 1, 1]], ctx=ctx
+    )
+    assert kernel["result"] == {"shape": [1, 2], "entries": [[0, 0, -1.0], [0, 1, 1.0]]}
+    assert "right_kernel_matrix()" in session.calls[-1]["code"]
+
+
+@pytest.mark.asyncio
+async def test_sparse_matrix_operation_numeric_paths_go_through_scipy(monkeypatch):
+    """Eigenvalues and a double-precision solve must not densify the matrix."""
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    session = StubSession("[2.0]")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+    laplacian = [[0, 0, 1], [0, 1, -1], [1, 0, -1], [1, 1, 1]]
+
+    await server.sparse_matrix_operation([2, 2], "eigenvalues", entries=laplacian, count=1, ctx=ctx)
+    await server.sparse_matrix_operation(
+        [2, 2], "solve", entries=laplacian, rhs=[1, 2], numeric=True, ctx=ctx
+    )
+    await server.sparse_matrix_operation([2, 2], "solve", entries=laplacian, rhs=[1, 2], ctx=ctx)
+
+    eigen, numeric_solve, exact_solve = (call["code"] for call in session.calls)
+    assert "scipy.sparse.linalg.eigsh" in eigen
+    assert "scipy.sparse.linalg.spsolve" in numeric_solve
+    assert "M.solve_right(vector(ZZ, [[1, 2]][0]))" in exact_solve
+    for code in (eigen, numeric_solve, exact_solve):
+        validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"shape": [2, 3], "operation": "determinant", "entries": []}, "needs a square matrix"),
+        ({"shape": [2, 2], "operation": "solve", "entries": []}, "needs 'rhs'"),
+        ({"shape": [2, 2], "operation": "trace", "entries": []}, "Unknown operation"),
+        ({"shape": [2, 2], "operation": "rank"}, "needs its non-zeros"),
+    ],
+)
+async def test_sparse_matrix_operation_invalid(kwargs, message):
+    with pytest.raises(ToolError, match=message):
+        await server.sparse_matrix_operation(**kwargs, ctx=FakeContext())
+
+
+@pytest.mark.asyncio
+async def test_linear_solve_factors_once_for_the_whole_batch(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    session = StubSession("[[1.0, 0.0], None]")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+
+    result = await server.linear_solve(
+        [[1, 2], ["1/2", 0]], matrix=[[1, 0], [0, 1]], factorization="stiffness", ctx=ctx
+    )
+    assert result == {
+        "solutions": [[1.0, 0.0], None], "factorization": "stiffness", "reused": False,
+    }
+    await server.linear_solve([[3, 4]], matrix=[[2, 1], [1, 2]], numeric=True, ctx=ctx)
+    again = await server.linear_solve([[5, 6]], factorization="stiffness", ctx=ctx)
+    assert again["reused"] is True
+
+    exact, numeric, reuse = (call["code"] for call in session.calls)
+    # One row reduction of [A | I], stored under the name, then every b at once.
+    assert exact.count(".rref()") == 1
+    assert "A = matrix(ZZ, [[1, 0], [0, 1]])" in exact
+    assert '_linear_solve_factors["stiffness"] = _f' in exact
+    assert "_solve_batch(_f, [[1, 2], [QQ((1, 2)), 0]])" in exact
+    assert "scipy.linalg.lu_factor" in numeric
+    assert "_linear_solve_factors" in numeric and "] = _f" not in numeric
+    assert "A = matrix" not in reuse
+    assert '_f = _linear_solve_factors["stiffness"]' in reuse
+    for code in (exact, numeric, reuse):
+        validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"rhs": [[1]]}, "Pass 'matrix'"),
+        ({"rhs": [], "matrix": [[1]]}, "at least one"),
+        ({"rhs": [[1]], "factorization": "a'; import os"}, "plain identifier"),
+        ({"rhs": [[1]], "factorization": "k", "numeric": True}, "apply when factoring"),
+        ({"rhs": [[1, 2]], "matrix": [[1, 2]], "numeric": True}, "square matrix"),
+    ],
+)
+async def test_linear_solve_invalid(kwargs, message):
+    with pytest.raises(ToolError, match=message):
+        await server.linear_solve(**kwargs, ctx=FakeContext())
+
+
 @pytest.mark.asyncio
 async def test_solve_ode(monkeypatch):
     session = StubSession("'_C*e^(-x)'")
@@ -737,12 +1000,225 @@ async def test_number_theory_invalid_op():
 
 @pytest.mark.asyncio
 async def test_plot_expression(monkeypatch):
-    session = StubSession("'aWdub3JlZA=='")
+    session = StubSession("{'kind': 'lines', 'series': [[[[0.0, 1.0], [0.0, None]]]]}")
     await _stub_manager(monkeypatch, session)
+    pool = _stub_render_pool(monkeypatch)
     ctx = FakeContext()
-    result = await server.plot_expression("sin(x)", ctx=ctx)
+    result = await server.plot_expression("sin(x)", inline=True, ctx=ctx)
     assert result["format"] == "png"
     assert result["image_base64"] == "aWdub3JlZA=="
+    # The session only samples; the render pool draws what it sampled.
+    assert pool.specs == [{
+        "kind": "lines", "series": [[[[0.0, 1.0], [0.0, None]]]],
+        "format": "png", "width": 640, "height": 480, "dpi": 100,
+    }]
+    assert "savefig" not in session.calls[0]["code"]
+
+
+@pytest.mark.asyncio
+async def test_plot_expression_renders_svg_at_the_requested_size(monkeypatch):
+    session = StubSession("{'kind': 'lines', 'series': []}")
+    await _stub_manager(monkeypatch, session)
+    pool = _stub_render_pool(monkeypatch)
+    result = await server.plot_expression(
+        "sin(x)", output_format="svg", width=1200, height=300, dpi=150, inline=True,
+        ctx=FakeContext(),
+    )
+    assert (result["format"], result["encoding"]) == ("svg", "gzip")
+    assert pool.specs[0] | {"series": []} == {
+        "kind": "lines", "series": [], "format": "svg", "width": 1200, "height": 300, "dpi": 150,
+    }
+    stored = await server.plot_expression(
+        "sin(x)", output_format="svg", width=1200, height=300, dpi=150, ctx=FakeContext()
+    )
+    assert (stored["media_type"], stored["encoding"]) == ("image/svg+xml", "gzip")
+    assert len(pool.specs) == 1
+    # Another size is another picture, not a cache hit.
+    await server.plot_expression("sin(x)", output_format="svg", ctx=FakeContext())
+    assert len(pool.specs) == 2
+
+
+@pytest.mark.asyncio
+async def test_plot_points_returns_the_sampled_curve_without_rendering(monkeypatch):
+    session = StubSession(
+        "{'kind': 'lines', 'series': ["
+        "[[[0.0, 0.123456789012, 1.0], [0.0, 0.5, None]], [[2.0, 3.0], [1.0, 2.0]]],"
+        "[[[0.0], [1.0]]]]}"
+    )
+    await _stub_manager(monkeypatch, session)
+    pool = _stub_render_pool(monkeypatch)
+    result = await server.plot_multi_expression(
+        ["sin(x)", "cos(x)"], output_format="points", plot_points=50, ctx=FakeContext()
+    )
+    assert pool.specs == []
+    assert result["format"] == "points"
+    assert result["points"] == 6
+    assert result["series"][0][0] == [[0.0, 0.1234568, 1.0], [0.0, 0.5, None]]
+    assert "plot_points=50" in session.calls[0]["code"]
+
+
+@pytest.mark.asyncio
+async def test_plot_output_over_the_byte_budget_is_refused(monkeypatch):
+    session = StubSession("{'kind': 'lines', 'series': [[[[0.0, 1.0], [0.0, 1.0]]]]}")
+    await _stub_manager(monkeypatch, session)
+    _stub_render_pool(monkeypatch)
+    monkeypatch.setattr(runtime.SETTINGS, "plot_max_bytes", 4)
+    with pytest.raises(ToolError, match="over the 4-byte plot budget; lower width"):
+        await server.plot_expression("sin(x)", ctx=FakeContext())
+    with pytest.raises(ToolError, match="lower plot_points"):
+        await server.plot_expression("sin(x)", output_format="points", ctx=FakeContext())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"output_format": "jpeg"}, "Unknown output_format 'jpeg'"),
+        ({"width": 10}, "'width' must be between 16 and 4096"),
+        ({"height": 5000}, "'height' must be between 16 and 4096"),
+        ({"dpi": 1200}, "'dpi' must be between 25 and 600"),
+        ({"plot_points": 2}, "'plot_points' must be between 5 and 10000"),
+    ],
+)
+async def test_plot_output_options_are_validated(kwargs, message):
+    with pytest.raises(ToolError, match=message):
+        await server.plot_expression("sin(x)", ctx=FakeContext(), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_repeated_plots_are_served_from_the_plot_cache(monkeypatch):
+    from sagemath_mcp import monitoring
+
+    session = StubSession("{'kind': 'lines', 'series': []}")
+    await _stub_manager(monkeypatch, session)
+    pool = _stub_render_pool(monkeypatch)
+    monitoring.reset_metrics()
+    ctx = FakeContext()
+
+    first = await server.plot_expression("sin(x)*exp(-x/5)", inline=True, ctx=ctx)
+    # Same tokens, different spacing, and another client: still the same plot.
+    again = await server.plot_expression(
+        " sin( x ) * exp(-x/5)", inline=True, ctx=FakeContext("other")
+    )
+    assert again == first
+    assert len(session.calls) == 1
+    assert len(pool.specs) == 1
+
+    # A different range is a different picture.
+    await server.plot_expression("sin(x)*exp(-x/5)", range_min=0.0, ctx=ctx)
+    assert len(session.calls) == 2
+    snapshot = monitoring.snapshot()
+    assert (snapshot["plot_cache_hits"], snapshot["plot_cache_misses"]) == (1, 2)
+    assert snapshot["plot_cache_hit_ratio"] == pytest.approx(1 / 3)
+
+    # A name that is neither a plot variable nor a Sage name is never cached,
+    # and is not counted as a lookup either.
+    await server.plot_expression("a*sin(x)", ctx=ctx)
+    await server.plot_expression("a*sin(x)", ctx=ctx)
+    assert len(session.calls) == 4
+    assert monitoring.snapshot()["plot_cache_misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_an_svg_plot_reads_back_through_the_resource_as_svg(monkeypatch):
+    import gzip
+
+    from sagemath_mcp.artifacts import ArtifactStore
+
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+    await _stub_manager(monkeypatch, StubSession("{'kind': 'lines', 'series': []}"))
+    pool = _stub_render_pool(monkeypatch)
+    pool.image = base64.b64encode(gzip.compress(svg, mtime=0)).decode("ascii")
+    monkeypatch.setattr(runtime, "ARTIFACTS", ArtifactStore())
+    result = await server.plot_expression("sin(x)", output_format="svg", ctx=FakeContext("A"))
+    assert result["encoding"] == "gzip"
+    artifact_id = result["artifact"].removeprefix("resource://sagemath/artifacts/")
+    [content] = (await server.artifact_resource(artifact_id, FakeContext("A"))).contents
+    assert (content.content, content.mime_type) == (svg, "image/svg+xml")
+
+
+@pytest.mark.asyncio
+async def test_plots_are_stored_as_artifacts_by_default(monkeypatch):
+    from sagemath_mcp.artifacts import ArtifactStore
+
+    session = StubSession("{'kind': 'lines', 'series': []}")
+    await _stub_manager(monkeypatch, session)
+    _stub_render_pool(monkeypatch)
+    monkeypatch.setattr(runtime, "ARTIFACTS", ArtifactStore())
+    result = await server.plot_expression("sin(x)", ctx=FakeContext("A"))
+    assert "image_base64" not in result
+    assert result["format"] == "png"
+    assert result["media_type"] == "image/png"
+    artifact_id = result["artifact"].removeprefix("resource://sagemath/artifacts/")
+    assert result["url"] == f"/artifacts/{artifact_id}"
+
+    contents = (await server.artifact_resource(artifact_id, FakeContext("A"))).contents
+    assert contents[0].content == base64.b64decode("aWdub3JlZA==")
+    assert contents[0].mime_type == "image/png"
+    # Another client cannot read it, even knowing the id.
+    with pytest.raises(ResourceError, match="No artifact"):
+        await server.artifact_resource(artifact_id, FakeContext("B"))
+    with pytest.raises(ResourceError, match="No artifact"):
+        await server.artifact_resource(artifact_id, None)
+
+    # A cache hit is stored afresh, for the client that asked this time.
+    again = await server.plot_expression("sin(x)", ctx=FakeContext("B"))
+    assert again["artifact"] != result["artifact"]
+    assert len(session.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_the_artifact_route_serves_bytes_with_an_etag(monkeypatch):
+    from types import SimpleNamespace
+
+    from sagemath_mcp.artifacts import ArtifactStore
+
+    store = ArtifactStore()
+    monkeypatch.setattr(runtime, "ARTIFACTS", store)
+    artifact = store.put("A", b"png bytes", "image/png")
+
+    def request(artifact_id, **headers):
+        return SimpleNamespace(path_params={"artifact_id": artifact_id}, headers=headers)
+
+    response = await server.artifact_route(request(artifact.artifact_id))
+    assert response.status_code == 200
+    assert response.body == b"png bytes"
+    assert response.media_type == "image/png"
+    etag = response.headers["etag"]
+    assert etag == f'"{artifact.etag}"'
+    assert response.headers["cache-control"].startswith("private, max-age=")
+
+    revalidated = await server.artifact_route(
+        request(artifact.artifact_id, **{"if-none-match": f'"stale", W/{etag}'})
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+    assert (await server.artifact_route(request("0" * 32))).status_code == 404
+
+
+def test_register_artifact_route_is_idempotent():
+    from sagemath_mcp.app import mcp
+
+    server._register_artifact_route()
+    server._register_artifact_route()
+    paths = [getattr(r, "path", None) for r in mcp.http_app().routes]
+    assert paths.count("/artifacts/{artifact_id}") == 1
+
+
+@pytest.mark.asyncio
+async def test_plot_render_failures_are_tool_errors(monkeypatch):
+    from sagemath_mcp.render import RenderError
+
+    session = StubSession("{'kind': 'lines', 'series': []}")
+    await _stub_manager(monkeypatch, session)
+    pool = _stub_render_pool(monkeypatch)
+
+    async def failing(spec, timeout_seconds=None):
+        raise RenderError("Rendering failed: boom")
+
+    monkeypatch.setattr(pool, "render", failing)
+    with pytest.raises(ToolError, match="Rendering failed: boom"):
+        await server.plot_expression("sin(x)", ctx=FakeContext())
 
 
 @pytest.mark.asyncio
@@ -908,13 +1384,13 @@ async def test_cancel_sage_session(monkeypatch):
 def _two_client_snapshot():
     return [
         {"session_id": "A", "live": True, "started_at": 1000.0,
-         "last_used_at": 1001.0, "idle_seconds": 5.0},
+         "last_used_at": 1001.0, "idle_seconds": 5.0, "queued": 0},
         {"session_id": "A::curves", "live": True, "started_at": 1000.0,
-         "last_used_at": 1001.0, "idle_seconds": 5.0},
+         "last_used_at": 1001.0, "idle_seconds": 5.0, "queued": 0},
         {"session_id": "B", "live": True, "started_at": 1000.0,
-         "last_used_at": 1001.0, "idle_seconds": 5.0},
+         "last_used_at": 1001.0, "idle_seconds": 5.0, "queued": 0},
         {"session_id": "B::scratch", "live": False, "started_at": 1000.0,
-         "last_used_at": 1001.0, "idle_seconds": 10.0},
+         "last_used_at": 1001.0, "idle_seconds": 10.0, "queued": 0},
     ]
 
 
@@ -1078,6 +1554,18 @@ async def test_symbolic_sum(monkeypatch):
     assert result["result"] is not None
 
 
+@pytest.mark.asyncio
+async def test_symbolic_sum_and_simplify_pass_the_algorithm(monkeypatch):
+    session = StubSession("'pi^2/6'")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+    await server.symbolic_sum("1/n^2", algorithm="giac", ctx=ctx)
+    assert "str(sum(_expr, _var, _lo, _hi, algorithm='giac'))" in session.calls[0]["code"]
+    simplified = await server.simplify_expression("sin(x)^2 + cos(x)^2", algorithm="sympy", ctx=ctx)
+    assert simplified["algorithm"] == "sympy"
+    assert "str(simplify(_expr, algorithm='sympy'))" in session.calls[1]["code"]
+
+
 @pytest.mark.asyncio
 async def test_symbolic_product(monkeypatch):
     session = StubSession("'120'")
@@ -1206,16 +1694,69 @@ async def test_combinatorics_no_context():
 
 @pytest.mark.asyncio
 async def test_plot3d_expression(monkeypatch):
-    session = StubSession("'iVBORw0KGgo...'")
+    session = StubSession("{'kind': 'surface', 'n': 2, 'z': [[0.0, 1.0], [1.0, None]]}")
     await _stub_manager(monkeypatch, session)
+    _stub_render_pool(monkeypatch)
     ctx = FakeContext()
     result = await server.plot3d_expression(
-        expression="x^2 + y^2", ctx=ctx,
+        expression="x^2 + y^2", inline=True, ctx=ctx,
     )
     assert result["format"] == "png"
     assert "image_base64" in result
 
 
+@pytest.mark.asyncio
+async def test_plot3d_expression_samples_the_grid_in_one_pass(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    session = StubSession("{'kind': 'surface'}")
+    await _stub_manager(monkeypatch, session)
+    _stub_render_pool(monkeypatch)
+    ctx = FakeContext()
+    await server.plot3d_expression("sin(x)*cos(y)", grid=200, ctx=ctx)
+    code = session.calls[0]["code"]
+    assert "_n = 200" in code
+    assert "numpy.meshgrid(" in code
+    assert "'kind': 'surface'" in code
+    validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+    for grid in (1, 10_000):
+        with pytest.raises(ToolError, match="'grid' must be between 2 and"):
+            await server.plot3d_expression("x*y", grid=grid, ctx=ctx)
+    assert len(session.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_plot3d_mesh_mode_returns_typed_arrays_without_rendering(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    mesh = {"format": "mesh", "shape": [2, 2], "dtype": "float32", "z": "AAAAAA==",
+            "nan_mask": "gA==", "z_range": [0.0, 1.0]}
+    session = StubSession(repr(mesh))
+    await _stub_manager(monkeypatch, session)
+    pool = _stub_render_pool(monkeypatch)
+    result = await server.plot3d_expression(
+        "sin(x)*cos(y)", grid=64, output_format="mesh", ctx=FakeContext()
+    )
+    assert result == mesh
+    assert pool.specs == []
+    code = session.calls[0]["code"]
+    assert "_Z.astype('<f4')" in code
+    assert "numpy.packbits(~_finite)" in code
+    assert "'kind': 'surface'" not in code
+    validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+    with pytest.raises(ToolError, match="Unknown output_format 'obj'"):
+        await server.plot3d_expression("x*y", output_format="obj", ctx=FakeContext())
+    monkeypatch.setattr(runtime.SETTINGS, "plot_max_bytes", 10)
+    with pytest.raises(ToolError, match="lower grid"):
+        await server.plot3d_expression("x*y", output_format="mesh", ctx=FakeContext())
+
+
 @pytest.mark.asyncio
 async def test_plot3d_expression_no_context():
     with pytest.raises(ToolError, match="MCP context"):
@@ -1332,19 +1873,200 @@ async def test_find_root(monkeypatch):
     assert "root" in result
 
 
+@pytest.mark.asyncio
+async def test_find_root_all_mode_samples_then_refines(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    roots = {"roots": [{"root": 0.0, "multiplicity": 1, "sign_change": True}], "count": 1}
+    session = StubSession(repr(roots))
+    await _stub_manager(monkeypatch, session)
+    result = await server.find_root("sin(x)", mode="all", samples=5000, ctx=FakeContext())
+    assert result == roots
+    code = session.calls[0]["code"]
+    assert "_samples = 5000" in code
+    assert "brentq(" in code and "minimize_scalar(" in code
+    assert "fast_callable(_expr, vars=[_var], domain=RDF)" in code
+    validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+
+@pytest.mark.asyncio
+async def test_find_root_takes_a_batch_of_expressions_and_intervals(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    session = StubSession("[{'expression': 'x', 'interval': [0.0, 1.0], 'root': 0.0}]")
+    await _stub_manager(monkeypatch, session)
+    result = await server.find_root(
+        ["x - cos(x)", "x^2 - 2"], intervals=[[0, 1], [1, 2]], ctx=FakeContext()
+    )
+    assert result["results"][0]["root"] == 0.0
+    code = session.calls[0]["code"]
+    # Four problems, each failing on its own rather than failing the call.
+    assert '[["x - cos(x)", 0.0, 1.0], ["x - cos(x)", 1.0, 2.0], ["x^2 - 2", 0.0, 1.0]' in code
+    assert "except Exception as _exc:" in code
+    validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"mode": "some"}, "Unknown mode 'some'"),
+        ({"samples": 5}, "'samples' must be between 10 and 100000"),
+        ({"intervals": [[0, 1, 2]]}, "Each interval is \\[lower, upper\\]"),
+        ({"intervals": [[0, float("inf")]]}, "finite bounds"),
+        ({"intervals": []}, "at least one expression and one interval"),
+        ({"expression": ["x"] * 11, "intervals": [[i, i + 1] for i in range(10)]},
+         "110 problems; at most 100"),
+    ],
+)
+async def test_find_root_rejects_bad_requests(kwargs, message):
+    kwargs = {"expression": "x - 1", **kwargs}
+    with pytest.raises(ToolError, match=message):
+        await server.find_root(ctx=FakeContext(), **kwargs)
+
+
 @pytest.mark.asyncio
 async def test_find_root_no_context():
     with pytest.raises(ToolError, match="MCP context"):
         await server.find_root("x^2 - 2", ctx=None)
 
 
+@pytest.mark.asyncio
+async def test_evaluate_on_grid_compiles_once_and_stores_the_array(monkeypatch):
+    import ast
+
+    from sagemath_mcp.artifacts import ArtifactStore
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    values = base64.b64encode(bytes(8 * 6)).decode("ascii")
+    session = StubSession(repr({"values": values, "nan_count": 1}))
+    await _stub_manager(monkeypatch, session)
+    monkeypatch.setattr(runtime, "ARTIFACTS", ArtifactStore())
+    ctx = FakeContext()
+    result = await server.evaluate_on_grid(
+        "exp(-x^2)*cos(3*y)", ["x", "y"], grid=[[0, 1, 2], [-1, 1, 3]], ctx=ctx
+    )
+    assert (result["shape"], result["count"], result["nan_count"]) == ([2, 3], 6, 1)
+    assert (result["dtype"], result["media_type"]) == ("float64", "application/octet-stream")
+    assert "values" not in result
+    assert runtime.ARTIFACTS.get(result["artifact"].rsplit("/", 1)[1]).data == bytes(48)
+    code = session.calls[0]["code"]
+    assert code.count("sage_eval(") == 1
+    assert "fast_callable(_expr, vars=_vars, domain=RDF)" in code
+    assert "indexing='ij'" in code
+    validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+    inline = await server.evaluate_on_grid(
+        "x^2", ["x"], points=[[1.0], [2.0]], dtype="float32", inline=True, ctx=ctx
+    )
+    assert inline["values"] == values
+    assert inline["shape"] == [2]
+    assert "astype('<f4')" in session.calls[1]["code"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"variables": []}, "one to three variables"),
+        ({"variables": ["x", "y", "z", "t"]}, "one to three variables"),
+        ({}, "exactly one of 'grid' and 'points'"),
+        ({"grid": [[0, 1, 2]], "points": [[0]]}, "exactly one of 'grid' and 'points'"),
+        ({"grid": [[0, 1, 2], [0, 1, 2]]}, "one \\[start, stop, count\\] per variable"),
+        ({"grid": [[0, 1, 2.5]]}, "positive whole count"),
+        ({"grid": [[0, float("inf"), 2]]}, "finite bounds"),
+        ({"grid": [[0, 1, 2_000_000]]}, "over the 5242880-byte limit"),
+        ({"points": [[0, 1]]}, "Every point needs 1 coordinates"),
+        ({"points": [[float("nan")]]}, "finite coordinates"),
+        ({"grid": [[0, 1, 2]], "dtype": "int8"}, "Unknown dtype 'int8'"),
+    ],
+)
+async def test_evaluate_on_grid_rejects_bad_requests(kwargs, message):
+    kwargs = {"variables": ["x"], **kwargs}
+    with pytest.raises(ToolError, match=message):
+        await server.evaluate_on_grid("sin(x)", ctx=FakeContext(), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_solve_ode_numeric_compiles_the_system_and_stores_the_trajectory(monkeypatch):
+    import ast
+
+    from sagemath_mcp.artifacts import ArtifactStore
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    values = base64.b64encode(bytes(8 * 3 * 3)).decode("ascii")
+    session = StubSession(repr({
+        "values": values, "rows": 3, "success": True,
+        "message": "Integration successful.", "nfev": 40, "njev": 2,
+    }))
+    await _stub_manager(monkeypatch, session)
+    monkeypatch.setattr(runtime, "ARTIFACTS", ArtifactStore())
+    ctx = FakeContext()
+    result = await server.solve_ode_numeric(
+        ["v", "-sin(y)"], ["y", "v"], [1, 0], [0, 10], points=3, ctx=ctx
+    )
+    assert result["columns"] == ["t", "y", "v"]
+    assert (result["shape"], result["method"], result["success"]) == ([3, 3], "LSODA", True)
+    assert (result["nfev"], result["njev"]) == (40, 2)
+    assert "values" not in result
+    assert runtime.ARTIFACTS.get(result["artifact"].rsplit("/", 1)[1]).data == bytes(72)
+    code = session.calls[0]["code"]
+    assert "from scipy.integrate import solve_ivp" in code
+    assert "fast_callable(_e, vars=[_t] + _ys, domain=RDF)" in code
+    assert "numpy.linspace(0.0, 10.0, 3)" in code
+    validate_module(ast.parse(code), code=code, policy=trusted_policy())
+
+    inline = await server.solve_ode_numeric(
+        ["-y"], ["y"], [1], [2, 0], variable="s", times=[2, 1, 0], method="RK45",
+        dtype="float32", inline=True, ctx=ctx,
+    )
+    assert inline["values"] == values
+    assert inline["columns"] == ["s", "y"]
+    code = session.calls[1]["code"]
+    assert "numpy.array([2.0, 1.0, 0.0])" in code
+    assert "method='RK45'" in code
+    assert "astype('<f4')" in code
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"functions": ["y", "v"]}, "2 functions need 2 right-hand sides"),
+        ({"functions": []}, "between 1 and 50"),
+        ({"functions": ["t"]}, "both the variable and a function"),
+        ({"functions": ["y z"]}, "functions"),
+        ({"method": "Euler"}, "Unknown method 'Euler'"),
+        ({"t_span": [1, 1]}, "finite, distinct ends"),
+        ({"t_span": [0, float("inf")]}, "finite, distinct ends"),
+        ({"initial": [float("nan")]}, "finite, distinct ends"),
+        ({"rtol": 0}, "must be positive"),
+        ({"points": 1}, "'points' must be between 2"),
+        ({"times": [0.5, 0.25]}, "ordered from start to end"),
+        ({"times": [2.0]}, "inside t_span"),
+        ({"points": 100_000, "functions": list("abcdefg"), "rhs": ["0"] * 7,
+          "initial": [0.0] * 7}, "over the 5242880-byte limit"),
+        ({"dtype": "int8"}, "Unknown dtype 'int8'"),
+    ],
+)
+async def test_solve_ode_numeric_rejects_bad_requests(kwargs, message):
+    kwargs = {"rhs": ["-y"], "functions": ["y"], "initial": [1.0], "t_span": [0, 1], **kwargs}
+    with pytest.raises(ToolError, match=message):
+        await server.solve_ode_numeric(ctx=FakeContext(), **kwargs)
+
+
 @pytest.mark.asyncio
 async def test_plot_multi_expression(monkeypatch):
-    session = StubSession("'iVBORw0KGgo...'")
+    session = StubSession("{'kind': 'lines', 'series': [[], []]}")
     await _stub_manager(monkeypatch, session)
+    _stub_render_pool(monkeypatch)
     ctx = FakeContext()
     result = await server.plot_multi_expression(
-        expressions=["sin(x)", "cos(x)"], ctx=ctx,
+        expressions=["sin(x)", "cos(x)"], inline=True, ctx=ctx,
     )
     assert result["format"] == "png"
     assert "image_base64" in result
@@ -1545,6 +2267,101 @@ async def test_graph_operation_invalid(monkeypatch):
         )
 
 
+@pytest.mark.asyncio
+async def test_operation_tools_build_the_object_once_for_a_list(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    session = StubSession(
+        "{'results': {'order': 10, 'diameter': 2}, 'errors': {'is_planar': 'boom'}, "
+        "'timings_ms': {'order': 0.1, 'diameter': 0.2, 'is_planar': 0.3}}"
+    )
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+
+    result = await server.graph_operation(
+        graph="PetersenGraph", operation=["order", "diameter", "is_planar", "order"], ctx=ctx,
+    )
+    assert result == {
+        "operations": ["order", "diameter", "is_planar"],
+        "results": {"order": 10, "diameter": 2},
+        "errors": {"is_planar": "boom"},
+        "timings_ms": {"order": 0.1, "diameter": 0.2, "is_planar": 0.3},
+    }
+    code = session.calls[0]["code"]
+    assert code.count("_G = graphs.PetersenGraph()") == 1
+    assert code.count("walltime(_batch_start)") == 3
+
+    # A multi-line operation (is_convex defines helpers) wraps into its own
+    # function like any other.
+    await server.geometry_operation(
+        ["polygon_area", "is_convex"], [[0, 0], [1, 0], [1, 1], [0, 1]], ctx=ctx
+    )
+    group = await server.group_operation("DihedralGroup(4)", ["order", "exponent"], ctx=ctx)
+    assert group["group"] == "DihedralGroup(4)"
+    for call in session.calls:
+        validate_module(ast.parse(call["code"]), code=call["code"], policy=trusted_policy())
+
+
+@pytest.mark.asyncio
+async def test_operation_lists_are_checked_before_anything_runs(monkeypatch):
+    session = StubSession("None")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+    with pytest.raises(ToolError, match="Unknown operation 'girth'"):
+        await server.graph_operation("PetersenGraph", ["order", "girth"], ctx=ctx)
+    with pytest.raises(ToolError, match="requires both 'a' and 'b'"):
+        await server.number_theory_operation(["is_prime", "gcd"], 7, ctx=ctx)
+    with pytest.raises(ToolError, match="at least one operation"):
+        await server.elliptic_curve_operation([0, 1], [], ctx=ctx)
+    assert session.calls == []
+
+
+@pytest.mark.asyncio
+async def test_kept_objects_are_reused_through_their_handle(monkeypatch):
+    import ast
+
+    from sagemath_mcp.security import trusted_policy, validate_module
+
+    session = StubSession("10")
+    await _stub_manager(monkeypatch, session)
+    ctx = FakeContext()
+
+    kept = await server.graph_operation("PetersenGraph", "order", keep=True, ctx=ctx)
+    handle = kept["handle"]
+    assert handle.startswith("graph-")
+    assert f'_object_handles["{handle}"] = ' in session.calls[0]["code"]
+
+    reused = await server.graph_operation(handle, "order", ctx=ctx)
+    assert reused["handle"] == handle
+    code = session.calls[1]["code"]
+    assert "PetersenGraph" not in code
+    assert f'_G = _object_handles["{handle}"][\'_G\']' in code
+
+    # Without keep nothing is stored and no handle is returned.
+    plain = await server.graph_operation("PetersenGraph", "order", ctx=ctx)
+    assert "handle" not in plain
+    assert "_object_handles" not in session.calls[2]["code"]
+
+    ideal = await server.polynomial_ring_operation(
+        ["a", "b"], ["a^2+b", "b^2-1"], "groebner_basis", keep=True, ctx=ctx
+    )
+    await server.polynomial_ring_operation(
+        ["a", "b"], [ideal["handle"], "a^3"], "reduce", ctx=ctx
+    )
+    assert "_I = _object_handles" in session.calls[4]["code"]
+    assert '_R("a^3")' in session.calls[4]["code"]
+    curve = await server.elliptic_curve_operation([0, 1], "rank", keep=True, ctx=ctx)
+    await server.elliptic_curve_operation([curve["handle"]], "rank", ctx=ctx)
+    assert "EllipticCurve" not in session.calls[6]["code"]
+    for call in session.calls:
+        validate_module(ast.parse(call["code"]), code=call["code"], policy=trusted_policy())
+
+    with pytest.raises(ToolError, match="is a graph handle; this tool takes a group"):
+        await server.group_operation(handle, "order", ctx=ctx)
+
+
 @pytest.mark.asyncio
 async def test_graph_operation_no_context():
     with pytest.raises(ToolError, match="MCP context"):
@@ -2009,6 +2826,23 @@ def test_register_health_route_is_idempotent():
     assert len(health) == 1, f"expected one /health route, found {len(health)}"
 
 
+@pytest.mark.asyncio
+async def test_the_metrics_route_serves_prometheus_text():
+    response = await server.metrics_route(object())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert b"# TYPE sagemath_mcp_workspaces gauge" in response.body
+
+
+def test_register_metrics_route_is_idempotent():
+    from sagemath_mcp.app import mcp
+
+    server._register_metrics_route()
+    server._register_metrics_route()
+    paths = [getattr(r, "path", None) for r in mcp.http_app().routes]
+    assert paths.count("/metrics") == 1
+
+
 @pytest.mark.asyncio
 async def test_lifespan_without_cull_task(monkeypatch):
     """Cover branch 102->106: _CULL_TASK is None when lifespan exits."""
@@ -2058,6 +2892,7 @@ async def test_session_tools_require_context():
     for call in (
         lambda: server.interrupt_sage_session(ctx=None),
         lambda: server.start_sage_session("x", ctx=None),
+        lambda: server.fork_sage_session("x", ctx=None),
         lambda: server.list_sage_sessions(ctx=None),
         lambda: server.stop_sage_session("x", ctx=None),
     ):
@@ -2091,6 +2926,25 @@ async def test_interrupt_without_worker_is_not_an_error(monkeypatch):
     assert "No running computation" in result.message
 
 
+@pytest.mark.asyncio
+async def test_fork_sage_session_copies_the_workspace(monkeypatch):
+    manager = SageSessionManager(SageSettings(force_python_worker=True))
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    ctx = FakeContext("client-a")
+    try:
+        await server.evaluate_sage("x = 6", ctx=ctx)
+        result = await server.fork_sage_session("branch", ctx=ctx)
+        assert result.method == "fork"
+        evaluated = await server.evaluate_sage("x * 7", session="branch", ctx=ctx)
+        assert evaluated.result == "42"
+        with pytest.raises(ToolError, match="already exists"):
+            await server.fork_sage_session("branch", ctx=ctx)
+        with pytest.raises(ToolError, match="must not be empty"):
+            await server.fork_sage_session(" ", ctx=ctx)
+    finally:
+        await manager.shutdown()
+
+
 @pytest.mark.asyncio
 async def test_named_sessions_listed_per_client(monkeypatch):
     manager = SageSessionManager(SageSettings(force_python_worker=True))
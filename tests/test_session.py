@@ -4,13 +4,21 @@ import json
 import sys
 
 import pytest
+from fastmcp import Client
 
+from sagemath_mcp import monitoring, runtime, server
 from sagemath_mcp.config import SageSettings
 from sagemath_mcp.session import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_REPLAY,
+    WAIT_REPORTER,
+    RequestQueue,
     SageEvaluationError,
     SageProcessError,
     SageSession,
     SageSessionManager,
+    WorkspaceBusy,
 )
 from sagemath_mcp.tools import core as core_tools
 
@@ -659,6 +667,139 @@ async def test_manager_restores_journal_on_get(tmp_path):
     await manager2.shutdown()
 
 
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_share_one_startup(monkeypatch, tmp_path):
+    """Parallel get()s launch one worker and replay the journal once."""
+    settings = SageSettings(
+        force_python_worker=True, persist_sessions=True, persist_dir=str(tmp_path)
+    )
+    manager1 = SageSessionManager(settings)
+    s1 = await manager1.get("single-flight")
+    await s1.evaluate("counter = 0", want_latex=False, capture_stdout=False)
+    await s1.evaluate("counter += 1", want_latex=False, capture_stdout=False)
+    await manager1.shutdown()
+
+    launches = []
+    launch = SageSession._launch_worker
+
+    async def counting_launch(self):
+        launches.append(self.session_id)
+        await launch(self)
+
+    monkeypatch.setattr(SageSession, "_launch_worker", counting_launch)
+    monitoring.reset_metrics()
+    manager2 = SageSessionManager(settings)
+    try:
+        sessions = await asyncio.gather(*(manager2.get("single-flight") for _ in range(5)))
+        assert all(session is sessions[0] for session in sessions)
+        assert launches == ["single-flight"]
+        # Replayed once: a second replay would have counted to 2.
+        result = await sessions[0].evaluate("counter", want_latex=False, capture_stdout=False)
+        assert result.result == "1"
+        metrics = monitoring.snapshot()
+        assert metrics["startup_waits"] == 5
+        assert metrics["startup_max_wait_ms"] > 0
+        # A warm workspace is handed out without waiting on anything.
+        await manager2.get("single-flight")
+        assert monitoring.snapshot()["startup_waits"] == 5
+    finally:
+        await manager2.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_a_caller_giving_up_does_not_cancel_the_shared_startup(python_settings):
+    manager = SageSessionManager(python_settings)
+    try:
+        first = asyncio.create_task(manager.get("patient"))
+        impatient = asyncio.create_task(manager.get("patient"))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        session = await first
+        assert session.is_alive()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+    finally:
+        await manager.shutdown()
+
+
+async def _recycled(manager: SageSessionManager) -> None:
+    await asyncio.gather(*manager._recycling.values())
+    # Let the done callbacks take the finished tasks off the manager.
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_a_worker_past_its_evaluation_limit_is_recycled_in_place():
+    settings = SageSettings(force_python_worker=True, recycle_max_evaluations=3)
+    manager = SageSessionManager(settings)
+    monitoring.reset_metrics()
+    try:
+        session = await manager.get("recycle")
+        for code in ("x = 1", "x += 1", "def f(n):\n    return n + x\n"):
+            await session.evaluate(code, want_latex=False, capture_stdout=False)
+        old_pid = session._process.pid
+        assert session.recycle_reason() == "evaluations"
+        assert await manager.get("recycle") is session
+        # The old worker keeps serving while the fresh one replays.
+        await session.evaluate("y = 5", want_latex=False, capture_stdout=False)
+        await _recycled(manager)
+        assert session._process.pid != old_pid
+        assert session.evaluations == 0
+        result = await session.evaluate("f(y)", want_latex=False, capture_stdout=False)
+        assert result.result == "7"
+        metrics = monitoring.snapshot()
+        assert metrics["workers_recycled"] == {"evaluations": 1}
+        assert metrics["recycle_max_restore_ms"] > 0
+    finally:
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_recycling_by_age_and_memory_growth(monkeypatch):
+    settings = SageSettings(
+        force_python_worker=True, recycle_max_age=60, recycle_max_rss_growth_mb=100
+    )
+    session = SageSession("recycle-policy", settings)
+    rss = iter([50 << 20, 120 << 20, 160 << 20])
+    monkeypatch.setattr("sagemath_mcp.session._rss_bytes", lambda pid: next(rss))
+    try:
+        await session.ensure_started()
+        # The first reading is the baseline; growth is measured from it.
+        assert session.recycle_reason() is None
+        assert session.recycle_reason() is None
+        assert session.recycle_reason() == "memory"
+        assert session.recycle_reason(session.started_at + 61) == "age"
+    finally:
+        await session.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_a_failed_recycle_keeps_the_worker_and_is_not_retried(monkeypatch):
+    settings = SageSettings(force_python_worker=True, recycle_max_evaluations=1)
+    manager = SageSessionManager(settings)
+    monitoring.reset_metrics()
+
+    async def broken_replay(self, journal):
+        return 0
+
+    try:
+        session = await manager.get("no-recycle")
+        await session.evaluate("x = 1", want_latex=False, capture_stdout=False)
+        old_pid = session._process.pid
+        monkeypatch.setattr(SageSession, "restore_from_journal", broken_replay)
+        await manager.get("no-recycle")
+        await _recycled(manager)
+        assert session._process.pid == old_pid
+        assert session.recycle_failed
+        await manager.get("no-recycle")
+        assert not manager._recycling
+        result = await session.evaluate("x", want_latex=False, capture_stdout=False)
+        assert result.result == "1"
+        assert monitoring.snapshot()["recycle_failures"] == 1
+    finally:
+        await manager.shutdown()
+
+
 @pytest.mark.asyncio
 async def test_terminate_worker_without_stdin(python_settings):
     """Cover branch 265->269: process exists but stdin is None."""
@@ -844,6 +985,194 @@ async def test_list_and_stop_named_sessions(python_settings):
         await manager.shutdown()
 
 
+@pytest.mark.asyncio
+async def test_a_forked_workspace_starts_with_the_source_namespace(python_settings):
+    manager = SageSessionManager(python_settings)
+    try:
+        source = await manager.get(manager.key_for("alice", "a"))
+        await source.evaluate("x = 10", want_latex=False, capture_stdout=False)
+        child, method = await manager.fork(
+            manager.key_for("alice", "a"), manager.key_for("alice", "b")
+        )
+        assert method == "fork"
+        assert child._process.pid != source._process.pid
+        assert child.journal() == source.journal()
+
+        result = await child.evaluate("x + 1", want_latex=False, capture_stdout=False)
+        assert result.result == "11"
+        # Writes on either side stay on that side.
+        await child.evaluate("x = 99", want_latex=False, capture_stdout=False)
+        result = await source.evaluate("x", want_latex=False, capture_stdout=False)
+        assert result.result == "10"
+
+        assert [e["name"] for e in await manager.list_for_scope("alice")] == ["a", "b"]
+        assert await manager.stop("alice", "b") is True
+        assert source.is_alive()
+        with pytest.raises(ValueError, match="already exists"):
+            await manager.fork(manager.key_for("alice", "a"), manager.key_for("alice", "a"))
+    finally:
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_a_fork_that_fails_falls_back_to_replay(monkeypatch, python_settings):
+    async def no_fork(self, session_id, **kwargs):
+        raise SageProcessError("fork unavailable")
+
+    monkeypatch.setattr(SageSession, "fork", no_fork)
+    manager = SageSessionManager(python_settings)
+    try:
+        source = await manager.get(manager.key_for("alice", "a"))
+        await source.evaluate("x = 10", want_latex=False, capture_stdout=False)
+        child, method = await manager.fork(
+            manager.key_for("alice", "a"), manager.key_for("alice", "b")
+        )
+        assert method == "replay"
+        result = await child.evaluate("x", want_latex=False, capture_stdout=False)
+        assert result.result == "10"
+    finally:
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_the_request_queue_serves_by_priority_then_arrival():
+    queue = RequestQueue()
+    order = []
+    positions = {}
+
+    async def request(name, priority):
+        async def report(position, wait_seconds):
+            positions.setdefault(name, []).append(position)
+
+        WAIT_REPORTER.set(report)
+        async with queue.slot(priority):
+            order.append(name)
+
+    async with queue.slot():
+        tasks = [
+            asyncio.create_task(request(name, priority))
+            for name, priority in [
+                ("job", PRIORITY_BACKGROUND), ("replay", PRIORITY_REPLAY),
+                ("first", PRIORITY_INTERACTIVE), ("second", PRIORITY_INTERACTIVE),
+            ]
+        ]
+        await asyncio.sleep(0.05)
+        assert queue.depth == 5
+        with pytest.raises(WorkspaceBusy, match="busy with 5 request"):
+            async with queue.slot(fail_if_busy=True):
+                pass
+    await asyncio.gather(*tasks)
+    assert order == ["first", "second", "replay", "job"]
+    # Each waiter was told its place when it joined.
+    assert [found[0] for found in positions.values()] == [1, 1, 1, 2]
+    assert queue.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_a_waiter_that_gives_up_leaves_the_queue():
+    queue = RequestQueue()
+    async with queue.slot():
+        waiter = asyncio.create_task(queue.slot().__aenter__())
+        await asyncio.sleep(0.01)
+        assert queue.depth == 2
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert queue.depth == 1
+    assert queue.depth == 0
+    async with queue.slot():
+        assert queue.depth == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_are_told_their_position(monkeypatch, python_settings):
+    manager = SageSessionManager(python_settings)
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    messages = []
+
+    async def progress(progress, total, message):
+        messages.append(message)
+
+    try:
+        async with Client(server.mcp) as client:
+            await client.call_tool("evaluate_sage", {"code": "1"})
+            spin = asyncio.create_task(
+                client.call_tool(
+                    "evaluate_sage", {"code": "n = 0\nwhile n < 30000000:\n    n += 1\n"}
+                )
+            )
+            await asyncio.sleep(0.2)
+            [workspace] = await manager.list_for_scope(manager.snapshot()[0]["session_id"])
+            assert workspace["queued"] == 1
+            busy = await client.call_tool(
+                "evaluate_sage", {"code": "2", "fail_if_busy": True}, raise_on_error=False
+            )
+            assert busy.is_error
+            await client.call_tool("evaluate_sage", {"code": "n"}, progress_handler=progress)
+            await spin
+        assert any(message.startswith("Queued: position 1") for message in messages)
+    finally:
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_evaluate_sage_reports_usage_when_asked(monkeypatch, python_settings):
+    manager = SageSessionManager(python_settings)
+    monkeypatch.setattr(runtime, "SESSION_MANAGER", manager)
+    monitoring.reset_metrics()
+    try:
+        async with Client(server.mcp) as client:
+            plain = await client.call_tool("evaluate_sage", {"code": "1 + 1"})
+            assert plain.structured_content["usage"] is None
+            result = await client.call_tool(
+                "evaluate_sage", {"code": "2 + 2", "include_usage": True}
+            )
+        usage = result.structured_content["usage"]
+        assert set(usage["phases_ms"]) == {
+            "preparse", "validate", "compile", "execute", "format", "latex",
+        }
+        assert usage["queue_wait_ms"] >= 0 and usage["transport_ms"] >= 0
+        assert usage["cpu_user_ms"] is not None
+        # Every call is accounted for in monitoring, asked for or not.
+        metrics = monitoring.snapshot()
+        assert metrics["accounted_evaluations"] == 2
+        assert {"execute", "queue_wait", "transport"} <= set(metrics["avg_phase_ms"])
+    finally:
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_object_handles_live_as_long_as_the_namespace(python_settings):
+    from sagemath_mcp.codegen import _handle_load, _handle_store
+
+    manager = SageSessionManager(python_settings)
+    try:
+        session = await manager.get(manager.key_for("alice", "a"))
+        store = "_G = [1, 2, 3]\n" + _handle_store("graph-0123456789ab", ["_G"])
+        await session.evaluate(store, want_latex=False, capture_stdout=False, trusted=True)
+        assert list(session.handles) == ["graph-0123456789ab"]
+        [entry] = await manager.list_for_scope("alice")
+        assert entry["handles"] == ["graph-0123456789ab"]
+
+        load = _handle_load("graph-0123456789ab", ["_G"]) + "len(_G)"
+        result = await session.evaluate(load, want_latex=False, capture_stdout=False, trusted=True)
+        assert result.result == "3"
+
+        # Caller code cannot name the store, let alone register a handle in it.
+        with pytest.raises(SageEvaluationError, match="_object_handles"):
+            await session.evaluate(
+                store.replace("0123456789ab", "ba9876543210"),
+                want_latex=False, capture_stdout=False,
+            )
+        assert list(session.handles) == ["graph-0123456789ab"]
+
+        await session.reset()
+        assert session.handles == {}
+        with pytest.raises(SageEvaluationError, match="no object graph-0123456789ab"):
+            await session.evaluate(load, want_latex=False, capture_stdout=False, trusted=True)
+    finally:
+        await manager.shutdown()
+
+
 def test_named_session_journal_filename_is_safe(tmp_path):
     """"::" must not reach the filesystem."""
     settings = SageSettings(
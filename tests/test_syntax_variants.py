@@ -207,20 +207,22 @@ ACCEPTED: dict[str, list] = {
          "result", True),
     ],
     "range: numeric spans": [
-        ("negative span", lambda c: S.plot_expression("sin(x)", "x", -6.28, -3.14, ctx=c),
+        ("negative span",
+         lambda c: S.plot_expression("sin(x)", "x", -6.28, -3.14, inline=True, ctx=c),
          "image_base64", _is_png),
-        ("reversed bounds", lambda c: S.plot_expression("sin(x)", "x", 3.0, -3.0, ctx=c),
+        ("reversed bounds",
+         lambda c: S.plot_expression("sin(x)", "x", 3.0, -3.0, inline=True, ctx=c),
          "image_base64", _is_png),
-        ("integer bounds", lambda c: S.plot_expression("sin(x)", "x", -3, 3, ctx=c),
+        ("integer bounds", lambda c: S.plot_expression("sin(x)", "x", -3, 3, inline=True, ctx=c),
          "image_base64", _is_png),
         ("find_root reversed interval",
          lambda c: S.find_root("x - cos(x)", "x", 1.0, 0.0, ctx=c), "root", 0.7390851332151559),
     ],
     "list parameters: arity": [
-        ("one expression", lambda c: S.plot_multi_expression(["sin(x)"], ctx=c),
+        ("one expression", lambda c: S.plot_multi_expression(["sin(x)"], inline=True, ctx=c),
          "image_base64", _is_png),
         ("four expressions",
-         lambda c: S.plot_multi_expression(["sin(x)", "cos(x)", "x", "x^2"], ctx=c),
+         lambda c: S.plot_multi_expression(["sin(x)", "cos(x)", "x", "x^2"], inline=True, ctx=c),
          "image_base64", _is_png),
         ("single ring variable",
          lambda c: S.polynomial_ring_operation(["a"], ["a^2-1"], "groebner_basis", ctx=c),
@@ -70,7 +70,7 @@ def test_the_snapshot_covers_every_tool() -> None:
     """A snapshot that silently emptied would pass the test above."""
     expected = json.loads(SNAPSHOT.read_text(encoding="utf-8"))
     assert len(expected["tools"]) >= 37, "the snapshot lost tools"
-    assert len(expected["resource_templates"]) == 3
+    assert len(expected["resource_templates"]) == 4
 
 
 def test_every_tool_is_documented_for_users() -> None: